@@ -0,0 +1,107 @@
+"""Measure what call recording costs per concurrent session.
+
+Each simulated call feeds a recorder in real time, as a worker does: 10 ms
+caller frames at 48 kHz, and agent speech at 24 kHz in 3 s bursts pushed
+ahead of playback like TTS. For every N it reports the encoder thread's CPU
+as a share of one core per call, the peak audio a recorder held before
+encoding it, the process's memory growth, the cost of one ``push`` on the
+event loop and any dropped frames.
+
+Usage (from the backend directory):
+    python benchmarks/bench_call_recorder.py [--sessions 1,5,10] [--seconds 10] [--codec opus]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from livekit import rtc  # noqa: E402
+
+from services.call_recorder import AGENT, CALLER, CallRecorder  # noqa: E402
+
+
+def frames(sample_rate: int, seconds: float, seed: int) -> list:
+    """Speech-like noise in 10 ms frames."""
+    rng = np.random.default_rng(seed)
+    samples = sample_rate // 100
+    envelope = np.abs(np.sin(np.linspace(0, np.pi * 4 * seconds, int(seconds * 100))))
+    return [
+        rtc.AudioFrame(
+            data=(rng.standard_normal(samples) * 3000 * level).astype(np.int16).tobytes(),
+            sample_rate=sample_rate, num_channels=1, samples_per_channel=samples,
+        )
+        for level in envelope
+    ]
+
+
+async def call(recorder: CallRecorder, seconds: float, push_costs: list, seed: int) -> None:
+    caller = frames(48000, seconds, seed)
+    speech = frames(24000, 3, seed + 1)
+    started = time.monotonic()
+    for i, frame in enumerate(caller):
+        t = time.perf_counter()
+        recorder.push(CALLER, frame, "caller")
+        if i % 500 == 100:
+            # The agent answers: a burst of TTS, queued ahead of playback
+            for chunk in speech:
+                recorder.push(AGENT, chunk)
+        push_costs.append(time.perf_counter() - t)
+        await asyncio.sleep(max(0.0, started + (i + 1) / 100 - time.monotonic()))
+
+
+def rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def run(sessions: int, seconds: float, codec: str, directory: str) -> dict:
+    recorders = [CallRecorder(os.path.join(directory, f"call-{sessions}-{i}.{codec}"), codec=codec)
+                 for i in range(sessions)]
+    rss_before = rss_kb()
+    push_costs: list = []
+    for recorder in recorders:
+        recorder.start()
+    await asyncio.gather(*(call(r, seconds, push_costs, i) for i, r in enumerate(recorders)))
+    results = await asyncio.gather(*(r.aclose() for r in recorders))
+    results = [r for r in results if r is not None]
+    return {
+        "sessions": sessions,
+        "saved": len(results),
+        "cpu_pct": statistics.mean(r.cpu_seconds / r.duration_seconds for r in results) * 100,
+        "peak_buffer_kb": max(r.peak_buffer_bytes for r in results) / 1024,
+        "rss_growth_kb": (rss_kb() - rss_before) / sessions,
+        "push_us": statistics.median(push_costs) * 1e6,
+        "push_p99_us": sorted(push_costs)[int(len(push_costs) * 0.99)] * 1e6,
+        "file_kb_per_min": statistics.mean(r.size_bytes / r.duration_seconds * 60 for r in results) / 1024,
+        "dropped": sum(r.dropped_frames for r in results),
+    }
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--sessions", default="1,5,10")
+    args.add_argument("--seconds", type=float, default=10.0)
+    args.add_argument("--codec", choices=("opus", "flac"), default="opus")
+    opts = args.parse_args()
+
+    print(f"{'sessions':>8} {'cpu/call':>9} {'peak buf':>9} {'rss/call':>9} {'push p50':>9} "
+          f"{'push p99':>9} {'file/min':>9} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        # Load the codec once so its setup isn't charged to the first row
+        asyncio.run(run(1, 0.5, opts.codec, directory))
+        for n in (int(x) for x in opts.sessions.split(",")):
+            r = asyncio.run(run(n, opts.seconds, opts.codec, directory))
+            print(f"{r['sessions']:>8} {r['cpu_pct']:>8.2f}% {r['peak_buffer_kb']:>6.0f} KB "
+                  f"{r['rss_growth_kb']:>6.0f} KB {r['push_us']:>6.1f} us {r['push_p99_us']:>6.1f} us "
+                  f"{r['file_kb_per_min']:>6.0f} KB {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark calendar event normalization at 10k events.
+
+Compares the previous dateutil-based ``process_events`` loop with the
+``fromisoformat`` fast path, with and without a field projection.
+
+Usage (from the backend directory):
+    python benchmarks/bench_process_events.py [--events 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dateutil import parser  # noqa: E402
+import pytz  # noqa: E402
+
+from services.event_normalizer import iter_normalized_events  # noqa: E402
+
+
+def make_events(count: int) -> list:
+    base = datetime.datetime(2025, 10, 14, 9, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)))
+    events = []
+    for i in range(count):
+        start = base + datetime.timedelta(minutes=30 * i)
+        end = start + datetime.timedelta(minutes=30)
+        boundary = (
+            {"start": {"date": start.date().isoformat()}, "end": {"date": end.date().isoformat()}}
+            if i % 50 == 0
+            else {"start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+        )
+        events.append({
+            "id": f"event{i}",
+            "summary": f"Meeting {i}",
+            "status": "confirmed",
+            "created": "2025-10-10T09:28:08.000Z",
+            "updated": "2025-10-10T09:28:09.066Z",
+            "organizer": {"email": "owner@example.com", "self": True},
+            "creator": {"email": "owner@example.com", "self": True},
+            "attendees": [{"email": f"guest{j}@example.com", "responseStatus": "needsAction"} for j in range(3)],
+            "htmlLink": f"https://www.google.com/calendar/event?eid=event{i}",
+            **boundary,
+        })
+    return events
+
+
+def legacy_process_events(events: list, timezone: str) -> list:
+    """The original implementation, kept here as the baseline."""
+    tz = pytz.timezone(timezone)
+    processed = []
+    for event in events:
+        start = event.get("start", {})
+        if "dateTime" in start:
+            start_time = parser.parse(start["dateTime"])
+        elif "date" in start:
+            start_time = parser.parse(start["date"])
+        else:
+            continue
+        end = event.get("end", {})
+        if "dateTime" in end:
+            end_time = parser.parse(end["dateTime"])
+        elif "date" in end:
+            end_time = parser.parse(end["date"])
+        else:
+            continue
+        processed.append({
+            "id": event.get("id", ""),
+            "title": event.get("summary", "No Title"),
+            "description": event.get("description", ""),
+            "location": event.get("location", ""),
+            "status": event.get("status", "confirmed"),
+            "organizer": event.get("organizer", {}).get("email", ""),
+            "creator": event.get("creator", {}).get("email", ""),
+            "created": event.get("created", ""),
+            "updated": event.get("updated", ""),
+            "attendees": event.get("attendees", []),
+            "hangoutLink": event.get("hangoutLink", ""),
+            "htmlLink": event.get("htmlLink", ""),
+            "recurrence": event.get("recurrence", []),
+            "recurringEventId": event.get("recurringEventId", ""),
+            "start": start_time.astimezone(tz).isoformat(),
+            "end": end_time.astimezone(tz).isoformat(),
+        })
+    return processed
+
+
+def bench(name: str, fn, repeat: int, count: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"{name:<28} best {best * 1000:8.1f} ms  median {statistics.median(timings) * 1000:8.1f} ms"
+          f"  ({count / best:,.0f} events/s)")
+    return best
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--events", type=int, default=10_000)
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--timezone", default="Asia/Kolkata")
+    opts = args.parse_args()
+
+    events = make_events(opts.events)
+    assert legacy_process_events(events, opts.timezone) == list(iter_normalized_events(events, opts.timezone))
+
+    projection = ("id", "title", "start", "end")
+    legacy = bench("legacy (dateutil)", lambda: legacy_process_events(events, opts.timezone), opts.repeat, opts.events)
+    fast = bench("fast path", lambda: list(iter_normalized_events(events, opts.timezone)), opts.repeat, opts.events)
+    projected = bench(
+        "fast path + projection",
+        lambda: list(iter_normalized_events(events, opts.timezone, projection)),
+        opts.repeat,
+        opts.events,
+    )
+    print(f"speedup: {legacy / fast:.1f}x full, {legacy / projected:.1f}x projected")
+
+
+if __name__ == "__main__":
+    main()
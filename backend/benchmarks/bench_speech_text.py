@@ -0,0 +1,93 @@
+"""Benchmark the streaming speech normalizer in ``tts_node``.
+
+Feeds an LLM-like stream of small text deltas through ``SpeechChunker`` and
+reports the cost per delta, how much text had arrived before the first chunk
+was released to the TTS, and throughput compared with the previous
+``str.replace`` filter.
+
+Usage (from the backend directory):
+    python benchmarks/bench_speech_text.py [--replies 2000] [--delta-chars 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.speech_text import SpeechChunker  # noqa: E402
+
+REPLIES = (
+    "✅ Done! Your meeting **Cardiology follow-up** with Dr. Rao is booked for "
+    "2025-10-14T09:30:00+05:30. The invite goes to john_doe@example.com, and you can "
+    "open it at https://www.google.com/calendar/event?eid=abc123. Anything else?",
+    "I found three meetings on 2025-10-15: first, *Sync* at 10 AM; second, a review "
+    "at noon; and third, a retro at 4 PM. Which one would you like to cancel?",
+    "### Available slots\n- Tuesday at 9 AM\n- Tuesday at 11 AM\n- Wednesday at 2 PM\n"
+    "Let me know which one works best for you.",
+)
+
+
+def deltas(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def legacy(stream: list) -> list:
+    """The previous per-delta filter, kept as the baseline."""
+    return [chunk.replace("*", "").replace("_", "").replace("#", "") for chunk in stream]
+
+
+def chunked(stream: list) -> tuple:
+    chunker = SpeechChunker()
+    out = []
+    timings = []
+    first_at = None
+    received = 0
+    for delta in stream:
+        received += len(delta)
+        started = time.perf_counter()
+        ready = chunker.push(delta)
+        timings.append(time.perf_counter() - started)
+        if ready and first_at is None:
+            first_at = received
+        out.extend(ready)
+    tail = chunker.flush()
+    if tail:
+        out.append(tail)
+    return out, timings, first_at or received
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--replies", type=int, default=2000)
+    args.add_argument("--delta-chars", type=int, default=4)
+    opts = args.parse_args()
+
+    streams = [deltas(REPLIES[i % len(REPLIES)], opts.delta_chars) for i in range(opts.replies)]
+    per_delta = []
+    first_chunk_chars = []
+    started = time.perf_counter()
+    for stream in streams:
+        _, timings, first_at = chunked(stream)
+        per_delta.extend(timings)
+        first_chunk_chars.append(first_at)
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for stream in streams:
+        legacy(stream)
+    legacy_elapsed = time.perf_counter() - started
+
+    per_delta.sort()
+    p99 = per_delta[min(len(per_delta) - 1, int(len(per_delta) * 0.99))]
+    print(f"deltas: {len(per_delta):,} ({opts.delta_chars} chars each)")
+    print(f"per delta      p50 {statistics.median(per_delta) * 1e6:6.1f} us   p99 {p99 * 1e6:6.1f} us"
+          f"   max {per_delta[-1] * 1e6:6.1f} us")
+    print(f"first chunk after {statistics.median(first_chunk_chars):.0f} chars (median)")
+    print(f"chunker  {elapsed * 1000:8.1f} ms total   legacy replace {legacy_elapsed * 1000:8.1f} ms total")
+    print("sample:", chunked(streams[0])[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark the natural-language time resolver against caller utterances.
+
+The built-in corpus is made of user turns of the kind our booking calls
+contain, each with the window it should resolve to on a fixed Thursday
+morning. The benchmark reports accuracy, coverage and the cost of a
+resolution with a cold and a warm parse cache. With ``--db`` it also
+resolves every user line stored in the ``conversations`` table and reports
+how many name a time, which shows what real transcripts use that the rules
+miss (``--show-misses``).
+
+Usage (from the backend directory):
+    python benchmarks/bench_time_resolver.py [--rounds 200] [--db src/db/app_data.db] [--show-misses]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.time_resolver import normalize, parse, resolve  # noqa: E402
+
+NOW = pytz.timezone("Asia/Kolkata").localize(datetime.datetime(2025, 10, 16, 10, 20))
+
+# (utterance, expected "start-end" as "%a %H:%M", or None when it names no time)
+CORPUS = (
+    ("Can I book something next Tuesday afternoon?", "Tue 12:00-Tue 17:00"),
+    ("tomorrow at 3 works for me", "Fri 15:00-Fri 15:30"),
+    ("How about tomorrow at 3 pm", "Fri 15:00-Fri 15:30"),
+    ("Let's do 11 am on Monday", "Mon 11:00-Mon 11:30"),
+    ("sometime next week", "Mon 09:00-Fri 18:00"),
+    ("Is the doctor free this evening?", "Thu 17:00-Thu 20:00"),
+    ("day after tomorrow in the morning please", "Sat 09:00-Sat 12:00"),
+    ("any time after 4 on Friday", "Fri 16:00-Fri 18:00"),
+    ("before noon tomorrow", "Fri 09:00-Fri 12:00"),
+    ("between 2 and 4 pm tomorrow", "Fri 14:00-Fri 16:00"),
+    ("October 21st at 10:30 am", "Tue 10:30-Tue 11:00"),
+    ("on 21 Oct", "Tue 09:00-Tue 18:00"),
+    ("the 20th is fine", "Mon 09:00-Mon 18:00"),
+    ("half past three tomorrow", "Fri 15:30-Fri 16:00"),
+    ("can we do sometime next wednesday around 11", "Wed 11:00-Wed 11:30"),
+    ("in two hours", "Thu 12:20-Thu 12:50"),
+    ("book it for 5.30 p.m. tomorrow", "Fri 17:30-Fri 18:00"),
+    ("this weekend", "Sat 09:00-Sun 18:00"),
+    ("late afternoon on friday", "Fri 15:00-Fri 17:00"),
+    ("at noon tomorrow", "Fri 12:00-Fri 12:30"),
+    ("I want to see a cardiologist", None),
+    ("yes please go ahead", None),
+    ("cancel my meeting", None),
+)
+
+
+def span(window) -> str:
+    return f"{window.start.strftime('%a %H:%M')}-{window.end.strftime('%a %H:%M')}"
+
+
+def timed(utterances, rounds: int, warm: bool) -> list:
+    timings = []
+    for _ in range(rounds):
+        if not warm:
+            parse.cache_clear()
+        for text in utterances:
+            started = time.perf_counter()
+            resolve(text, now=NOW)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def transcript_lines(path: str) -> list:
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT transcription FROM conversations").fetchall()
+    return [line[len("user:"):].strip() for (text,) in rows for line in (text or "").splitlines()
+            if line.startswith("user:")]
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--rounds", type=int, default=200)
+    args.add_argument("--db", help="SQLite database whose conversations table is also resolved")
+    args.add_argument("--show-misses", action="store_true", help="print transcript lines that resolved to nothing")
+    opts = args.parse_args()
+
+    wrong = []
+    for text, expected in CORPUS:
+        window = resolve(text, now=NOW)
+        got = span(window) if window else None
+        if got != expected:
+            wrong.append((text, expected, got))
+    print(f"corpus: {len(CORPUS) - len(wrong)}/{len(CORPUS)} correct")
+    for text, expected, got in wrong:
+        print(f"  {text!r}: expected {expected}, got {got}")
+
+    utterances = [text for text, _ in CORPUS]
+    for label, warm in (("cold parse", False), ("cached parse", True)):
+        timings = timed(utterances, opts.rounds, warm)
+        print(f"{label:>13}: p50 {statistics.median(timings) * 1e6:6.1f} us   "
+              f"p99 {sorted(timings)[int(len(timings) * 0.99)] * 1e6:6.1f} us")
+
+    if opts.db:
+        lines = transcript_lines(opts.db)
+        resolved = [line for line in lines if parse(normalize(line)) is not None]
+        print(f"transcripts: {len(lines)} user lines, {len(resolved)} name a date or time")
+        if opts.show_misses:
+            for line in lines:
+                if line not in resolved:
+                    print(f"  miss: {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measure the tool-schema tokens each LLM request carries, with and without phases.
+
+Every function tool's schema is sent with every request. The benchmark takes
+the assistant's real tools, prints what each one costs and what each phase in
+``PHASE_TOOLS`` offers, then walks the load harness's scripted call turn by
+turn (phase changes from the caller's words and the tools that ran) and
+compares the tokens sent per turn against offering every tool.
+
+Usage (from the backend directory):
+    python benchmarks/bench_tool_phases.py [--rounds 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "agent"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("CALENDAR_PROVIDER", "fake")
+
+from load_harness import script  # noqa: E402
+from services.tool_phases import ToolPhases, tool_schema_tokens  # noqa: E402
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--rounds", type=int, default=2)
+    opts = args.parse_args()
+
+    import agent  # noqa: E402  (heavy: loads the plugins)
+
+    room = type("Room", (), {"name": "bench-room"})()
+    tools = agent.AppointmentSchedulingAssistant(type("Ctx", (), {"room": room})()).tools
+    phases = ToolPhases(tools, enabled=True)
+
+    print(f"{'tool':<30} {'tokens':>6}")
+    for tool in sorted(tools, key=tool_schema_tokens, reverse=True):
+        print(f"{tool.id:<30} {tool_schema_tokens(tool):>6}")
+    print(f"{'all tools':<30} {phases.all_tokens():>6}\n")
+
+    print(f"{'phase':<10} {'tools':>5} {'tokens':>6} {'saved':>6}")
+    for phase in phases.phases:
+        tokens = phases.tokens(phase)
+        print(f"{phase:<10} {len(phases.names(phase)):>5} {tokens:>6} {1 - tokens / phases.all_tokens():>6.0%}")
+
+    per_turn = []
+    booking_intent = None
+    for r in range(opts.rounds):
+        for utterance, tool, _ in script(0, r, [1]):
+            phases.on_user_turn(utterance, booking_intent)
+            offered = tool in phases.names()
+            per_turn.append(phases.tokens())
+            print(f"\n{phases.phase:<8} {phases.tokens():>5} tokens  {utterance!r} -> {tool}"
+                  f"{'' if offered else '  (NOT OFFERED)'}", end="")
+            # What the tools leave behind: an open booking after slots are offered
+            booking_intent = {"expert_id": 1} if tool == "suggest_slots_for_expert" else None
+            phases.after_tool(tool, booking_intent)
+    print(f"\n\nscripted call: {statistics.mean(per_turn):.0f} tool tokens per turn "
+          f"against {phases.all_tokens()} with every tool offered")
+
+
+if __name__ == "__main__":
+    main()
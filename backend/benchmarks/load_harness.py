@@ -0,0 +1,247 @@
+"""Run N concurrent agent sessions in one process and measure where it saturates.
+
+Each session is a real ``AppointmentSchedulingAssistant`` inside an
+``AgentSession``, driven by a scripted LLM that makes the tool calls of a
+typical call (list meetings, pick an expert, find slots, book, check the day)
+against a temporary SQLite database and the fake calendar. User turns are fed
+as text, which stands in for STT; the sessions have no audio output, so the
+TTS is not exercised. LLM and calendar latency are simulated with
+``--llm-ms`` and ``--calendar-ms``.
+
+For every N it reports throughput, tool latency and event-loop lag. Lag is
+the oversleep of a 10 ms timer: it grows when tools or callbacks block the
+loop, which is what limits sessions per worker.
+
+Usage (from the backend directory):
+    python benchmarks/load_harness.py [--sessions 1,5,10,25] [--rounds 2] [--llm-ms 300]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "agent"))
+os.environ.setdefault("CALENDAR_PROVIDER", "fake")
+# Keep the agent's file logging out of the measurements.
+logging.basicConfig(level=logging.ERROR)
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, AgentSession, llm  # noqa: E402
+from livekit.agents.llm import ChatChunk, ChoiceDelta, FunctionToolCall  # noqa: E402
+
+from db.AppDatabase import AppDatabase  # noqa: E402
+from services.latency import SessionLatency, bind_session  # noqa: E402
+from services.loop_monitor import LoopMonitor, set_tags  # noqa: E402
+from services.metrics import summarize  # noqa: E402
+
+logging.getLogger("app-db").setLevel(logging.ERROR)
+
+EXPERTS = (("Dr. Asha Rao", "Cardiology"), ("Dr. Vikram Shah", "Dermatology"), ("Dr. Meera Iyer", "Nutrition"))
+
+
+class ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        await asyncio.sleep(self._llm.latency)
+        if self._chat_ctx.items and self._chat_ctx.items[-1].type == "function_call_output":
+            delta = ChoiceDelta(role="assistant", content="All done. Is there anything else I can help with?")
+        else:
+            call = self._llm.next_call()
+            delta = (
+                ChoiceDelta(role="assistant", tool_calls=[FunctionToolCall(
+                    name=call[1], arguments=json.dumps(call[2]), call_id=uuid.uuid4().hex
+                )])
+                if call else ChoiceDelta(role="assistant", content="Sure, tell me more.")
+            )
+        self._event_ch.send_nowait(ChatChunk(id=uuid.uuid4().hex, delta=delta))
+
+
+class ScriptedLLM(llm.LLM):
+    """Answers each user turn with the next scripted tool call, then a short reply."""
+
+    def __init__(self, calls: List[tuple], latency: float):
+        super().__init__()
+        self._calls = list(calls)
+        self.latency = latency
+
+    def next_call(self) -> Optional[tuple]:
+        return self._calls.pop(0) if self._calls else None
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs):
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class FakeParticipant:
+    def __init__(self, index: int):
+        self.identity = f"loaduser{index}@example.com"
+        self.name = f"Load User {index}"
+        self.metadata = json.dumps({"sessionGuid": f"load-{index}-{uuid.uuid4().hex[:8]}"})
+
+
+class RecordingLatency(SessionLatency):
+    """Per-session latency that also feeds the run-wide samples."""
+
+    def __init__(self, sink: Dict[str, List[float]]):
+        super().__init__()
+        self._sink = sink
+
+    def add(self, metric: str, seconds: float) -> None:
+        super().add(metric, seconds)
+        self._sink[metric].append(seconds)
+
+
+def seed(db: AppDatabase, users: int) -> List[int]:
+    expert_ids = [db.create_expert(name, specialty, f"expert{i}@example.com")
+                  for i, (name, specialty) in enumerate(EXPERTS)]
+    with db._connect() as conn:
+        for expert_id in expert_ids:
+            conn.execute(
+                "INSERT INTO expert_availability (expert_id, start_time, end_time, recurring_type) "
+                "VALUES (?, '00:00:00', '23:59:00', 'daily')",
+                (expert_id,),
+            )
+    for i in range(users):
+        db.create_user(f"Load User {i}", f"loaduser{i}@example.com")
+    return expert_ids
+
+
+def script(index: int, round_no: int, expert_ids: List[int]) -> List[tuple]:
+    """User turns and the tool call each gets, for one round of a typical call; bookings never collide."""
+    expert_id = expert_ids[index % len(expert_ids)]
+    day = datetime.date.today() + datetime.timedelta(days=1 + round_no * 7 + index // 40)
+    start = datetime.datetime.combine(day, datetime.time(1, 0)) + datetime.timedelta(minutes=30 * (index % 40))
+    end = start + datetime.timedelta(minutes=30)
+    return [
+        ("What meetings do I have coming up?", "list_meetings", {"max_results": 5}),
+        ("I need a heart checkup, which doctors are there?", "fetch_experts", {"user_requirement": "heart checkup"}),
+        ("When is the cardiologist free?", "suggest_slots_for_expert",
+         {"expert_id": expert_id, "desired_start": start.isoformat()}),
+        ("The first one works, please book it.", "schedule_meeting",
+         {"title": f"Checkup {index}-{round_no}", "expert_id": expert_id,
+          "start_time": start.isoformat(), "end_time": end.isoformat()}),
+        ("What do I have on that day?", "list_meetings_by_date", {"date": day.isoformat()}),
+    ]
+
+
+async def run_session(agent_module, index: int, opts, expert_ids: List[int], samples: Dict[str, List[float]]) -> dict:
+    bind_session(RecordingLatency(samples))
+    set_tags(room=f"load-room-{index}", session=f"load-{index}")
+    calls = [call for r in range(opts.rounds) for call in script(index, r, expert_ids)]
+    room = type("Room", (), {"name": f"load-room-{index}"})()
+    userdata = agent_module.UserData(holds=agent_module.SlotHolds(agent_module.db, room.name))
+    assistant = agent_module.AppointmentSchedulingAssistant(type("Ctx", (), {"room": room})())
+    turns = 0
+    errors = 0
+    async with AgentSession[agent_module.UserData](userdata=userdata, llm=ScriptedLLM(calls, opts.llm_ms / 1000)) as session:
+        assistant._agent_session = session
+        await session.start(assistant)
+        await assistant.handle_track_subscribed(None, None, FakeParticipant(index))
+        for utterance, _, _ in calls:
+            await asyncio.sleep(opts.think_ms / 1000)
+            try:
+                # run() skips on_user_turn_completed, where a voice turn picks its tools
+                assistant.tool_phases.on_user_turn(utterance, userdata.booking_intent)
+                await assistant.apply_tool_phase()
+                await session.run(user_input=utterance)
+                turns += 1
+            except Exception:
+                errors += 1
+        if userdata.prefetch is not None:
+            userdata.prefetch.close()
+        leaked = await userdata.tasks.aclose()
+    return {"turns": turns, "errors": errors, "leaked": len(leaked)}
+
+
+async def sample_lag(stop: asyncio.Event, lags: List[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - started - interval))
+
+
+async def run_level(agent_module, sessions: int, opts, expert_ids: List[int]) -> dict:
+    samples: Dict[str, List[float]] = defaultdict(list)
+    lags: List[float] = []
+    monitor = LoopMonitor(threshold=opts.block_ms / 1000, interval=0.02) if opts.monitor else None
+    if monitor is not None:
+        monitor.start()
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(sample_lag(stop, lags))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_session(agent_module, i, opts, expert_ids, samples) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    if monitor is not None:
+        monitor.stop()
+    tools = {metric[5:]: summarize(values) for metric, values in samples.items() if metric.startswith("tool.")}
+    return {
+        "sessions": sessions,
+        "seconds": elapsed,
+        "turns": sum(r["turns"] for r in results),
+        "errors": sum(r["errors"] for r in results),
+        "leaked": sum(r["leaked"] for r in results),
+        "tool": summarize(v for metric, values in samples.items() if metric.startswith("tool.") for v in values),
+        "tools": tools,
+        "lag": summarize(lags),
+        "blockers": monitor.report() if monitor is not None else [],
+    }
+
+
+def report(level: dict) -> None:
+    tool, lag = level["tool"], level["lag"]
+    slowest = max(level["tools"].items(), key=lambda item: item[1]["p95"], default=("-", {"p95": 0.0}))
+    print(f"{level['sessions']:>8} {level['turns'] / level['seconds']:>9.1f} {level['errors']:>6}"
+          f" {tool['p50'] * 1000:>9.1f} {tool['p95'] * 1000:>9.1f} {tool['p99'] * 1000:>9.1f}"
+          f" {lag['p50'] * 1000:>8.1f} {lag['p99'] * 1000:>8.1f} {lag['max'] * 1000:>8.1f}"
+          f"  {slowest[0]} ({slowest[1]['p95'] * 1000:.0f} ms)")
+    for blocker in level["blockers"]:
+        print(f"{'':>8} blocked {blocker['count']:>4}x (max {blocker['max_ms']:.0f} ms) in {blocker['call_site']}")
+    if level["leaked"]:
+        print(f"{'':>8} {level['leaked']} background task(s) ignored cancellation at session end")
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--sessions", default="1,5,10,25", help="comma-separated concurrency levels")
+    args.add_argument("--rounds", type=int, default=2, help="scripted booking rounds per session")
+    args.add_argument("--llm-ms", type=float, default=300, help="simulated LLM response time")
+    args.add_argument("--think-ms", type=float, default=200, help="pause before each user turn")
+    args.add_argument("--calendar-ms", type=float, default=80, help="simulated calendar API latency")
+    args.add_argument("--monitor", action="store_true", help="catch and list what blocks the event loop")
+    args.add_argument("--block-ms", type=float, default=50, help="stall length reported by --monitor")
+    args.add_argument("--json", action="store_true", help="print raw results as JSON")
+    opts = args.parse_args()
+    levels = [int(n) for n in opts.sessions.split(",") if n.strip()]
+    os.environ["CALENDAR_FAKE_LATENCY_MS"] = str(opts.calendar_ms)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "load.db")
+        expert_ids = seed(AppDatabase(db_path), max(levels))
+        import agent as agent_module
+
+        for name in ("agent", "app-db", "livekit.agents"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+        agent_module.init_process_resources(db_path=db_path)
+        results = []
+        print(f"{'sessions':>8} {'turns/s':>9} {'errors':>6} {'tool p50':>9} {'tool p95':>9} {'tool p99':>9}"
+              f" {'lag p50':>8} {'lag p99':>8} {'lag max':>8}  slowest tool (p95)")
+        for sessions in levels:
+            level = asyncio.run(run_level(agent_module, sessions, opts, expert_ids))
+            results.append(level)
+            report(level)
+        if opts.json:
+            print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
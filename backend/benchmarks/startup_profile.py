@@ -0,0 +1,117 @@
+"""Profile and budget the import cost of the agent and API entry points.
+
+Each entry point is imported in a fresh interpreter with ``-X importtime``.
+The script reports wall-clock import time and the packages that cost the
+most. With ``--check`` it exits non-zero when an entry point is over its
+cold-start budget or imports a module it should load lazily.
+
+Usage (from the backend directory):
+    python benchmarks/startup_profile.py [--entry agent|main|all] [--top 15] [--repeat 3]
+    python benchmarks/startup_profile.py --check [--budget-agent-ms 4000] [--budget-main-ms 1500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# module name, working directory (agent.py runs from src/agent, main.py from src)
+ENTRY_POINTS = {
+    "agent": ("agent", os.path.join(SRC, "agent")),
+    "main": ("main", SRC),
+}
+
+# Modules that must stay out of the import path; they are loaded on demand.
+LAZY_MODULES = {
+    "agent": [
+        "livekit.plugins.azure",
+        "livekit.plugins.cartesia",
+        "livekit.plugins.deepgram",
+        "livekit.plugins.openai",
+        "livekit.plugins.silero",
+        "livekit.plugins.noise_cancellation",
+        "googleapiclient",
+    ],
+    "main": ["grpc", "livekit", "googleapiclient"],
+}
+
+DEFAULT_BUDGET_MS = {
+    "agent": float(os.getenv("STARTUP_BUDGET_AGENT_MS", "4000")),
+    "main": float(os.getenv("STARTUP_BUDGET_MAIN_MS", "1500")),
+}
+
+
+def package_of(module: str) -> str:
+    """Group modules by package; LiveKit plugins are reported individually."""
+    parts = module.split(".")
+    depth = 3 if parts[:2] == ["livekit", "plugins"] else 2 if parts[0] == "livekit" else 1
+    return ".".join(parts[:depth])
+
+
+def profile_import(entry: str) -> Tuple[float, Dict[str, int], List[str]]:
+    """Import ``entry`` in a fresh interpreter.
+
+    Returns:
+        (wall-clock seconds, self time in microseconds per package, imported modules)
+    """
+    module, cwd = ENTRY_POINTS[entry]
+    code = (
+        f"import sys, time; sys.path.insert(0, {SRC!r}); t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, CALENDAR_PROVIDER=os.getenv("CALENDAR_PROVIDER", "fake"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    per_package: Dict[str, int] = defaultdict(int)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.append(name)
+        per_package[package_of(name)] += int(self_us)
+    return float(result.stdout.strip().splitlines()[-1]), dict(per_package), modules
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--entry", choices=[*ENTRY_POINTS, "all"], default="all")
+    args.add_argument("--top", type=int, default=15)
+    args.add_argument("--repeat", type=int, default=3, help="runs per entry point; the fastest counts")
+    args.add_argument("--check", action="store_true", help="fail when over budget or a lazy module is imported")
+    args.add_argument("--budget-agent-ms", type=float, default=DEFAULT_BUDGET_MS["agent"])
+    args.add_argument("--budget-main-ms", type=float, default=DEFAULT_BUDGET_MS["main"])
+    opts = args.parse_args()
+
+    budgets = {"agent": opts.budget_agent_ms, "main": opts.budget_main_ms}
+    entries = list(ENTRY_POINTS) if opts.entry == "all" else [opts.entry]
+    failures = []
+    for entry in entries:
+        runs = [profile_import(entry) for _ in range(opts.repeat)]
+        wall, per_package, modules = min(runs, key=lambda run: run[0])
+        print(f"\n{entry}: {wall * 1000:.0f} ms (budget {budgets[entry]:.0f} ms, {len(modules)} modules)")
+        for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:opts.top]:
+            print(f"  {self_us / 1000:9.1f} ms  {package}")
+
+        if wall * 1000 > budgets[entry]:
+            failures.append(f"{entry} import took {wall * 1000:.0f} ms, budget is {budgets[entry]:.0f} ms")
+        imported = set(modules)
+        for lazy in LAZY_MODULES[entry]:
+            if lazy in imported:
+                failures.append(f"{entry} imports {lazy} at startup; it should be loaded lazily")
+
+    if opts.check and failures:
+        print("\nstartup check failed:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    if opts.check:
+        print("\nstartup check passed")
+
+
+if __name__ == "__main__":
+    main()
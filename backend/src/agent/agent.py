@@ -1,13 +1,13 @@
 # agent.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
 import os
 import re
+import sys
 import asyncio
 
 from typing import AsyncIterable, List, Optional
 from db.AppDatabase import AppDatabase
-from livekit.plugins import azure
 from livekit import rtc
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -24,16 +24,54 @@ from livekit.agents import (
     cli,
     metrics,
     ModelSettings,
-    ConversationItemAddedEvent
+    ConversationItemAddedEvent,
+    FunctionToolsExecutedEvent,
 )
 import datetime
-from livekit.agents.llm import function_tool
-from livekit.plugins import cartesia, deepgram, noise_cancellation, openai, silero
+from livekit.agents.llm import ToolError, function_tool
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 import pytz
-from services.calendar_service import CalendarService
-
-calendar_service = CalendarService()
+import time
+import uuid
+from services.calendar_provider import get_calendar_provider
+from services.booking import busy_intervals, find_slot_options, match_experts, without_conflicts
+from services.capacity import CapacityModel, JobLoadReporter
+from services.calendar_outbox import CalendarOutboxDispatcher
+from services.calendar_resilience import CalendarUnavailableError
+from services.call_recorder import CallRecorder
+from services.latency import (
+    CALENDAR_LATENCY,
+    DB_LATENCY,
+    SessionLatency,
+    TimedProxy,
+    bind_session,
+    record_pipeline_metrics,
+    timed_tool,
+)
+from services.loop_monitor import LoopMonitor, set_tags
+from services.event_normalizer import get_zone
+from services.expert_cache import ExpertCache
+from services.instructions import PROMPT_TOKENS, InstructionBuilder
+from services.metrics import registry, start_metrics_server
+from services.participants import ParticipantRegistry, UserProfileCache
+from services.phrase_cache import PHRASES, PhraseCache, named_greeting, speaks_filler
+from services.session_checkpoint import (
+    RESUME_SECONDS,
+    SessionCheckpointer,
+    capture,
+    record_tool_call,
+    restore,
+    resume_section,
+)
+from services.session_prefetch import SessionPrefetcher
+from services.slot_holds import SlotHolds
+from services.speech_text import SpeechChunker
+from services.task_supervisor import TaskSupervisor
+from services import voice_plugins
+from services.token_count import count_tokens
+from services.tool_phases import ToolPhases
+from services.time_resolver import parse_when, resolve, resolve_when
+from services.tool_results import EXPERTS, MEETINGS, ToolOutputBudget, shaped_result
 
 # -------------------------------
 # CONFIG & LOGGING
@@ -46,7 +84,59 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 load_dotenv()
-db = AppDatabase()
+
+PREWARM_SECONDS = registry.gauge(
+    "agent_prewarm_seconds", "Time spent loading each process-wide resource in prewarm."
+)
+PROCESS_READY = registry.gauge(
+    "agent_process_ready", "1 once prewarm has loaded every process-wide resource."
+)
+
+# Process-wide resources. They are created once per job process by
+# init_process_resources() (called from prewarm), never at import: building
+# the calendar provider can start an OAuth flow and AppDatabase runs DDL.
+db = None
+calendar_service = None
+outbox: Optional[CalendarOutboxDispatcher] = None
+experts: Optional[ExpertCache] = None
+profiles: Optional[UserProfileCache] = None
+# Opt-in via AGENT_LOOP_MONITOR; one per job process
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def _timed_init(component: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    PREWARM_SECONDS.set(time.perf_counter() - start, component=component)
+    return result
+
+
+def init_process_resources(db_path: Optional[str] = None) -> None:
+    """Create the DB, calendar provider, outbox and caches (idempotent).
+
+    Args:
+        db_path (str): SQLite file to use instead of the default app database.
+    """
+    global db, calendar_service, outbox, experts, profiles
+    if db is not None:
+        return
+    db = _timed_init("db", lambda: TimedProxy(AppDatabase(db_path), DB_LATENCY, "db"))
+    calendar_service = _timed_init(
+        "calendar", lambda: TimedProxy(get_calendar_provider(db), CALENDAR_LATENCY, "calendar")
+    )
+    outbox = CalendarOutboxDispatcher.from_env(db, calendar_service)
+    experts = ExpertCache(db)
+    _timed_init("experts", experts.warm)
+    profiles = UserProfileCache(db)
+    checkpoint_ttl = float(os.getenv("SESSION_CHECKPOINT_TTL", "900"))
+    _timed_init("checkpoints", lambda: db.prune_session_checkpoints(checkpoint_ttl))
+    _timed_init("slot_holds", db.prune_slot_holds)
+    zones = os.getenv("AGENT_PREWARM_TIMEZONES", "Asia/Kolkata,UTC")
+    _timed_init("timezones", lambda: [get_zone(name.strip()) for name in zones.split(",") if name.strip()])
+
+CALENDAR_UNAVAILABLE_MESSAGE = (
+    "The calendar is not responding right now. I'll follow up by email once it is back."
+)
 
 
 @dataclass
@@ -65,6 +155,16 @@ class UserData:
     user_gender: Optional[str] = None
     user_age: Optional[int] = None
     greeted: Optional[bool]=False
+    prefetch: Optional[SessionPrefetcher] = None
+    loop_tags: Optional[dict] = None
+    tasks: TaskSupervisor = field(default_factory=TaskSupervisor)
+    participants: ParticipantRegistry = field(default_factory=ParticipantRegistry)
+    # Slot being discussed but not booked yet, and recent tool calls; both checkpointed
+    booking_intent: Optional[dict] = None
+    tool_calls: List[dict] = field(default_factory=list)
+    checkpoint: Optional[SessionCheckpointer] = None
+    # Slots offered to this caller, held from other calls until booked or expired
+    holds: Optional[SlotHolds] = None
 
     def is_identified(self) -> bool:
         """Check if the user is identified."""
@@ -87,26 +187,29 @@ RunContext_T = RunContext[UserData]
 
 class AppointmentSchedulingAssistant(Agent):
     def __init__(self, ctx: JobContext) -> None:
-        now = datetime.datetime.now(datetime.timezone.utc).astimezone()  # Timezone-aware
         self.transcriptions: List[str] = []
         self.transcription_buffer: str = ""
         self._agent_session: Optional[AgentSession] = None
         self._ctx = ctx
-
-        current_date_str = now.strftime("%A, %B %d, %Y")
-
-        self.base_instructions = f"""You are a friendly and helpful voice AI assistant designed for managing meetings .
-            The current date and time is {current_date_str}.
-            When you first connect,Greet user with a friendly greeting and offer a friendly welcome.for example if users name is Arun Kumar,Hi Arun 
+        # Tokens tool results may add between two user turns; see shaped_result
+        self.tool_budget = ToolOutputBudget()
+        # Pre-rendered greeting and fillers; set in entrypoint
+        self.phrases: Optional[PhraseCache] = None
+
+        # Static persona only: the date lives in its own section at the end of the
+        # prompt so this prefix stays identical across calls and days.
+        self.base_instructions = """You are a friendly and helpful voice AI assistant designed for managing meetings .
+            A welcome greeting is played when the user connects, so do not greet them again; move straight to helping.
             **CRITICAL INSTRUCTION: Your responses MUST be in plain text only. NEVER use any special formatting, including asterisks, bolding, italics, or bullet points.**
             Do not accept the dates and time in the past suggest them to use in future dates and times.
+            Pass dates and times to the tools as the user said them, for example 'next Tuesday at 3 pm'; you do not need to work out the calendar date yourself.
+            When the user says what they need and roughly when, call find_and_book once instead of fetching experts and slots separately.
             Do not read ,refer asterisk symbol in any context.
             This is a voice conversation — speak naturally, clearly, and concisely. 
             When the user says hello or greets you, don’t just respond with a greeting — use it as an opportunity to move things forward. 
             For example, follow up with a helpful question like: 'Would you like to book a time?' 
             "Always keep the conversation flowing — be proactive, human, and focused on helping the user schedule with ease."
-            If you are proccesing a request then just say let me think or proccesing your request or fetching data wait a moment etc
-            Dont go completely silent when generating response.
+            A short acknowledgement is played automatically while slow requests run, so do not announce that you are fetching data.
             You always ask questions one at a time.
             You warmly greet users, offer a friendly welcome, and are ready to assist with scheduling. 
             You ask details to the user one at a time
@@ -116,7 +219,11 @@ class AppointmentSchedulingAssistant(Agent):
             Your responses should be clear, concise, and to the point, without complex formatting. You are curious, friendly, and have a sense of humor. Your goal is to provide a smooth and efficient user experience for scheduling meetings with experts.
             Your responses are clear, concise, and to the point, without complex formatting or punctuation or emojis . You are curious, friendly, 
             and have a sense of humor. Your goal is to provide a smooth and efficient user experience for all meeting scheduling needs"""
-        super().__init__(instructions=self.base_instructions)
+        self.instruction_builder = InstructionBuilder(self.base_instructions)
+        self.instruction_builder.set_section("datetime", self._datetime_section())
+        super().__init__(instructions=self.instruction_builder.build())
+        # The LLM sees only the tools for the current phase of the call; see on_user_turn_completed
+        self.tool_phases = ToolPhases(self.tools)
 
     @property
     def agent_session(self) -> Optional[AgentSession]:
@@ -128,36 +235,99 @@ class AppointmentSchedulingAssistant(Agent):
 
     async def tts_node(self, text: AsyncIterable[str], model_settings: ModelSettings):
         async def process_text():
-            async for chunk in text:
-                # Remove markdown formatting
-                modified_chunk = chunk.replace("*", "").replace("_", "").replace("#", "")
-                yield modified_chunk
+            # Markdown, emoji, URLs and timestamps made speakable, one clause at a time
+            chunker = SpeechChunker()
+            async for delta in text:
+                for chunk in chunker.push(delta):
+                    yield chunk
+            tail = chunker.flush()
+            if tail:
+                yield tail
 
         return Agent.default.tts_node(self, process_text(), model_settings)
 
-    async def append_instructions(self, additional_instructions: str):
-        """Append new instructions to existing ones."""
-        current_instructions = self.base_instructions
-        new_instructions = f"{current_instructions}\n\nAdditional instructions: {additional_instructions}"
+    @staticmethod
+    def _datetime_section() -> str:
+        # Day granularity: the section is refreshed every turn, and a clock
+        # here would change the system prompt (and miss the provider's prompt
+        # cache for the whole history) once a minute. get_current_date has the time.
+        now = datetime.datetime.now(datetime.timezone.utc).astimezone()  # Timezone-aware
+        return (f"The current date is {now.strftime('%A, %B %d, %Y')} ({now.strftime('%Z')}). "
+                "Call get_current_date for the time of day.")
+
+    async def refresh_instructions(self, **sections: Optional[str]) -> None:
+        """Replace instruction sections (profile, memory) and refresh the date.
+
+        Only pushes new instructions to the LLM when something changed.
+        """
+        changed = self.instruction_builder.set_section("datetime", self._datetime_section())
+        for name, text in sections.items():
+            changed = self.instruction_builder.set_section(name, text) or changed
+        if not changed:
+            return
         try:
-            await self.update_instructions(new_instructions)
-            logger.info("Instructions updated for agent.")
+            await self.update_instructions(self.instruction_builder.build())
+            logger.info(f"Instructions updated for agent: {self.instruction_builder.token_counts()}")
         except Exception:
             logger.exception("Failed to update instructions.")
-        self.base_instructions = new_instructions  # Keep track for future appends
+
+    async def on_enter(self) -> None:
+        await self.apply_tool_phase()
+
+    async def apply_tool_phase(self) -> None:
+        """Hand the LLM the current phase's tools if they changed."""
+        tools = self.tool_phases.take_update()
+        if tools is None:
+            return
+        try:
+            await self.update_tools(tools)
+            logger.info(f"Tool phase '{self.tool_phases.phase}': {len(tools)} tools, "
+                        f"{self.tool_phases.tokens()} of {self.tool_phases.all_tokens()} schema tokens")
+        except Exception:
+            logger.exception("Failed to update tools.")
+
+    async def on_user_turn_completed(self, turn_ctx, new_message) -> None:
+        self.tool_budget.reset()
+        await self.refresh_instructions()
+        session = self.agent_session
+        booking_intent = session.userdata.booking_intent if session is not None else None
+        self.tool_phases.on_user_turn(new_message.text_content or "", booking_intent)
+        await self.apply_tool_phase()
+
+        # Report what this turn's prompt costs before the LLM sees it.
+        history = 0
+        for item in turn_ctx.items:
+            if item.type == "message" and item.role != "system":
+                history += count_tokens(item.text_content)
+            elif item.type == "function_call":
+                history += count_tokens(item.arguments)
+            elif item.type == "function_call_output":
+                history += count_tokens(item.output)
+        instructions = self.instruction_builder.token_counts()["total"]
+        tools = self.tool_phases.tokens()
+        PROMPT_TOKENS.observe(instructions, part="instructions")
+        PROMPT_TOKENS.observe(history, part="history")
+        PROMPT_TOKENS.observe(tools, part="tools")
+        logger.debug(f"Prompt tokens this turn: instructions={instructions} history={history} tools={tools}")
 
     @function_tool
+    @timed_tool
+    @shaped_result()
     async def lookup_weather(self, context: RunContext_T, location: str):
         logger.info(f"Looking up weather for {location}")
         return "sunny with a temperature of 70 degrees."
 
     @function_tool
+    @timed_tool
+    @shaped_result(EXPERTS)
     async def fetch_experts(self, context: RunContext_T, user_requirement: str):
         logger.info(f"Fetching experts for user requirement: {user_requirement}")
-        experts_db = db.get_all_experts()
+        experts_db = experts.all()
         return experts_db
 
     @function_tool
+    @timed_tool
+    @shaped_result()
     async def get_the_summary_of_user_info(self, context: RunContext_T) -> str:
         name = getattr(context.userdata, "user_name", None) or "Unknown"
         age = getattr(context.userdata, "user_age", None) or "N/A"
@@ -165,18 +335,110 @@ class AppointmentSchedulingAssistant(Agent):
         return f"User's Name is {name}, Age is {age}, Gender is {gender}."
 
     @function_tool
+    @timed_tool
+    @shaped_result()
     async def get_current_date(self, context: RunContext_T) -> str:
         now = datetime.datetime.now()
         return now.strftime("%A, %B %d, %Y at %I:%M %p")
 
+    @function_tool
+    @timed_tool
+    @shaped_result()
+    async def resolve_time(self, context: RunContext_T, expression: str, timezone: str = "Asia/Kolkata") -> str:
+        """Turn a spoken date or time ("next Tuesday afternoon", "tomorrow at 3") into the exact time or window it means."""
+        window = resolve(expression, timezone)
+        if window is None:
+            return f"'{expression}' does not name a date or time. Ask the user when they would like to meet."
+        spoken = window.describe()
+        if window.past:
+            return f"'{expression}' is {spoken}, which has already passed. Ask for a future time."
+        kind = "exactly" if window.exact else "any time from"
+        return (f"'{expression}' is {spoken} ({kind} {window.start.isoformat()}"
+                f"{'' if window.exact else ' to ' + window.end.isoformat()}).")
+
     async def save_meeting_in_db(self, event_id: str, user_id: int, expert_id: int, title: str, start_time: str, end_time: str, attendees: list[str]):
         db.create_appointment(event_id, user_id, expert_id, title, start_time, end_time)
         return "meeting saved successfully"
 
+    @staticmethod
+    async def _upcoming_meetings(context: RunContext_T, max_results: int) -> list:
+        """Upcoming meetings from the session prefetch when fresh, else from the calendar."""
+        prefetch = context.userdata.prefetch
+        if prefetch is not None:
+            events = await prefetch.upcoming_meetings(max_results)
+            if events is not None:
+                return events
+        return await asyncio.to_thread(
+            calendar_service.list_meetings, max_results=max_results, user_id=context.userdata.user_id
+        )
+
+    async def _book(self, context: RunContext_T, expert: dict, title: str, start_dt: datetime.datetime,
+                    end_dt: datetime.datetime, timezone: str, attendees: List[str]) -> str:
+        """Commit a checked slot and confirm it; shared by ``schedule_meeting`` and ``find_and_book``."""
+        start_utc = start_dt.astimezone(pytz.UTC)
+        end_utc = end_dt.astimezone(pytz.UTC)
+        try:
+            # Commit the booking locally and let the outbox create the calendar
+            # event in the background; the caller doesn't wait on Google.
+            # uuid4 hex is valid base32hex, so it doubles as the calendar event ID.
+            event_id = uuid.uuid4().hex
+            save_result = await asyncio.to_thread(
+                db.create_appointment,
+                event_id=event_id,
+                user_id=context.userdata.user_id,
+                expert_id=expert["id"],
+                title=title,
+                start_time=start_utc.isoformat(),
+                end_time=end_utc.isoformat(),
+                calendar_payload={
+                    "summary": title,
+                    "start": start_dt.isoformat(),
+                    "end": end_dt.isoformat(),
+                    "attendees": attendees,
+                    "timezone": timezone,
+                },
+            )
+            if save_result is None:
+                raise RuntimeError("Appointment could not be saved.")
+            outbox.wake()
+            self._invalidate_prefetch(context, "meetings", "appointments", "usual_slots")
+            context.userdata.booking_intent = None
+            if context.userdata.holds is not None:
+                await context.userdata.holds.release()
+
+            confirmation_message = (
+                f"Meeting '{title}' successfully booked with {expert['name']}.\n"
+                f"Time: {start_dt.strftime('%A, %B %d at %I:%M %p %Z')}\n"
+                f"Attendees: {', '.join(attendees)}\n"
+                "The booking is saved. A calendar invite is being sent by email and may take a few minutes to arrive."
+            )
+            return confirmation_message
+
+        except Exception as exc:
+            raise RuntimeError("An unexpected error occurred while scheduling the meeting.") from exc
+
+    @staticmethod
+    def _holder(context: RunContext_T) -> Optional[str]:
+        holds = context.userdata.holds
+        return holds.holder if holds is not None else None
+
+    @staticmethod
+    async def _hold(context: RunContext_T, expert_id: int, slots: list) -> list:
+        """Hold offered ``(start, end)`` slots for this caller; returns the ones still free to offer."""
+        if context.userdata.holds is None:
+            return slots
+        held = await context.userdata.holds.hold([(expert_id, start, end) for start, end in slots])
+        return [(start, end) for _, start, end in held]
+
+    @staticmethod
+    def _invalidate_prefetch(context: RunContext_T, *keys: str) -> None:
+        if context.userdata.prefetch is not None:
+            context.userdata.prefetch.invalidate(*keys)
+
     async def handle_track_subscribed(self, track, publication, participant):
         """
         Handle room track_subscribed events. Uses internal _agent_session backing field.
-        This method schedules any heavy async work (DB/IO) using asyncio.create_task to avoid blocking.
+        Setup runs once per participant and session GUID; later tracks share its result.
         """
         try:
             sess = self.agent_session
@@ -194,77 +456,121 @@ class AppointmentSchedulingAssistant(Agent):
                 except Exception:
                     logger.exception("[handle_track_subscribed] Failed to parse participant.metadata")
 
-            # populate userdata on agent_session
-            userdata = sess.userdata
-            userdata.user_name = participant.name
-            userdata.user_email = participant.identity
-            userdata.session_guid = session_guid
+            await sess.userdata.participants.ensure(
+                (participant.identity, session_guid),
+                lambda: self._init_participant(sess, participant, session_guid),
+            )
 
-            # try lookup in DB only when we have an email/identity
-            if userdata.user_email:
-                try:
-                    user_id = db.get_user_by_email(userdata.user_email)
-                    if user_id:
-                        userdata.user_id = user_id
-                        transcript = db.get_transcription(user_id)
-                        userdata.last_conversation_for_reference = transcript
-                    else:
-                        logger.info(f"[handle_track_subscribed] No user row for email {userdata.user_email}")
-                except Exception:
-                    logger.exception("[handle_track_subscribed] DB lookup failed")
-
-            # defaults
-            if userdata.user_age is None:
-                userdata.user_age = 25
-            if userdata.user_gender is None:
-                userdata.user_gender = "MALE"
-                        # proactively greet the user once per session
+        except Exception:
+            logger.exception("[handle_track_subscribed] Unexpected error")
+
+    async def _init_participant(self, sess: AgentSession, participant, session_guid: Optional[str]) -> None:
+        """Load the participant's profile, start the prefetch, greet and set instructions."""
+        # populate userdata on agent_session
+        userdata = sess.userdata
+        userdata.user_name = participant.name
+        userdata.user_email = participant.identity
+        userdata.session_guid = session_guid
+        if userdata.loop_tags is not None and session_guid:
+            userdata.loop_tags["session"] = session_guid
+
+        # A rejoin of a call this or another worker checkpointed picks up where it left off
+        if session_guid:
+            started = time.perf_counter()
+            userdata.checkpoint = SessionCheckpointer(db, session_guid)
+            state = await userdata.checkpoint.load()
+            if state is not None:
+                await self._resume(sess, state)
+                RESUME_SECONDS.observe(time.perf_counter() - started)
+                logger.info(f"[handle_track_subscribed] Resumed session {session_guid} "
+                            f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+                return
+
+        # try lookup in DB only when we have an email/identity
+        known = False
+        if userdata.user_email:
             try:
-                #if not getattr(userdata, "greeted", False):
-                #    userdata.greeted = True
-                    greeting = (
-                        f"Hi {userdata.user_name or 'there'}. "
-                        "Welcome back. I can help you schedule meetings — would you like to book a time?"
-                    )
-                    sess = self.agent_session
-                    if sess and hasattr(sess, "generate_reply"):
-                        # schedule coroutine so we don't block the handler
-                        asyncio.create_task(sess.generate_reply(instructions=greeting))
-                    else:
-                        logger.debug("[handle_track_subscribed] session not ready or no generate_reply available")
+                # Cached per process, so a reconnect within USER_PROFILE_TTL skips the DB
+                user = await asyncio.to_thread(profiles.get, userdata.user_email)
+                if user:
+                    known = True
+                    userdata.user_id = user.user_id
+                    # Warm meetings, appointments and slots while the greeting plays
+                    if userdata.prefetch is None:
+                        userdata.prefetch = SessionPrefetcher(db, calendar_service, experts, tasks=userdata.tasks)
+                    userdata.prefetch.start(user.user_id)
+                    userdata.last_conversation_for_reference = user.last_conversation
+                else:
+                    logger.info(f"[handle_track_subscribed] No user row for email {userdata.user_email}")
             except Exception:
-                logger.exception("[handle_track_subscribed] failed to send proactive greeting")
+                logger.exception("[handle_track_subscribed] DB lookup failed")
+
+        # defaults
+        if userdata.user_age is None:
+            userdata.user_age = 25
+        if userdata.user_gender is None:
+            userdata.user_gender = "MALE"
+        # proactively greet the user once per session
+        try:
+            if not userdata.greeted:
+                userdata.greeted = True
+                greeting = named_greeting(userdata.user_name) if known else None
+                if greeting is not None:
+                    # Returning caller: by name, through TTS (no LLM)
+                    sess.say(greeting)
+                elif self.phrases is not None:
+                    # cached clip plays instantly; no LLM or TTS round trip
+                    self.phrases.play(sess, "greeting")
+                else:
+                    sess.say(PHRASES["greeting"])
+        except Exception:
+            logger.exception("[handle_track_subscribed] failed to send proactive greeting")
 
-            # Build short contextual instructions
-            instructions = (
-                f"You are assisting {userdata.user_name or 'Unknown'}, "
-                f"a {userdata.user_age}-year-old {userdata.user_gender}. "
-                f"users email is {userdata.user_email or 'Unknown'}. Use this mail only as attendees mail while scheduling meetings. "
+        # Build short contextual instructions
+        profile = (
+            f"You are assisting {userdata.user_name or 'Unknown'}, "
+            f"a {userdata.user_age}-year-old {userdata.user_gender}. "
+            f"users email is {userdata.user_email or 'Unknown'}. Use this mail only as attendees mail while scheduling meetings. "
+        )
+        # The framing above it is added by the instruction builder
+        memory = userdata.last_conversation_for_reference or None
+
+        # schedule refresh_instructions so the event loop isn't blocked
+        userdata.tasks.spawn(self.refresh_instructions(profile=profile, memory=memory), "refresh-instructions")
+        logger.info(f"[handle_track_subscribed] Updated instructions for {userdata.user_name}")
+        self.checkpoint(userdata)
+
+    async def _resume(self, sess: AgentSession, state: dict) -> None:
+        """Restore a checkpointed call: user data, instructions and prefetch; no lookup or greeting."""
+        userdata = sess.userdata
+        sections = restore(userdata, state)
+        if userdata.user_id:
+            if userdata.prefetch is None:
+                userdata.prefetch = SessionPrefetcher(db, calendar_service, experts, tasks=userdata.tasks)
+            userdata.prefetch.start(userdata.user_id)
+        await self.refresh_instructions(**sections, resume=resume_section(state))
+
+    def checkpoint(self, userdata: UserData) -> None:
+        """Save this call's state in the background (no-op before the session GUID is known)."""
+        if userdata.checkpoint is not None:
+            userdata.tasks.spawn(
+                userdata.checkpoint.save(lambda: capture(userdata, self.instruction_builder.sections())),
+                "checkpoint",
             )
-            if userdata.last_conversation_for_reference:
-                instructions += (
-                    "Here is the last conversation for context:\n"
-                    "Pick only the key terms from this text and use them as memory "
-                    "while talking with the user:\n"
-                    f"{userdata.last_conversation_for_reference}\n"
-                )
-
-            # schedule append_instructions so the event loop isn't blocked
-            asyncio.create_task(self.append_instructions(instructions))
-            logger.info(f"[handle_track_subscribed] Appended instructions for {userdata.user_name}")
-
-        except Exception:
-            logger.exception("[handle_track_subscribed] Unexpected error")
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result()
     async def schedule_meeting(
         self,
         context: "RunContext_T",
         title: str,
         expert_id: int,
         start_time: str,
-        end_time: str,
-        timezone: str = "Asia/Kolkata"
+        end_time: str = "",
+        timezone: str = "Asia/Kolkata",
+        duration_minutes: int = 30
     ) -> str:
         import pytz
         import datetime
@@ -274,35 +580,39 @@ class AppointmentSchedulingAssistant(Agent):
         else:
             attendees = []
 
-        if not all([title, start_time, end_time, attendees]):
+        if not all([title, start_time, attendees]):
             raise ValueError("Missing one or more required arguments.")
 
-        tz = pytz.timezone(timezone)
-        try:
-            # parse start
-            dt_start_obj = datetime.datetime.fromisoformat(start_time)
-            if dt_start_obj.tzinfo is None:
-                start_dt = tz.localize(dt_start_obj)
-            else:
-                start_dt = dt_start_obj.astimezone(tz)
-            # parse end
-            dt_end_obj = datetime.datetime.fromisoformat(end_time)
-            if dt_end_obj.tzinfo is None:
-                end_dt = tz.localize(dt_end_obj)
-            else:
-                end_dt = dt_end_obj.astimezone(tz)
-        except Exception as e:
-            raise ValueError(f"Invalid datetime format. Could not parse '{start_time}'. Error: {e}")
+        tz = get_zone(timezone)
+        # ISO or what the user said ("tomorrow at 3 pm"); a vague time can't be booked
+        start_window = resolve_when(start_time, timezone, duration_minutes=duration_minutes)
+        if start_window is None:
+            raise ToolError(f"Could not understand the start time '{start_time}'. Ask the user for a day and time.")
+        if start_window.past:
+            return f"'{start_time}' is {start_window.describe()}, which has already passed. Ask for a future time."
+        if not start_window.exact:
+            return (f"'{start_time}' means {start_window.describe()}. Ask the user for an exact time "
+                    "in that window, or suggest slots for it.")
+        start_dt = start_window.start
+        end_dt = parse_when(end_time, timezone) if end_time else start_dt + datetime.timedelta(minutes=duration_minutes)
+        if end_dt <= start_dt:
+            raise ValueError(f"The end time '{end_time}' is not after the start time '{start_time}'.")
 
         start_utc = start_dt.astimezone(pytz.UTC)
         end_utc = end_dt.astimezone(pytz.UTC)
 
-        expert = db.get_expert(expert_id)
+        expert = experts.get(expert_id)
         if not expert:
             return f"No expert found with id {expert_id}."
-
-        if not db.is_within_availability(expert_id, start_utc, end_utc) or db.has_conflict(expert_id, start_utc, end_utc):
-            suggested_slots_utc = db.suggest_next_available_slots(expert_id, start_utc)
+        context.userdata.booking_intent = {
+            "expert": expert["name"], "expert_id": expert_id, "title": title,
+            "start_time": start_dt.isoformat(), "end_time": end_dt.isoformat(), "timezone": timezone,
+        }
+
+        holder = self._holder(context)
+        if not db.is_within_availability(expert_id, start_utc, end_utc) or db.has_conflict(expert_id, start_utc, end_utc, holder):
+            suggested_slots_utc = db.suggest_next_available_slots(expert_id, start_utc, holder=holder)
+            suggested_slots_utc = await self._hold(context, expert_id, suggested_slots_utc)
             if suggested_slots_utc:
                 slots_text_parts = []
                 for start, end in suggested_slots_utc:
@@ -313,38 +623,99 @@ class AppointmentSchedulingAssistant(Agent):
             else:
                 return f"Expert {expert['name']} is not available at the requested time, and no other suitable slots could be found nearby."
 
-        try:
-            event_id = calendar_service.create_meeting(
-                summary=title,
-                start_time=start_dt.isoformat(),
-                end_time=end_dt.isoformat(),
-                attendees=attendees,
-                timezone=timezone,
-            )
+        return await self._book(context, expert, title, start_dt, end_dt, timezone, attendees)
 
-            if isinstance(event_id, tuple):
-                event_id = event_id[0]
+    @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result()
+    async def find_and_book(
+        self,
+        context: "RunContext_T",
+        requirement: str,
+        when: str,
+        duration_minutes: int = 30,
+        title: str = "",
+        expert_id: int = 0,
+        book_earliest: bool = False,
+        timezone: str = "Asia/Kolkata"
+    ) -> str:
+        """Find an expert for what the user needs and a free slot at the time they asked for, in one step.
 
-            save_result = db.create_appointment(
-                event_id=event_id,
-                user_id=context.userdata.user_id,
-                expert_id=expert_id,
-                title=title,
-                start_time=start_utc.isoformat(),
-                end_time=end_utc.isoformat(),
-            )
+        Books straight away when the user named an exact time that is free (or with ``book_earliest``);
+        otherwise returns the best few options to offer.
+        """
+        attendees = [context.userdata.user_email] if context.userdata.user_email else []
+        if not attendees:
+            return "I need the user's email before booking. Ask for it first."
+
+        window = resolve_when(when, timezone, duration_minutes=duration_minutes)
+        if window is None:
+            return f"'{when}' does not name a date or time. Ask the user when they would like to meet."
+        if window.past:
+            return f"'{when}' is {window.describe()}, which has already passed. Ask for a future time."
+
+        if expert_id:
+            expert = experts.get(expert_id)
+            if not expert:
+                return f"No expert found with id {expert_id}."
+            matches = [(1.0, expert)]
+        else:
+            matches = match_experts(requirement, experts.all())
+        if not matches:
+            specialties = sorted({e["specialty"] for e in experts.all() if e.get("specialty")})
+            return (f"No expert matches '{requirement}'. Available specialties: {', '.join(specialties)}. "
+                    "Ask the user which one they need.")
 
-            confirmation_message = (
-                f"Meeting '{title}' successfully created with {expert['name']}.\n"
-                f"Time: {start_dt.strftime('%A, %B %d at %I:%M %p %Z')}\n"
-                f"Attendees: {', '.join(attendees)}"
-            )
-            return confirmation_message
+        async def caller_meetings() -> list:
+            try:
+                return await self._upcoming_meetings(context, 20)
+            except CalendarUnavailableError as exc:
+                logger.warning(f"Calendar unavailable for find_and_book; not checking the caller's meetings: {exc}")
+            except Exception:
+                logger.exception("Could not read the caller's meetings for find_and_book")
+            return []
 
-        except Exception as exc:
-            raise RuntimeError("An unexpected error occurred while scheduling the meeting.") from exc
+        # The slot search for every matched expert and the caller's own calendar run together
+        slots, events = await asyncio.gather(
+            find_slot_options(db, matches, window, duration_minutes, timezone, holder=self._holder(context)),
+            caller_meetings(),
+        )
+        options = without_conflicts(slots, busy_intervals(events))
+        if not options:
+            names = ", ".join(expert["name"] for _, expert in matches)
+            return f"No free slots found with {names} from {window.describe()} onwards."
+
+        best = options[0]
+        title = title or f"{best.expert.get('specialty') or 'Consultation'} with {best.expert['name']}"
+        if book_earliest or (window.exact and best.start == window.start):
+            return await self._book(context, best.expert, title, best.start, best.end, timezone, attendees)
+
+        choices = options[:3]
+        if context.userdata.holds is not None:
+            held = {(expert_id, start) for expert_id, start, _ in
+                    await context.userdata.holds.hold([(o.expert["id"], o.start, o.end) for o in choices])}
+            choices = [o for o in choices if (o.expert["id"], o.start) in held]
+            if not choices:
+                return "Those slots were just offered to another caller. Ask the user for another time."
+        context.userdata.booking_intent = {
+            "requirement": requirement, "when": when, "title": title, "timezone": timezone,
+            "duration_minutes": duration_minutes,
+            "options": [{"expert_id": o.expert["id"], "start_time": o.start.isoformat()} for o in choices],
+        }
+        lines = [
+            f"- {o.expert['name']} ({o.expert.get('specialty') or 'expert'}, expert_id {o.expert['id']}): "
+            f"{o.start.strftime('%A, %b %d at %I:%M %p')} (start_time {o.start.isoformat()})"
+            for o in choices
+        ]
+        lead = "" if best.in_window else f"Nothing is free {window.describe()}. "
+        return (f"{lead}Best options:\n" + "\n".join(lines) +
+                "\nOffer these; book the one the user picks with schedule_meeting.")
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result()
     async def suggest_slots_for_expert(
         self,
         context: "RunContext_T",
@@ -355,34 +726,38 @@ class AppointmentSchedulingAssistant(Agent):
         limit: int = 3
     ) -> str:
         import pytz
-        import datetime
 
         if not expert_id or not desired_start:
             raise ValueError("Missing required arguments: expert_id or desired_start.")
 
-        tz = pytz.timezone(timezone)
-
-        try:
-            dt_desired = datetime.datetime.fromisoformat(desired_start)
-            if dt_desired.tzinfo is None:
-                desired_dt = tz.localize(dt_desired)
-            else:
-                desired_dt = dt_desired.astimezone(tz)
-        except Exception as e:
-            raise ValueError(f"Invalid datetime format for desired_start: {e}")
+        tz = get_zone(timezone)
+        # ISO or what the user said; "next Tuesday afternoon" searches from the window's start
+        desired_dt = parse_when(desired_start, timezone)
 
         desired_start_utc = desired_dt.astimezone(pytz.UTC)
 
-        expert = db.get_expert(expert_id)
+        expert = experts.get(expert_id)
         if not expert:
             return f"No expert found with id {expert_id}."
-
-        suggested_slots_utc = db.suggest_next_available_slots(
-            expert_id,
-            desired_start_utc,
-            duration_minutes=duration_minutes,
-            limit=limit
-        )
+        context.userdata.booking_intent = {
+            "expert": expert["name"], "expert_id": expert_id, "desired_start": desired_dt.isoformat(),
+            "timezone": timezone, "duration_minutes": duration_minutes,
+        }
+
+        prefetch = context.userdata.prefetch
+        suggested_slots_utc = None
+        if prefetch is not None:
+            suggested_slots_utc = await prefetch.usual_slots(expert_id, desired_start_utc, duration_minutes, limit)
+        if suggested_slots_utc is None:
+            suggested_slots_utc = db.suggest_next_available_slots(
+                expert_id,
+                desired_start_utc,
+                duration_minutes=duration_minutes,
+                limit=limit,
+                holder=self._holder(context)
+            )
+        # Keep them for this caller until they pick one; prefetched slots another call holds drop out here
+        suggested_slots_utc = await self._hold(context, expert_id, suggested_slots_utc)
 
         if not suggested_slots_utc:
             return f"No available slots found for expert {expert['name']} after {desired_dt.strftime('%I:%M %p on %b %d')}."
@@ -399,6 +774,9 @@ class AppointmentSchedulingAssistant(Agent):
         return f"Here are the next available time slots for expert {expert['name']}:\n{formatted_text}"
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result(MEETINGS)
     async def list_meetings_by_date(
         self,
         context: "RunContext_T",
@@ -407,9 +785,12 @@ class AppointmentSchedulingAssistant(Agent):
     ) -> List[dict] | str:
         if not date or not isinstance(date, str):
             raise ValueError("A valid date string (YYYY-MM-DD) must be provided.")
+        if not re.match(r"\d{4}-\d{2}-\d{2}", date):
+            # "tomorrow", "next Friday"
+            date = parse_when(date).date().isoformat()
 
         try:
-            events = calendar_service.list_meetings(max_results=max_results)
+            events = await self._upcoming_meetings(context, max_results)
             if not events:
                 logger.info("No events returned from calendar service.")
                 return f"No meetings found on {date}."
@@ -445,6 +826,10 @@ class AppointmentSchedulingAssistant(Agent):
             logger.error("Invalid date input for list_meetings_by_date: %s", exc)
             raise
 
+        except CalendarUnavailableError as exc:
+            logger.warning("Calendar unavailable for list_meetings_by_date: %s", exc)
+            return CALENDAR_UNAVAILABLE_MESSAGE
+
         except Exception as exc:
             logger.exception("Error listing meetings for date %s: %s", date, exc)
             raise RuntimeError(
@@ -452,6 +837,9 @@ class AppointmentSchedulingAssistant(Agent):
             ) from exc
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result(MEETINGS)
     async def list_meetings(
         self,
         context: RunContext_T,
@@ -459,7 +847,7 @@ class AppointmentSchedulingAssistant(Agent):
     ):
         try:
             logger.info(f"[list_meetings] Fetching up to {max_results} upcoming meetings from Google Calendar.")
-            events = calendar_service.list_meetings(max_results)
+            events = await self._upcoming_meetings(context, max_results)
             logger.debug(f"[list_meetings] Raw events received: {events}")
 
             if not events or len(events) == 0:
@@ -481,11 +869,18 @@ class AppointmentSchedulingAssistant(Agent):
             logger.info(f"[list_meetings] Successfully fetched {len(formatted_meetings)} upcoming meetings.")
             return formatted_meetings
 
+        except CalendarUnavailableError as e:
+            logger.warning(f"[list_meetings] Calendar unavailable: {e}")
+            return CALENDAR_UNAVAILABLE_MESSAGE
+
         except Exception as e:
             logger.error(f"[list_meetings] Error fetching meetings: {str(e)}", exc_info=True)
             return f"An error occurred while fetching meetings: {str(e)}"
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result(MEETINGS)
     async def cancel_meeting(
         self,
         context: RunContext_T,
@@ -496,17 +891,22 @@ class AppointmentSchedulingAssistant(Agent):
         try:
             if event_id:
                 logger.info(f"[cancel_meeting] Cancelling meeting with ID: {event_id}")
-                success = calendar_service.cancel_meeting(event_id)
+                success = await asyncio.to_thread(
+                    calendar_service.cancel_meeting, event_id, user_id=context.userdata.user_id
+                )
                 if success:
+                    self._invalidate_prefetch(context, "meetings", "usual_slots")
                     logger.info(f"[cancel_meeting] Meeting {event_id} successfully cancelled.")
-                    return f"✅ Meeting {event_id} cancelled."
+                    return f"Meeting {event_id} cancelled."
                 else:
                     logger.warning(f"[cancel_meeting] Failed to cancel meeting {event_id}.")
-                    return f"❌ Failed to cancel meeting {event_id}."
+                    return f"Failed to cancel meeting {event_id}."
 
             if date:
                 logger.info(f"[cancel_meeting] Listing meetings on date: {date}")
-                events = calendar_service.list_meetings(max_results=100)
+                events = await asyncio.to_thread(
+                    calendar_service.list_meetings, max_results=100, user_id=context.userdata.user_id
+                )
                 meetings_on_date = [
                     {
                         "id": event["id"],
@@ -528,13 +928,16 @@ class AppointmentSchedulingAssistant(Agent):
                         event_id_to_cancel = event_to_cancel['id']
                         summary = event_to_cancel['summary']
                         logger.info(f"[cancel_meeting] Cancelling meeting '{summary}' with ID {event_id_to_cancel}")
-                        success = calendar_service.cancel_meeting(event_id_to_cancel)
+                        success = await asyncio.to_thread(
+                            calendar_service.cancel_meeting, event_id_to_cancel, user_id=context.userdata.user_id
+                        )
                         if success:
+                            self._invalidate_prefetch(context, "meetings", "usual_slots")
                             logger.info(f"[cancel_meeting] Meeting '{summary}' cancelled successfully.")
-                            return f"✅ Meeting '{summary}' with ID {event_id_to_cancel} cancelled."
+                            return f"Meeting '{summary}' with ID {event_id_to_cancel} cancelled."
                         else:
                             logger.warning(f"[cancel_meeting] Failed to cancel meeting '{summary}' with ID {event_id_to_cancel}.")
-                            return f"❌ Failed to cancel meeting with ID {event_id_to_cancel}."
+                            return f"Failed to cancel meeting with ID {event_id_to_cancel}."
                     else:
                         logger.warning(f"[cancel_meeting] Invalid ordinal {ordinal} provided.")
                         return f"Invalid choice. Please provide a number between 1 and {len(meetings_on_date)}."
@@ -549,11 +952,18 @@ class AppointmentSchedulingAssistant(Agent):
             logger.info("[cancel_meeting] No event_id or date provided; requesting more info from user.")
             return "Could you please provide the meeting ID or the date of the meeting you'd like to cancel?"
 
+        except CalendarUnavailableError as e:
+            logger.warning(f"[cancel_meeting] Calendar unavailable: {e}")
+            return CALENDAR_UNAVAILABLE_MESSAGE
+
         except Exception as e:
             logger.error(f"[cancel_meeting] Error cancelling meeting: {str(e)}", exc_info=True)
             return f"An error occurred while cancelling the meeting: {str(e)}"
 
     @function_tool
+    @timed_tool
+    @speaks_filler()
+    @shaped_result()
     async def reschedule_meeting(
         self,
         context: RunContext_T,
@@ -568,14 +978,21 @@ class AppointmentSchedulingAssistant(Agent):
                 logger.warning("[reschedule_meeting] Missing required arguments.")
                 return "Please provide the meeting ID, new start time, and new end time."
 
-            link = calendar_service.reschedule_meeting(event_id, new_start, new_end)
+            link = await asyncio.to_thread(
+                calendar_service.reschedule_meeting, event_id, new_start, new_end, user_id=context.userdata.user_id
+            )
 
             if link:
+                self._invalidate_prefetch(context, "meetings", "usual_slots")
                 logger.info(f"[reschedule_meeting] Meeting {event_id} successfully rescheduled.")
-                return f"✅ Meeting successfully rescheduled. Updated link: {link}"
+                return "Meeting successfully rescheduled."
             else:
                 logger.warning(f"[reschedule_meeting] Failed to reschedule meeting {event_id}.")
-                return f"❌ Failed to reschedule meeting {event_id}."
+                return f"Failed to reschedule meeting {event_id}."
+
+        except CalendarUnavailableError as e:
+            logger.warning(f"[reschedule_meeting] Calendar unavailable: {e}")
+            return CALENDAR_UNAVAILABLE_MESSAGE
 
         except Exception as e:
             logger.error(f"[reschedule_meeting] Error rescheduling meeting {event_id}: {str(e)}", exc_info=True)
@@ -584,42 +1001,87 @@ class AppointmentSchedulingAssistant(Agent):
 
 def prewarm(proc: JobProcess):
     """
-    Robust prewarm: attempt to load VAD but don't allow exceptions to kill the child process.
+    Robust prewarm: load models and process-wide resources once per job process,
+    so the first turn of a call is as fast as the hundredth. A failing component
+    is logged and skipped rather than killing the child process.
     """
+    start = time.perf_counter()
+    # Plugins register on import and must be loaded on the main thread, i.e. here.
+    _timed_init("plugins", voice_plugins.preload)
     try:
-        proc.userdata["vad"] = silero.VAD.load()
+        proc.userdata["vad"] = _timed_init("vad", voice_plugins.load_vad)
         logger.info("silero VAD loaded in prewarm.")
     except Exception:
         logger.exception("prewarm failed; continuing without VAD.")
         proc.userdata["vad"] = None
 
+    try:
+        proc.userdata["turn_detector"] = _timed_init("turn_detector", MultilingualModel)
+        proc.userdata["noise_cancellation"] = voice_plugins.build_noise_cancellation()
+    except Exception:
+        logger.exception("Turn detector prewarm failed; it will be created per job.")
+
+    try:
+        init_process_resources()
+    except Exception:
+        logger.exception("Resource prewarm failed; retrying when the first job starts.")
+
+    # Clips rendered at build time (download-files) or by an earlier job
+    phrases = PhraseCache(voice_plugins.tts_voice())
+    _timed_init("phrases", phrases.load)
+    proc.userdata["phrases"] = phrases
+
+    metrics_port = os.getenv("AGENT_METRICS_PORT")
+    if metrics_port:
+        proc.userdata["metrics_server"] = start_metrics_server(int(metrics_port))
+
+    # The worker only hands jobs to a process once prewarm returns.
+    ready = db is not None
+    PROCESS_READY.set(1 if ready else 0)
+    proc.userdata["ready"] = ready
+    logger.info(f"Job process prewarmed in {time.perf_counter() - start:.2f}s (ready={ready})")
+
 
 async def entrypoint(ctx: JobContext):
+    # No-op when prewarm succeeded
+    init_process_resources()
+
+    # Push any bookings still waiting for their calendar event
+    outbox.start()
+
+    # Latency samples for this call; tools, DB and calendar timings land here too
+    session_latency = SessionLatency()
+    bind_session(session_latency)
+
+    # Report anything that blocks the event loop, tagged with this room (and session later)
+    global loop_monitor
+    if loop_monitor is None:
+        loop_monitor = LoopMonitor.from_env()
+    if loop_monitor is not None:
+        loop_monitor.start()
+
+    # Lag and pending calls feed the worker's load score (see services.capacity)
+    load_reporter = JobLoadReporter()
+    load_reporter.start(ctx.room.name)
+
     # Initialize user data with context
-    userdata = UserData(ctx=ctx)
+    userdata = UserData(ctx=ctx, loop_tags=set_tags(room=ctx.room.name), tasks=TaskSupervisor(ctx.room.name),
+                        holds=SlotHolds(db, ctx.room.name))
+
+    # Opt-in call recording (AGENT_RECORDING_DIR)
+    recorder = CallRecorder.from_env(ctx.room.name)
+    if recorder is not None:
+        recorder.start()
 
     appointment_scheduling_assistant = AppointmentSchedulingAssistant(ctx)
     ctx.log_context_fields = {"room": ctx.room.name}
 
     session = AgentSession[UserData](
         userdata=userdata,
-        llm=openai.LLM.with_azure(
-            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-        ),
-        stt=azure.STT(
-            speech_key=os.getenv("AZURE_SPEECH_KEY"),
-            speech_region=os.getenv("AZURE_SPEECH_REGION"),
-            language="en-IN",
-        ),
-        tts=azure.TTS(
-            speech_key=os.getenv("AZURE_SPEECH_KEY"),
-            speech_region=os.getenv("AZURE_SPEECH_REGION"),
-            voice="en-IN-AartiNeural",
-        ),
-        turn_detection=MultilingualModel(),
+        llm=voice_plugins.build_llm(),
+        stt=voice_plugins.build_stt(),
+        tts=voice_plugins.build_tts(),
+        turn_detection=ctx.proc.userdata.get("turn_detector") or MultilingualModel(),
         vad=ctx.proc.userdata.get("vad"),
         preemptive_generation=True,
     )
@@ -627,24 +1089,115 @@ async def entrypoint(ctx: JobContext):
     # give the agent access to the session via backing field
     appointment_scheduling_assistant._agent_session = session
 
+    phrases = ctx.proc.userdata.get("phrases")
+    if phrases is None:
+        phrases = PhraseCache(voice_plugins.tts_voice())
+        phrases.load()
+    appointment_scheduling_assistant.phrases = phrases
+    if phrases.missing():
+        # Uncached phrases fall back to TTS until this finishes
+        userdata.tasks.spawn(phrases.render(session.tts), "render-phrases")
+
+    @session.on("function_tools_executed")
+    def _on_function_tools_executed(ev: FunctionToolsExecutedEvent):
+        for call, output in ev.zipped():
+            record_tool_call(userdata.tool_calls, call.name, call.arguments, output.output, output.is_error)
+            appointment_scheduling_assistant.tool_phases.after_tool(call.name, userdata.booking_intent)
+        appointment_scheduling_assistant.checkpoint(userdata)
+
+    @session.on("metrics_collected")
+    def _on_metrics_collected(ev: MetricsCollectedEvent):
+        metrics.log_metrics(ev.metrics)
+        record_pipeline_metrics(ev.metrics)
+        if ev.metrics.type == "llm_metrics":
+            # Provider-reported counts; "cached" shows how much of the prefix was reused.
+            PROMPT_TOKENS.observe(ev.metrics.prompt_tokens, part="reported")
+            PROMPT_TOKENS.observe(ev.metrics.prompt_cached_tokens, part="cached")
+
+    async def save_session_metrics():
+        if userdata.prefetch is not None:
+            userdata.prefetch.close()
+        session_guid = userdata.session_guid or ctx.room.name
+        await asyncio.to_thread(db.save_session_metrics, session_guid, userdata.user_id, session_latency.summary())
+
+    ctx.add_shutdown_callback(save_session_metrics)
+
+    async def checkpoint_session():
+        # Last state, in case this shutdown is a worker restart the caller will rejoin after
+        if userdata.checkpoint is not None:
+            await userdata.checkpoint.save(
+                lambda: capture(userdata, appointment_scheduling_assistant.instruction_builder.sections())
+            )
+
+    ctx.add_shutdown_callback(checkpoint_session)
+
+    async def close_session_tasks():
+        # Cancel this session's background work and report anything that won't stop
+        await userdata.tasks.aclose()
+
+    ctx.add_shutdown_callback(close_session_tasks)
+
+    if recorder is not None:
+        async def save_recording():
+            result = await recorder.aclose()
+            if result is None:
+                return
+            logger.info(
+                f"Recorded {result.duration_seconds:.1f}s to {result.path} ({result.size_bytes} bytes, "
+                f"encoder CPU {result.cpu_seconds:.2f}s, peak buffer {result.peak_buffer_bytes} bytes, "
+                f"{result.dropped_frames} frames dropped)"
+            )
+            session_guid = userdata.session_guid or ctx.room.name
+            await asyncio.to_thread(
+                db.save_conversation_audio, session_guid, userdata.user_id, result.path, result.duration_seconds
+            )
+
+        ctx.add_shutdown_callback(save_recording)
+
+    async def stop_load_reporter():
+        load_reporter.stop()
+
+    ctx.add_shutdown_callback(stop_load_reporter)
+
+    if loop_monitor is not None:
+        async def log_loop_blockers():
+            logger.info(f"Event-loop blockers in this process so far: {loop_monitor.report()}")
+
+        ctx.add_shutdown_callback(log_loop_blockers)
+
     # safe room-level handlers
     @ctx.room.on("participant_disconnected")
     def on_participant_disconnected(participant: rtc.RemoteParticipant):
         logger.info(f"User disconnected: {participant}")
+        if not ctx.room.remote_participants:
+            # Nobody left to serve; stop the work their session started
+            cancelled = userdata.tasks.cancel_all()
+            if cancelled:
+                logger.info(f"Cancelled {cancelled} background task(s) after the last participant left")
+            # and free the slots they were offered
+            userdata.tasks.spawn(userdata.holds.release(), "release-holds")
 
     # register track_subscribed to delegate to agent method
     @ctx.room.on("track_subscribed")
     def _room_track_subscribed(track, publication, participant):
-        asyncio.create_task(
-            appointment_scheduling_assistant.handle_track_subscribed(track, publication, participant)
+        userdata.tasks.spawn(
+            appointment_scheduling_assistant.handle_track_subscribed(track, publication, participant),
+            f"track-subscribed-{participant.identity}",
         )
+        if recorder is not None and track.kind == rtc.TrackKind.KIND_AUDIO:
+            userdata.tasks.spawn(recorder.record_track(track, participant.identity), f"record-{participant.identity}")
 
     # start the agent session
     await session.start(
         agent=appointment_scheduling_assistant,
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC(),close_on_disconnect=False),
+        room_input_options=RoomInputOptions(
+            noise_cancellation=ctx.proc.userdata.get("noise_cancellation") or voice_plugins.build_noise_cancellation(),
+            close_on_disconnect=False,
+        ),
     )
+    if recorder is not None and session.output.audio is not None:
+        session.output.audio = recorder.wrap_output(session.output.audio)
     # convers   ation item handler uses the agent_session accessor
     @session.on("conversation_item_added")
     def conversation_item_added(event: ConversationItemAddedEvent):
@@ -690,5 +1243,36 @@ async def entrypoint(ctx: JobContext):
         logger.info("No existing participants found - waiting for new connections")
 
 
+async def render_phrases() -> None:
+    """Pre-render the phrase clips for the configured voice (needs TTS credentials)."""
+    from livekit.agents.utils import http_context
+
+    phrases = PhraseCache(voice_plugins.tts_voice())
+    phrases.load()
+    if not phrases.missing():
+        return
+    try:
+        async with http_context.open():
+            await phrases.render(voice_plugins.build_tts())
+    except Exception:
+        logger.exception("Phrase clips not rendered; they will be rendered by the first call.")
+
+
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    if "download-files" in sys.argv:
+        # Plugins are loaded lazily; register them so their model files are fetched.
+        voice_plugins.preload()
+        asyncio.run(render_phrases())
+    capacity = CapacityModel.from_env()
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        # prewarm now loads models, the DB and calendar clients; allow more than the 10s default
+        initialize_process_timeout=float(os.getenv("AGENT_PREWARM_TIMEOUT", "60")),
+        # Sessions, loop lag, CPU and pending calls; the dispatcher skips us past the threshold
+        load_fnc=capacity.load,
+        load_threshold=float(os.getenv("AGENT_LOAD_THRESHOLD", "0.7")),
+        request_fnc=capacity.admit,
+        # A draining worker lets running calls finish before it exits
+        drain_timeout=int(os.getenv("AGENT_DRAIN_TIMEOUT", "1800")),
+    ))
@@ -1,4 +1,5 @@
 from datetime import datetime, time, timedelta
+import json
 import sqlite3
 import os
 import logging
@@ -145,6 +146,10 @@ class AppDatabase:
                     )
                 ''')
 
+            # ---------------- CALL RECORDINGS ----------------
+            # Length of the call recording, written when it ends (see services/call_recorder.py)
+            self._ensure_columns(cursor, "conversations", {"audio_duration_seconds": "REAL"})
+
                 # Feedback
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS feedback (
@@ -173,12 +178,86 @@ class AppDatabase:
                 )
                 ''')
 
+            # Session metrics: one row per latency metric per call
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS session_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_guid TEXT NOT NULL,
+                    user_id INTEGER,
+                    metric TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    p50 REAL,
+                    p95 REAL,
+                    p99 REAL,
+                    max REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(user_id) REFERENCES users(id)
+                )
+                ''')
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_session_metrics_guid ON session_metrics (session_guid)"
+            )
+
+            # ---------------- SESSION CHECKPOINTS ----------------
+            # Latest agent state per call (JSON), so a reconnect resumes it.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS session_checkpoints (
+                    session_guid TEXT PRIMARY KEY,
+                    user_id INTEGER,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+            # ---------------- SLOT HOLDS ----------------
+            # Slots a call has offered and not booked yet; other calls skip them until they expire.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS slot_holds (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    expert_id INTEGER NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_slot_holds_expert ON slot_holds (expert_id, start_ts)"
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_slot_holds_holder ON slot_holds (holder)")
+
+            # ---------------- CALENDAR OUTBOX ----------------
+            # Appointments are committed locally first and pushed to the calendar
+            # provider in the background; these columns track that sync.
+            self._ensure_columns(cursor, "appointments", {
+                "calendar_state": "TEXT DEFAULT 'synced'",  # pending | synced | failed
+                "calendar_payload": "TEXT",
+                "calendar_attempts": "INTEGER DEFAULT 0",
+                "calendar_next_attempt_at": "TIMESTAMP",
+                "calendar_last_error": "TEXT",
+            })
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_appointments_calendar_outbox
+                ON appointments (calendar_state, calendar_next_attempt_at)
+            ''')
+
             conn.commit()
               
             logger.info(f"Database initialized at {self.db_path}")
         except :
             logger.critical(f"FATAL: Database initialization failed: ", exc_info=True)
 
+    @staticmethod
+    def _ensure_columns(cursor, table: str, columns: Dict[str, str]) -> None:
+        """Add any missing columns to an existing table (CREATE TABLE IF NOT EXISTS won't)."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                logger.info(f"Added column {table}.{name}")
+
     # ---------------- USERS ----------------
     def create_user(self, name: str, email: Optional[str] = None, phone: Optional[str] = None) -> int:
         """
@@ -554,7 +633,8 @@ class AppDatabase:
             expert_id: int,
             title: str,
             start_time: str,
-            end_time: str
+            end_time: str,
+            calendar_payload: Optional[Dict[str, Any]] = None
         ) -> Optional[int]:
             """Create a new appointment record in the database.
     
@@ -565,23 +645,33 @@ class AppDatabase:
                 title (str): Purpose or title of the appointment.
                 start_time (str): Appointment start time (ISO 8601 string recommended).
                 end_time (str): Appointment end time (ISO 8601 string recommended).
+                calendar_payload (Optional[Dict[str, Any]]): Calendar event still to be created.
+                    When given, the row is queued in the calendar outbox as ``pending``.
     
             Returns:
                 Optional[int]: The ID of the newly created appointment, or None if creation failed.
             """
             query = """
                 INSERT INTO appointments (
-                    event_id, user_id, expert_id, purpose, start_time, end_time, created_at, updated_at
+                    event_id, user_id, expert_id, purpose, start_time, end_time, created_at, updated_at,
+                    calendar_state, calendar_payload, calendar_next_attempt_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
     
             now = datetime.utcnow()
+            if calendar_payload is not None:
+                calendar_state, payload_json, next_attempt_at = "pending", json.dumps(calendar_payload), now
+            else:
+                calendar_state, payload_json, next_attempt_at = "synced", None, None
     
             try:
                 with self._connect() as conn:
                     cursor = conn.cursor()
-                    cursor.execute(query, (event_id, user_id, expert_id, title, start_time, end_time, now, now))
+                    cursor.execute(query, (
+                        event_id, user_id, expert_id, title, start_time, end_time, now, now,
+                        calendar_state, payload_json, next_attempt_at,
+                    ))
                     appt_id = cursor.lastrowid
                     conn.commit()
     
@@ -604,6 +694,71 @@ class AppDatabase:
                 logger.exception(f"Unexpected error while creating appointment (event_id='{event_id}'): {e}")
                 return None
 
+    # ---------------- CALENDAR OUTBOX ----------------
+    def get_due_calendar_outbox(self, now: datetime, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return pending appointments whose next calendar sync attempt is due."""
+        query = """
+            SELECT event_id, user_id, calendar_payload, calendar_attempts
+            FROM appointments
+            WHERE calendar_state = 'pending' AND calendar_next_attempt_at <= ?
+            ORDER BY calendar_next_attempt_at
+            LIMIT ?
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (now, limit))
+                rows = [dict(row) for row in cursor.fetchall()]
+            for row in rows:
+                row["calendar_payload"] = json.loads(row["calendar_payload"] or "{}")
+            return rows
+        except sqlite3.Error as e:
+            logger.exception(f"Database error while reading the calendar outbox: {e}")
+            return []
+
+    def claim_calendar_outbox(self, event_id: str, now: datetime, lease_until: datetime) -> bool:
+        """Lease a due outbox row so concurrent dispatchers don't push it twice.
+
+        Returns:
+            bool: True if this caller now owns the row until ``lease_until``.
+        """
+        query = """
+            UPDATE appointments SET calendar_next_attempt_at = ?
+            WHERE event_id = ? AND calendar_state = 'pending' AND calendar_next_attempt_at <= ?
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (lease_until, event_id, now))
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def mark_calendar_synced(self, event_id: str, calendar_event_id: Optional[str] = None) -> None:
+        """Mark an outbox row as pushed, adopting the provider's event ID if it differs."""
+        query = """
+            UPDATE appointments
+            SET calendar_state = 'synced', event_id = ?, calendar_last_error = NULL,
+                calendar_attempts = calendar_attempts + 1, updated_at = ?
+            WHERE event_id = ?
+        """
+        with self._connect() as conn:
+            conn.execute(query, (calendar_event_id or event_id, datetime.utcnow(), event_id))
+            conn.commit()
+        logger.info(f"Calendar event synced for appointment event_id='{event_id}'.")
+
+    def mark_calendar_attempt_failed(self, event_id: str, error: str, next_attempt_at: Optional[datetime]) -> None:
+        """Record a failed push; ``next_attempt_at=None`` gives up and marks the row failed."""
+        query = """
+            UPDATE appointments
+            SET calendar_state = ?, calendar_last_error = ?, calendar_next_attempt_at = ?,
+                calendar_attempts = calendar_attempts + 1, updated_at = ?
+            WHERE event_id = ?
+        """
+        state = "pending" if next_attempt_at is not None else "failed"
+        with self._connect() as conn:
+            conn.execute(query, (state, error[:500], next_attempt_at, datetime.utcnow(), event_id))
+            conn.commit()
+        logger.warning(f"Calendar sync failed for event_id='{event_id}' (state={state}): {error}")
+
     def get_appointment(self, appt_id: int) -> Optional[Dict[str, Any]]:
         conn = self._connect()
         cursor = conn.cursor()
@@ -611,6 +766,22 @@ class AppDatabase:
         row = cursor.fetchone()
         conn.close()
         return dict(row) if row else None
+    def get_recent_appointments(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return a user's most recent non-cancelled appointments, newest first."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM appointments
+            WHERE user_id = ? AND status != 'Cancelled'
+            ORDER BY start_time DESC LIMIT ?
+            """,
+            (user_id, limit)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
     def get_appointments_by_time_and_title(self,start_time: str, end_time: str, title: str):
         conn = self._connect()
         cursor = conn.cursor()
@@ -636,8 +807,13 @@ class AppDatabase:
             return False
         finally:
             conn.close()
-    def has_conflict(self, expert_id: int, start_time: datetime, end_time: datetime) -> bool:
-        """Check if any appointment or unavailability overlaps with the given interval."""
+    def has_conflict(self, expert_id: int, start_time: datetime, end_time: datetime,
+                     holder: Optional[str] = None) -> bool:
+        """Check if any appointment, unavailability or another call's slot hold overlaps with the given interval.
+
+        Args:
+            holder (Optional[str]): Call asking; its own holds are not conflicts.
+        """
         # This function is logically correct. For efficiency, you could combine the two
         # queries with a UNION ALL, but it's not a bug.
         with self._connect() as conn:
@@ -664,8 +840,24 @@ class AppDatabase:
             if cursor.fetchone():
                 return True
 
+            # Offered to another caller and not expired
+            if self._held_by_other(cursor, expert_id, start_time.timestamp(), end_time.timestamp(), holder):
+                return True
+
             return False
 
+    @staticmethod
+    def _held_by_other(cursor, expert_id: int, start_ts: float, end_ts: float, holder: Optional[str]) -> bool:
+        cursor.execute('''
+            SELECT 1 FROM slot_holds
+            WHERE expert_id = ?
+            AND start_ts < ? AND end_ts > ?
+            AND expires_at > ?
+            AND holder != ?
+            LIMIT 1
+        ''', (expert_id, end_ts, start_ts, datetime.now().timestamp(), holder or ""))
+        return cursor.fetchone() is not None
+
     def get_expert_availability(self, expert_id: int) -> list[tuple]:
         """Fetch all availability slots for a given expert."""
         # This function is correct. No changes needed.
@@ -758,8 +950,12 @@ class AppDatabase:
                 continue
 
         return False
-    def suggest_next_available_slots(self, expert_id: int, desired_start: datetime, duration_minutes: int = None, limit: int = 3):
-        """Suggest the next available UTC time slots for an expert starting from desired_start (UTC)."""
+    def suggest_next_available_slots(self, expert_id: int, desired_start: datetime, duration_minutes: int = None, limit: int = 3,
+                                     holder: Optional[str] = None):
+        """Suggest the next available UTC time slots for an expert starting from desired_start (UTC).
+
+        Slots another call holds are skipped; ``holder``'s own holds are not.
+        """
         slots = []
         current = desired_start
 
@@ -775,7 +971,7 @@ class AppDatabase:
         while len(slots) < limit and attempts < max_attempts:
             current_end = current + timedelta(minutes=duration_minutes)
 
-            if self.is_within_availability(expert_id, current, current_end) and not self.has_conflict(expert_id, current, current_end):
+            if self.is_within_availability(expert_id, current, current_end) and not self.has_conflict(expert_id, current, current_end, holder):
                 slots.append((current, current_end))
 
             # Move by either expert buffer or half of duration for better suggestions
@@ -831,6 +1027,39 @@ class AppDatabase:
             conn.close()
 
 
+    def save_conversation_audio(self, session_guid: str, user_id: Optional[int], audio_file_path: str,
+                                duration_seconds: float) -> bool:
+        """Store where a call's recording is and how long it runs.
+
+        Args:
+            session_guid (str): Call the recording belongs to.
+            user_id (Optional[int]): Caller, if identified.
+            audio_file_path (str): Recording on the worker's disk.
+            duration_seconds (float): Length of the recording.
+
+        Returns:
+            bool: True if the conversation row was written.
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO conversations (user_id, session_guid, audio_file_path, audio_duration_seconds)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(session_guid) DO UPDATE SET
+                        user_id = COALESCE(conversations.user_id, excluded.user_id),
+                        audio_file_path = excluded.audio_file_path,
+                        audio_duration_seconds = excluded.audio_duration_seconds,
+                        last_updated = CURRENT_TIMESTAMP
+                    """,
+                    (user_id, session_guid, audio_file_path, duration_seconds),
+                )
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Database error while saving the recording of session_guid={session_guid}: {e}")
+            return False
+
     def get_transcription(self, user_id: int) -> Optional[str]:
             """Retrieve and combine all transcription text for a given user.
     
@@ -870,6 +1099,147 @@ class AppDatabase:
         
         
         
+    # ---------------- SESSION METRICS ----------------
+    def save_session_metrics(self, session_guid: str, user_id: Optional[int],
+                             summary: Dict[str, Dict[str, float]]) -> int:
+        """Store the latency summary of one call.
+
+        Args:
+            session_guid (str): Session the timings belong to.
+            user_id (Optional[int]): Caller, if identified.
+            summary (Dict[str, Dict[str, float]]): ``{metric: {count, sum, max, p50, p95, p99}}``.
+
+        Returns:
+            int: Number of metric rows written.
+        """
+        rows = [
+            (session_guid, user_id, metric, s["count"], s["sum"], s["p50"], s["p95"], s["p99"], s["max"])
+            for metric, s in summary.items()
+        ]
+        if not rows:
+            return 0
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO session_metrics (session_guid, user_id, metric, count, total, p50, p95, p99, max)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                conn.commit()
+            logger.info(f"Saved {len(rows)} latency metrics for session_guid={session_guid}.")
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.exception(f"Database error while saving session metrics for session_guid={session_guid}: {e}")
+            return 0
+
+    def get_session_metrics(self, session_guid: str) -> List[Dict[str, Any]]:
+        """Return the stored latency summary rows for a session."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM session_metrics WHERE session_guid = ? ORDER BY metric", (session_guid,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    # ---------------- SESSION CHECKPOINTS ----------------
+    def save_session_checkpoint(self, session_guid: str, user_id: Optional[int], state: Dict[str, Any]) -> bool:
+        """Replace the stored state of a call.
+
+        Args:
+            session_guid (str): Call the state belongs to.
+            user_id (Optional[int]): Caller, if identified.
+            state (Dict[str, Any]): JSON-serializable agent state.
+
+        Returns:
+            bool: True if the checkpoint was written.
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO session_checkpoints (session_guid, user_id, state, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(session_guid) DO UPDATE SET
+                        user_id = excluded.user_id, state = excluded.state, updated_at = excluded.updated_at
+                    """,
+                    (session_guid, user_id, json.dumps(state, separators=(",", ":")), datetime.now().timestamp()),
+                )
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Database error while checkpointing session_guid={session_guid}: {e}")
+            return False
+
+    def get_session_checkpoint(self, session_guid: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        """Return the stored state of a call if it was saved in the last ``max_age_seconds``."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM session_checkpoints WHERE session_guid = ? AND updated_at >= ?",
+                (session_guid, datetime.now().timestamp() - max_age_seconds),
+            ).fetchone()
+        return json.loads(row["state"]) if row else None
+
+    def prune_session_checkpoints(self, max_age_seconds: float) -> int:
+        """Delete checkpoints older than ``max_age_seconds``; returns the count."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM session_checkpoints WHERE updated_at < ?",
+                (datetime.now().timestamp() - max_age_seconds,),
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    # ---------------- SLOT HOLDS ----------------
+    def hold_slots(self, holder: str, slots: List[tuple], ttl_seconds: float) -> Optional[List[tuple]]:
+        """Hold offered slots for one call, replacing the holds it had before.
+
+        The check and the insert share one write transaction, so two calls
+        can't hold the same slot.
+
+        Args:
+            holder (str): Call holding the slots.
+            slots (List[tuple]): ``(expert_id, start, end)`` with aware datetimes.
+            ttl_seconds (float): How long the holds last.
+
+        Returns:
+            Optional[List[tuple]]: The slots now held, leaving out those another call holds;
+            None if the database could not be written.
+        """
+        expires_at = datetime.now().timestamp() + ttl_seconds
+        held = []
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("DELETE FROM slot_holds WHERE holder = ?", (holder,))
+                for expert_id, start, end in slots:
+                    if self._held_by_other(cursor, expert_id, start.timestamp(), end.timestamp(), holder):
+                        continue
+                    cursor.execute(
+                        "INSERT INTO slot_holds (expert_id, start_ts, end_ts, holder, expires_at) VALUES (?, ?, ?, ?, ?)",
+                        (expert_id, start.timestamp(), end.timestamp(), holder, expires_at),
+                    )
+                    held.append((expert_id, start, end))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Database error while holding slots for {holder}: {e}")
+            return None
+        return held
+
+    def release_slot_holds(self, holder: str) -> int:
+        """Drop every hold of one call; returns the count."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM slot_holds WHERE holder = ?", (holder,))
+            conn.commit()
+            return cursor.rowcount
+
+    def prune_slot_holds(self) -> int:
+        """Delete expired holds; returns the count."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM slot_holds WHERE expires_at <= ?", (datetime.now().timestamp(),))
+            conn.commit()
+            return cursor.rowcount
+
     # ---------------- FEEDBACK ----------------
     def create_feedback(self, user_id: int, appointment_id: int, rating: int, comments: str) -> int:
         conn = self._connect()
@@ -923,6 +1293,24 @@ class AppDatabase:
 
         return dict(row) if row else None
 
+    def update_token(self, token_id: int, access_token: str, token_expiry: Optional[datetime] = None,
+                     refresh_token: Optional[str] = None) -> bool:
+        """Write a refreshed access token (and rotated refresh token, if any) back to its row."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            '''UPDATE tokens
+               SET access_token = ?, token_expiry = ?, refresh_token = COALESCE(?, refresh_token), updated_at = ?
+               WHERE id = ?''',
+            (access_token, token_expiry, refresh_token, datetime.utcnow(), token_id)
+        )
+        conn.commit()
+        updated = cursor.rowcount > 0
+        conn.close()
+        logger.info(f"Updated token id={token_id} (updated={updated})")
+        return updated
+
     def get_tokens_for_user(self, user_id: int):
         """Get all tokens belonging to a user."""
         conn = self._connect()
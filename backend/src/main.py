@@ -1,16 +1,25 @@
 # main.py
+import asyncio
+import base64
+import hashlib
+import json
 import os
 import logging
-from typing import Dict, Optional
-from fastapi import FastAPI, Request, HTTPException, Depends, Header
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from fastapi import FastAPI, Request, HTTPException, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from grpc import Status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from starlette.middleware.sessions import SessionMiddleware
 from pydantic import BaseModel
 from jose import jwt, JWTError
-from services.calendar_service import CalendarService
+from services.calendar_provider import get_calendar_provider
+from services.calendar_resilience import CalendarUnavailableError
+from services.event_normalizer import EVENT_FIELDS, get_zone
+from services.metrics import registry as metrics_registry
+from services.response_cache import TTLCache
 from db.AppDatabase import AppDatabase  # Your SQLite helper
-import dotenv 
 from dotenv import load_dotenv
 
 # -------------------------------
@@ -30,11 +39,27 @@ NEXTAUTH_ALGO = "HS256"  # NextAuth uses HS256 by default
 db = AppDatabase()
 logger.info("✅ AppDatabase initialized.")
 
+# -------------------------------
+# CALENDAR EVENTS CACHE
+# -------------------------------
+# Dashboard refreshes send a fresh "now" each time, so ranges are snapped to a
+# grid before they are used as cache keys.
+EVENTS_CACHE = TTLCache(
+    "calendar_events",
+    ttl=float(os.getenv("CALENDAR_EVENTS_CACHE_TTL", "30")),
+    max_entries=int(os.getenv("CALENDAR_EVENTS_CACHE_SIZE", "1024")),
+)
+EVENTS_RANGE_GRANULARITY = int(os.getenv("CALENDAR_EVENTS_RANGE_GRANULARITY", "300"))
+EVENTS_MAX_RESULTS = int(os.getenv("CALENDAR_EVENTS_MAX_RESULTS", "2500"))
+
 # -------------------------------
 # FASTAPI APP
 # -------------------------------
 app = FastAPI()
 
+# Compress large event lists
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Session middleware (optional)
 app.add_middleware(SessionMiddleware, secret_key=NEXTAUTH_SECRET)
 
@@ -61,6 +86,12 @@ class SaveUserPayload(BaseModel):
     refreshToken: str | None = None
     userMetadata: dict | None = None
 
+class CalendarTokenPayload(BaseModel):
+    sub: str
+    accessToken: str
+    refreshToken: str | None = None
+    expiresAt: int | None = None  # Unix timestamp (seconds), as issued by Google
+
 # -------------------------------
 # HELPERS
 # -------------------------------
@@ -108,7 +139,7 @@ def get_current_user(
         Authorization: Bearer <jwt>
 
     Returns:
-        dict: Contains user's email, name, and picture.
+        dict: Contains user's id, email, name, and picture.
     """
     if not authorization:
         logger.warning("Missing Authorization header.")
@@ -133,13 +164,14 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid token payload")
 
         # Check and create user if not present
-        existing_user = db.get_user_by_email(email)
-        if not existing_user:
+        user_id = db.get_user_by_email(email)
+        if not user_id:
             db.create_user(name=name or "Unknown", email=email)
+            user_id = db.get_user_by_email(email)
             logger.info(f"Created new user record on first login: {email}")
 
         logger.info(f"Authenticated user: {email}")
-        return {"email": email, "name": name, "picture": picture}
+        return {"id": user_id, "email": email, "name": name, "picture": picture}
 
     except JWTError as e:
         logger.error(f"JWT verification failed: {e}")
@@ -148,6 +180,68 @@ def get_current_user(
     except Exception as e:
         logger.exception(f"Unexpected error in get_current_user: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+def _snap_epoch(value: str, granularity: int, up: bool = False) -> int:
+    """Snap an ISO 8601 timestamp to ``granularity`` seconds: down, or up with ``up``."""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    epoch = parsed.timestamp()
+    return int(-(-epoch // granularity) if up else epoch // granularity) * granularity
+
+
+def _rfc3339(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _snap_range(start: str, end: str, granularity: int) -> Tuple[str, str]:
+    """Widen ``start``..``end`` to the grid so the snapped range still covers it.
+
+    The start is floored and the end ceiled, and the end always lands at
+    least one step after the start (Google rejects ``timeMin == timeMax``).
+    """
+    time_min = _snap_epoch(start, granularity)
+    time_max = max(_snap_epoch(end, granularity, up=True), time_min + granularity)
+    return _rfc3339(time_min), _rfc3339(time_max)
+
+
+def _encode_cursor(offset: int, etag: str) -> str:
+    raw = json.dumps({"o": offset, "e": etag}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, etag: str) -> int:
+    """Return the offset encoded in ``cursor``; rejects cursors from a different result set."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        offset = int(data["o"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("e") != etag:
+        raise HTTPException(status_code=409, detail="Events changed since this cursor was issued; start again.")
+    return max(offset, 0)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _load_events(user_id: int, time_min: str, time_max: str, tz_name: str, projection) -> Tuple[str, list]:
+    """Fetch and normalize a user's events for a range; runs in a worker thread."""
+    calendar_service = get_calendar_provider(db)
+    raw_events = calendar_service.list_meetings(
+        max_results=EVENTS_MAX_RESULTS, user_id=user_id, time_min=time_min, time_max=time_max
+    )
+    events = calendar_service.process_events(raw_events, tz_name, fields=projection)
+    digest = hashlib.sha1(json.dumps(events, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    return digest, events
+
 # -------------------------------
 # ROUTES
 # -------------------------------
@@ -219,18 +313,104 @@ async def logout(user: Dict = Depends(get_current_user)):
         logger.exception(f"Unexpected error during logout for user {user}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/calendar/credentials", response_model=Dict[str, str])
+async def store_calendar_credentials(payload: CalendarTokenPayload, user: Dict = Depends(get_current_user)):
+    """
+    Store the signed-in user's Google OAuth tokens so calendar calls use their own calendar.
+
+    - Requires a valid JWT in the Authorization header.
+    - Replaces any previously stored tokens for the user.
+    """
+    try:
+        user_id = user.get("id")
+        if not user_id:
+            raise HTTPException(status_code=400, detail="Invalid user information")
+
+        expiry = datetime.fromtimestamp(payload.expiresAt, tz=timezone.utc) if payload.expiresAt else None
+        db.delete_tokens_for_user(user_id)
+        db.store_token(
+            user_id=user_id,
+            sub=payload.sub,
+            access_token=payload.accessToken,
+            refresh_token=payload.refreshToken,
+            token_expiry=expiry,
+        )
+        get_calendar_provider(db).invalidate_user(user_id)
+        EVENTS_CACHE.invalidate_prefix(user_id)
+        logger.info(f"Stored calendar credentials for user_id={user_id}.")
+        return {"message": "Calendar credentials saved."}
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.exception(f"Unexpected error storing calendar credentials for user {user}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/calendar/events")
-async def get_calendar_events(start: str, end: str, timezone: str, user: dict = Depends(get_current_user)):
+async def get_calendar_events(
+    request: Request,
+    start: str,
+    end: str,
+    timezone: str,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    user: dict = Depends(get_current_user),
+):
+    """
+    Return the user's events between ``start`` and ``end``, converted to ``timezone``.
+
+    - ``fields``: optional comma-separated projection, e.g. ``id,title,start,end``.
+    - ``limit`` / ``cursor``: page through large ranges; follow ``next_cursor`` until it is null.
+    - Responses are cached per user for a short TTL and carry an ``ETag``;
+      send it back in ``If-None-Match`` to get ``304 Not Modified``.
+    """
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    unknown = set(projection or []) - set(EVENT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    try:
+        get_zone(timezone)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {timezone}")
+
+    time_min, time_max = _snap_range(start, end, EVENTS_RANGE_GRANULARITY)
+    cache_key = (user["id"], time_min, time_max, timezone, tuple(projection or ()))
+
     try:  
-        calendar_service = CalendarService()
-        raw_events = calendar_service.list_meetings(max_results=10)
-        availability = calendar_service.process_events(raw_events, timezone)
-        return {"availability": availability, "user": user}
+        cached = EVENTS_CACHE.get(cache_key)
+        if cached is None:
+            cached = await asyncio.to_thread(_load_events, user["id"], time_min, time_max, timezone, projection)
+            EVENTS_CACHE.set(cache_key, cached)
+        digest, events = cached
+    except CalendarUnavailableError as e:
+        logger.warning(f"Calendar unavailable while fetching availability: {e}")
+        raise HTTPException(status_code=503, detail="Calendar is temporarily unavailable.")
     except Exception as e:
         logger.error(f"Error fetching availability: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error fetching availability.")
 
+    offset = _decode_cursor(cursor, digest) if cursor else 0
+    page = events[offset:offset + limit] if limit else events[offset:]
+    next_offset = offset + len(page)
+    next_cursor = _encode_cursor(next_offset, digest) if limit and next_offset < len(events) else None
+
+    etag = f'W/"{digest[:20]}-{offset}-{limit or 0}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(
+        {"availability": page, "next_cursor": next_cursor, "total": len(events), "user": user},
+        headers=headers,
+    )
+
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["ops"])
+async def get_metrics():
+    """Expose calendar throttle, retry and circuit breaker metrics in Prometheus format."""
+    return metrics_registry.render_prometheus()
 
 # -------------------------------
 # RUN
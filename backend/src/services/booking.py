@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pytz
+
+from services.event_normalizer import get_zone, parse_event_time
+from services.time_resolver import TimeWindow
+
+logger = logging.getLogger("agent")
+
+# Everyday words for what each specialty treats; matched against the caller's requirement.
+SPECIALTY_TERMS: Dict[str, Tuple[str, ...]] = {
+    "cardio": ("heart", "cardiac", "chest pain", "blood pressure", "bp", "palpitation", "cholesterol"),
+    "derma": ("skin", "rash", "acne", "eczema", "hair", "itch", "mole"),
+    "dental": ("tooth", "teeth", "dentist", "gum", "cavity", "root canal", "braces"),
+    "surgeon": ("surgery", "operation", "surgical", "hernia", "appendix"),
+    "nutrition": ("diet", "weight", "food", "nutrition", "meal", "obesity"),
+    "ortho": ("bone", "joint", "knee", "back pain", "fracture", "spine", "shoulder"),
+    "psych": ("stress", "anxiety", "depression", "sleep", "mental", "therapy"),
+    "pediatric": ("child", "kid", "baby", "infant"),
+    "general": ("checkup", "check up", "fever", "cold", "cough", "general"),
+}
+
+_WORD = re.compile(r"[a-z]+")
+_NAME_STOPWORDS = {"dr", "doctor", "mr", "mrs", "ms", "prof"}
+
+
+@dataclass(frozen=True)
+class SlotOption:
+    """A free slot with one expert, and how well it fits the request."""
+
+    expert: Dict[str, Any]
+    start: datetime.datetime
+    end: datetime.datetime
+    match: float
+    in_window: bool
+
+    def rank_key(self) -> Tuple:
+        # Slots inside the asked-for window first, then the better-matching expert, then the earliest
+        return (not self.in_window, -self.match, self.start)
+
+
+def match_experts(requirement: str, experts: Iterable[Dict[str, Any]],
+                  limit: int = 3) -> List[Tuple[float, Dict[str, Any]]]:
+    """Experts whose name or specialty fits ``requirement``, best first.
+
+    A named expert ("Dr. Rao") outranks a specialty match; a specialty
+    matches on its own words or on the everyday terms in ``SPECIALTY_TERMS``.
+    """
+    text = requirement.lower()
+    words = set(_WORD.findall(text))
+    scored = []
+    for expert in experts:
+        if (expert.get("status") or "ACTIVE").upper() != "ACTIVE":
+            continue
+        score = 0.0
+        name_words = set(_WORD.findall((expert.get("name") or "").lower())) - _NAME_STOPWORDS
+        if name_words & words:
+            score += 3
+        specialty = (expert.get("specialty") or "").lower()
+        for word in _WORD.findall(specialty):
+            # "dental" vs "dentist", "cardiology" vs "cardiologist"
+            if len(word) > 3 and any(w[:5] == word[:5] for w in words if len(w) > 3):
+                score += 2
+                break
+        for stem, terms in SPECIALTY_TERMS.items():
+            if stem in specialty and any(re.search(rf"\b{re.escape(term)}", text) for term in terms):
+                score += 1
+                break
+        if score:
+            scored.append((score, expert))
+    scored.sort(key=lambda item: -item[0])
+    return scored[:limit]
+
+
+def busy_intervals(events: Iterable[Dict[str, Any]]) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """(start, end) of the caller's timed calendar events; all-day events don't block slots."""
+    busy = []
+    for event in events or []:
+        start, end = event.get("start", {}).get("dateTime"), event.get("end", {}).get("dateTime")
+        if start and end:
+            busy.append((parse_event_time(start), parse_event_time(end)))
+    return busy
+
+
+async def find_slot_options(db, matches: Sequence[Tuple[float, Dict[str, Any]]], window: TimeWindow,
+                            duration_minutes: int, timezone: str = "Asia/Kolkata",
+                            per_expert: int = 3, holder: Optional[str] = None) -> List[SlotOption]:
+    """Free slots for every matched expert from the window's start, searched concurrently and ranked.
+
+    Slots held for another call are skipped; ``holder``'s own holds are not.
+    """
+    tz = get_zone(timezone)
+    start_utc = window.start.astimezone(pytz.UTC)
+
+    async def search(expert_id: int) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        try:
+            return await asyncio.to_thread(
+                db.suggest_next_available_slots, expert_id, start_utc,
+                duration_minutes=duration_minutes, limit=per_expert, holder=holder,
+            )
+        except Exception:
+            logger.exception(f"Slot search failed for expert {expert_id}")
+            return []
+
+    results = await asyncio.gather(*(search(expert["id"]) for _, expert in matches))
+    options = []
+    for (match, expert), slots in zip(matches, results):
+        for start, end in slots:
+            local_start = start.astimezone(tz)
+            options.append(SlotOption(
+                expert=expert,
+                start=local_start,
+                end=end.astimezone(tz),
+                match=match,
+                in_window=window.start <= local_start < window.end,
+            ))
+    options.sort(key=SlotOption.rank_key)
+    return options
+
+
+def without_conflicts(options: Iterable[SlotOption],
+                      busy: Sequence[Tuple[datetime.datetime, datetime.datetime]]) -> List[SlotOption]:
+    """``options`` minus those overlapping one of the caller's own meetings."""
+    return [o for o in options if not any(o.start < b_end and o.end > b_start for b_start, b_end in busy)]
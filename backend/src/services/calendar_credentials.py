@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+from services.calendar_provider import CalendarCredentialsError
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+CLIENT_CACHE = registry.counter(
+    "calendar_client_cache_total", "Per-user calendar client lookups by result (hit, miss, evict)."
+)
+
+
+def load_client_config(credentials_path: str) -> Dict[str, str]:
+    """Read the OAuth client ID/secret used to refresh per-user tokens.
+
+    ``GOOGLE_CLIENT_ID`` / ``GOOGLE_CLIENT_SECRET`` take precedence over the
+    ``installed`` or ``web`` section of the client secrets file.
+    """
+    config: Dict[str, str] = {}
+    if os.path.exists(credentials_path):
+        with open(credentials_path) as f:
+            secrets = json.load(f)
+        config = dict(secrets.get("web") or secrets.get("installed") or {})
+    client_id = os.getenv("GOOGLE_CLIENT_ID") or config.get("client_id")
+    client_secret = os.getenv("GOOGLE_CLIENT_SECRET") or config.get("client_secret")
+    if not client_id or not client_secret:
+        raise CalendarCredentialsError(
+            f"No OAuth client configured; set GOOGLE_CLIENT_ID/GOOGLE_CLIENT_SECRET or provide {credentials_path}"
+        )
+    return {
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "token_uri": config.get("token_uri", GOOGLE_TOKEN_URI),
+    }
+
+
+def _parse_expiry(value: Any) -> Optional[datetime]:
+    """Token expiry as the naive UTC datetime google-auth expects."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        expiry = value
+    else:
+        expiry = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+class UserCalendarClient:
+    """An authorized Calendar service object for one user."""
+
+    def __init__(self, user_id: int, token_id: int, creds: Credentials, http_timeout: float):
+        self.user_id = user_id
+        self.token_id = token_id
+        self.creds = creds
+        self.http_timeout = http_timeout
+        self._persisted_token = creds.token
+        self._local = threading.local()
+        self.service = build("calendar", "v3", http=self.http(), cache_discovery=False)
+
+    def http(self) -> AuthorizedHttp:
+        """Per-thread authorized HTTP client; httplib2 is not thread-safe."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=httplib2.Http(timeout=self.http_timeout))
+            self._local.http = http
+        return http
+
+    def token_changed(self) -> bool:
+        return self.creds.token != self._persisted_token
+
+    def mark_persisted(self) -> None:
+        self._persisted_token = self.creds.token
+
+
+class CalendarClientPool:
+    """Bounded LRU of per-user Calendar clients built from the ``tokens`` table.
+
+    Clients are reused across calls so a worker can serve many users without
+    rebuilding discovery documents. Tokens refreshed by google-auth are written
+    back to the database so other processes pick them up.
+    """
+
+    def __init__(self, db, client_config_loader: Callable[[], Dict[str, str]],
+                 scopes: list[str], max_size: int = 256, http_timeout: float = 10.0):
+        """
+        Args:
+            db: ``AppDatabase`` instance holding the ``tokens`` table.
+            client_config_loader: Returns the OAuth client ID, secret and token URI.
+            scopes (list[str]): OAuth scopes the stored tokens were granted.
+            max_size (int): Maximum number of cached user clients.
+            http_timeout (float): Socket timeout for Calendar HTTP calls, in seconds.
+        """
+        self.db = db
+        self.scopes = scopes
+        self.max_size = max_size
+        self.http_timeout = http_timeout
+        self._client_config_loader = client_config_loader
+        self._client_config: Optional[Dict[str, str]] = None
+        self._clients: "OrderedDict[int, UserCalendarClient]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _client_config_values(self) -> Dict[str, str]:
+        if self._client_config is None:
+            self._client_config = self._client_config_loader()
+        return self._client_config
+
+    def get(self, user_id: int) -> UserCalendarClient:
+        """Return the cached client for ``user_id``, building it on a miss.
+
+        Raises:
+            CalendarCredentialsError: If the user has no stored token.
+        """
+        with self._lock:
+            client = self._clients.get(user_id)
+            if client is not None:
+                self._clients.move_to_end(user_id)
+                CLIENT_CACHE.inc(result="hit")
+                return client
+
+        CLIENT_CACHE.inc(result="miss")
+        client = self._build(user_id)
+
+        with self._lock:
+            # Another thread may have built the same client meanwhile; keep the first.
+            existing = self._clients.get(user_id)
+            if existing is not None:
+                self._clients.move_to_end(user_id)
+                return existing
+            self._clients[user_id] = client
+            while len(self._clients) > self.max_size:
+                evicted_id, _ = self._clients.popitem(last=False)
+                CLIENT_CACHE.inc(result="evict")
+                logger.debug(f"Evicted calendar client for user_id={evicted_id}")
+        return client
+
+    def _build(self, user_id: int) -> UserCalendarClient:
+        tokens = self.db.get_tokens_for_user(user_id)
+        if not tokens:
+            raise CalendarCredentialsError(f"No calendar token stored for user_id={user_id}")
+        token = tokens[0]
+        client_config = self._client_config_values()
+        creds = Credentials(
+            token=token["access_token"],
+            refresh_token=token.get("refresh_token"),
+            token_uri=client_config["token_uri"],
+            client_id=client_config["client_id"],
+            client_secret=client_config["client_secret"],
+            scopes=self.scopes,
+            expiry=_parse_expiry(token.get("token_expiry")),
+        )
+        client = UserCalendarClient(user_id, token["id"], creds, self.http_timeout)
+        if not creds.valid and creds.refresh_token:
+            logger.info(f"Refreshing calendar token for user_id={user_id}")
+            creds.refresh(Request())
+            self.persist(client)
+        logger.info(f"Built calendar client for user_id={user_id}")
+        return client
+
+    def persist(self, client: UserCalendarClient) -> None:
+        """Write a refreshed access token back to the ``tokens`` table."""
+        if not client.token_changed():
+            return
+        try:
+            self.db.update_token(
+                token_id=client.token_id,
+                access_token=client.creds.token,
+                token_expiry=client.creds.expiry,
+                refresh_token=client.creds.refresh_token,
+            )
+            client.mark_persisted()
+            logger.info(f"Persisted refreshed calendar token for user_id={client.user_id}")
+        except Exception:
+            logger.exception(f"Failed to persist refreshed token for user_id={client.user_id}")
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a cached client, e.g. after the user re-authorizes."""
+        with self._lock:
+            self._clients.pop(user_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
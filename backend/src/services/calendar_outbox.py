@@ -0,0 +1,153 @@
+import asyncio
+import contextlib
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.calendar_provider import CalendarCredentialsError
+from services.calendar_resilience import CalendarUnavailableError, is_transient_error
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+OUTBOX_PUSHES = registry.counter(
+    "calendar_outbox_pushes_total", "Calendar outbox push attempts by outcome (synced, retry, failed)."
+)
+
+
+class CalendarOutboxDispatcher:
+    """Pushes locally committed appointments to the calendar provider.
+
+    ``schedule_meeting`` writes the appointment with ``calendar_state='pending'``
+    and returns straight away; this dispatcher creates the calendar event in the
+    background. The appointment's ``event_id`` doubles as the client-supplied
+    calendar event ID, so a push that is repeated after a timeout or a crash
+    returns the existing event instead of creating a duplicate.
+    """
+
+    def __init__(self, db, provider, poll_interval: float = 5.0, max_attempts: int = 8,
+                 base_delay: float = 2.0, max_delay: float = 300.0, batch_size: int = 20,
+                 lease_seconds: float = 120.0):
+        """
+        Args:
+            db: ``AppDatabase`` holding the appointments outbox.
+            provider: ``CalendarProvider`` the events are created in.
+            poll_interval (float): Seconds between scans when nothing wakes the loop.
+            max_attempts (int): Attempts before a row is marked ``failed``.
+            base_delay (float): First retry delay; doubled per attempt with full jitter.
+            max_delay (float): Upper bound for the retry delay.
+            batch_size (int): Rows pushed per scan.
+            lease_seconds (float): How long a claimed row is hidden from other dispatchers.
+        """
+        self.db = db
+        self.provider = provider
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, db, provider) -> "CalendarOutboxDispatcher":
+        """Build a dispatcher configured through ``CALENDAR_OUTBOX_*`` env vars."""
+        env = os.getenv
+        return cls(
+            db,
+            provider,
+            poll_interval=float(env("CALENDAR_OUTBOX_POLL_SECONDS", "5")),
+            max_attempts=int(env("CALENDAR_OUTBOX_MAX_ATTEMPTS", "8")),
+            base_delay=float(env("CALENDAR_OUTBOX_BASE_DELAY", "2")),
+            max_delay=float(env("CALENDAR_OUTBOX_MAX_DELAY", "300")),
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        """Full-jitter exponential delay after ``attempts`` failed pushes."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** max(attempts - 1, 0))))
+
+    # ---------------- DISPATCH ----------------
+    async def dispatch_once(self) -> int:
+        """Push every due row once. Returns the number of rows synced."""
+        now = datetime.utcnow()
+        rows = await asyncio.to_thread(self.db.get_due_calendar_outbox, now, self.batch_size)
+        synced = 0
+        for row in rows:
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            claimed = await asyncio.to_thread(self.db.claim_calendar_outbox, row["event_id"], now, lease_until)
+            if claimed and await self._push(row):
+                synced += 1
+        return synced
+
+    async def _push(self, row: dict) -> bool:
+        event_id = row["event_id"]
+        payload = row["calendar_payload"]
+        try:
+            calendar_event_id, _ = await asyncio.to_thread(
+                self.provider.create_meeting,
+                summary=payload["summary"],
+                start_time=payload["start"],
+                end_time=payload["end"],
+                attendees=payload.get("attendees", []),
+                timezone=payload["timezone"],
+                user_id=row["user_id"],
+                event_id=event_id,
+            )
+        except Exception as e:
+            attempts = row["calendar_attempts"] + 1
+            # Missing credentials can be fixed by the user re-authorizing, so keep trying.
+            retryable = isinstance(e, (CalendarUnavailableError, CalendarCredentialsError)) or is_transient_error(e)
+            if retryable and attempts < self.max_attempts:
+                next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_delay(attempts))
+                OUTBOX_PUSHES.inc(outcome="retry")
+            else:
+                next_attempt_at = None
+                OUTBOX_PUSHES.inc(outcome="failed")
+            await asyncio.to_thread(self.db.mark_calendar_attempt_failed, event_id, str(e), next_attempt_at)
+            if next_attempt_at is None:
+                # The caller was told the invite is on its way; staff have to follow up
+                logger.error(
+                    f"Calendar invite for appointment event_id='{event_id}' gave up after {attempts} attempts: "
+                    f"user_id={row['user_id']} '{payload['summary']}' at {payload['start']} "
+                    f"for {', '.join(payload.get('attendees', [])) or 'no attendees'}. "
+                    f"The booking is saved but no calendar event exists. Last error: {e}"
+                )
+            return False
+
+        await asyncio.to_thread(self.db.mark_calendar_synced, event_id, calendar_event_id)
+        OUTBOX_PUSHES.inc(outcome="synced")
+        return True
+
+    # ---------------- LIFECYCLE ----------------
+    def wake(self) -> None:
+        """Ask the loop to scan now instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> asyncio.Task:
+        """Start the dispatch loop on the running event loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run(), name="calendar-outbox")
+            logger.info("Calendar outbox dispatcher started")
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.dispatch_once()
+            except Exception:
+                logger.exception("Calendar outbox scan failed")
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            self._wakeup.clear()
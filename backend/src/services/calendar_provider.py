@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Optional, Sequence
+
+from services.event_normalizer import iter_normalized_events
+
+logger = logging.getLogger("agent")
+
+
+class CalendarCredentialsError(RuntimeError):
+    """Raised when a user has no usable calendar credentials."""
+
+
+class CalendarProvider(ABC):
+    """Interface shared by every calendar backend the agent and API can use.
+
+    Implementations return events in the Google Calendar v3 resource shape so
+    callers do not need to know which backend is active.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_meeting(self, summary: str, start_time: str, end_time: str, attendees: list[str], timezone: str,
+                       user_id: Optional[int] = None, event_id: Optional[str] = None):
+        """Create an event and return ``(event_id, html_link)``.
+
+        When ``event_id`` is given (lowercase base32hex, 5-1024 chars) the insert
+        is idempotent: repeating it returns the event created the first time.
+        """
+
+    @abstractmethod
+    def list_meetings(self, max_results: int = 10, user_id: Optional[int] = None,
+                      time_min: Optional[str] = None, time_max: Optional[str] = None) -> list:
+        """List events ordered by start time.
+
+        ``time_min`` defaults to now; both bounds are RFC 3339 timestamps.
+        """
+
+    @abstractmethod
+    def cancel_meeting(self, event_id: str, user_id: Optional[int] = None) -> bool:
+        """Cancel an event by ID."""
+
+    @abstractmethod
+    def reschedule_meeting(self, event_id: str, new_start: str, new_end: str, user_id: Optional[int] = None):
+        """Move an event and return its HTML link."""
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget any cached client state for a user, e.g. after re-authorization."""
+        # Deliberately not abstract: providers without per-user state have nothing to forget
+        return None
+
+    def process_events(self, events: list, timezone: str, fields: Optional[Sequence[str]] = None):
+        """Convert raw Google Calendar events into frontend-friendly format.
+
+        Args:
+            events (list): Raw event resources.
+            timezone (str): IANA zone for the ``start``/``end`` values.
+            fields: Optional projection of output keys; see ``EVENT_FIELDS``.
+        """
+        try:
+            return list(iter_normalized_events(events, timezone, fields))
+        except Exception as e:
+            logger.error(f"Error in process_events: {e}", exc_info=True)
+            return []
+
+    def iter_processed_events(self, events: Iterable[dict], timezone: str,
+                              fields: Optional[Sequence[str]] = None) -> Iterator[dict]:
+        """Streaming variant of ``process_events`` for large event lists."""
+        return iter_normalized_events(events, timezone, fields)
+
+
+_provider: Optional[CalendarProvider] = None
+_provider_lock = threading.Lock()
+
+
+def create_calendar_provider(name: Optional[str] = None, db=None) -> CalendarProvider:
+    """Build a calendar provider by name (``google`` or ``fake``).
+
+    Args:
+        name (str): Provider name. Defaults to the ``CALENDAR_PROVIDER`` env var, then ``google``.
+        db: The process's ``AppDatabase``; the Google provider reads and refreshes
+            per-user tokens through it.
+    """
+    name = (name or os.getenv("CALENDAR_PROVIDER", "google")).strip().lower()
+    # Imported lazily so the fake provider works without Google client libraries.
+    if name == "google":
+        from services.calendar_service import CalendarService
+        return CalendarService(db=db)
+    if name == "fake":
+        from services.fake_calendar_service import FakeCalendarService
+        return FakeCalendarService.from_env()
+    raise ValueError(f"Unknown calendar provider '{name}'")
+
+
+def get_calendar_provider(db=None) -> CalendarProvider:
+    """Return the process-wide calendar provider selected by configuration.
+
+    Args:
+        db: The process's ``AppDatabase``, used when the provider is first built.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_calendar_provider(db=db)
+            logger.info(f"Using '{_provider.name}' calendar provider.")
+        return _provider
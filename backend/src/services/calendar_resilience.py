@@ -0,0 +1,336 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, ClassVar, Dict, Optional, TypeVar
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+T = TypeVar("T")
+
+RATE_LIMIT_REASONS = {"ratelimitexceeded", "userratelimitexceeded"}
+
+THROTTLED = registry.counter(
+    "calendar_throttled_total", "Calendar calls delayed or rejected by the local rate limiter."
+)
+RETRIES = registry.counter(
+    "calendar_retries_total", "Calendar calls retried after a transient error."
+)
+CALLS = registry.counter(
+    "calendar_calls_total", "Calendar calls by operation and outcome."
+)
+BREAKER_STATE = registry.gauge(
+    "calendar_breaker_state", "Calendar circuit breaker state (0=closed, 1=half-open, 2=open)."
+)
+BREAKER_REJECTIONS = registry.counter(
+    "calendar_breaker_rejections_total", "Calendar calls failed fast while the breaker was open."
+)
+
+
+class CalendarUnavailableError(RuntimeError):
+    """Raised when the calendar cannot be reached and callers should degrade.
+
+    The agent answers this with an "I'll confirm by email" style response
+    instead of keeping the caller waiting on Google.
+    """
+
+
+def _error_status(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        resp = getattr(exc, "resp", None)
+        status = getattr(resp, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_reasons(exc: BaseException) -> set:
+    reasons = set()
+    for detail in getattr(exc, "error_details", None) or []:
+        if isinstance(detail, dict) and detail.get("reason"):
+            reasons.add(str(detail["reason"]).lower())
+    text = str(exc).lower()
+    reasons.update(reason for reason in RATE_LIMIT_REASONS if reason in text)
+    return reasons
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for 429s and 403s that Google uses to signal rate limiting."""
+    status = _error_status(exc)
+    if status == 429:
+        return True
+    return status == 403 and bool(_error_reasons(exc) & RATE_LIMIT_REASONS)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """True for errors worth retrying: rate limits, 5xx and network failures."""
+    if is_rate_limit_error(exc):
+        return True
+    status = _error_status(exc)
+    if status is not None:
+        return 500 <= status < 600
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return how long the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, tokens: float = 1.0) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+class RateLimiter:
+    """Per-project and per-user token buckets in front of the Calendar API."""
+
+    def __init__(self, user_rate: float, user_burst: float, project_rate: float,
+                 project_burst: float, max_wait: float, max_users: int = 1024):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_wait = max_wait
+        self.max_users = max_users
+        self.project_bucket = TokenBucket(project_rate, project_burst)
+        self._user_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user_bucket(self, user_key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._user_buckets.get(user_key)
+            if bucket is None:
+                bucket = TokenBucket(self.user_rate, self.user_burst)
+                self._user_buckets[user_key] = bucket
+                if len(self._user_buckets) > self.max_users:
+                    self._user_buckets.popitem(last=False)
+            else:
+                self._user_buckets.move_to_end(user_key)
+            return bucket
+
+    def acquire(self, user_key: Optional[str] = None) -> None:
+        """Block until both buckets allow the call.
+
+        Raises:
+            CalendarUnavailableError: If the wait would exceed ``max_wait``.
+        """
+        buckets = [("project", self.project_bucket)]
+        if user_key:
+            buckets.append(("user", self._user_bucket(user_key)))
+
+        wait = 0.0
+        reserved = []
+        for scope, bucket in buckets:
+            scope_wait = bucket.reserve()
+            reserved.append(bucket)
+            if scope_wait > 0:
+                THROTTLED.inc(scope=scope)
+            wait = max(wait, scope_wait)
+
+        if wait > self.max_wait:
+            for bucket in reserved:
+                bucket.refund()
+            THROTTLED.inc(scope="rejected")
+            raise CalendarUnavailableError(
+                f"Calendar rate limit reached; would need to wait {wait:.1f}s"
+            )
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated calendar failures, probing again after a cool-down."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES: ClassVar[Dict[str, int]] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"Calendar circuit breaker {self._state} -> {state}")
+        self._state = state
+        BREAKER_STATE.set(self._STATE_VALUES[state])
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(self.HALF_OPEN)
+            self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+
+class CalendarResilience:
+    """Rate limiting, jittered retries and a circuit breaker for calendar calls."""
+
+    def __init__(self, rate_limiter: RateLimiter, breaker: CircuitBreaker,
+                 max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    @classmethod
+    def from_env(cls) -> "CalendarResilience":
+        """Build the default policy, overridable through ``CALENDAR_*`` env vars."""
+        env = os.getenv
+        limiter = RateLimiter(
+            user_rate=float(env("CALENDAR_USER_QPS", "5")),
+            user_burst=float(env("CALENDAR_USER_BURST", "10")),
+            project_rate=float(env("CALENDAR_PROJECT_QPS", "50")),
+            project_burst=float(env("CALENDAR_PROJECT_BURST", "100")),
+            max_wait=float(env("CALENDAR_MAX_THROTTLE_WAIT", "2")),
+        )
+        breaker = CircuitBreaker(
+            failure_threshold=int(env("CALENDAR_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(env("CALENDAR_BREAKER_RESET_SECONDS", "30")),
+        )
+        return cls(
+            limiter,
+            breaker,
+            max_attempts=int(env("CALENDAR_RETRY_ATTEMPTS", "3")),
+            base_delay=float(env("CALENDAR_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(env("CALENDAR_RETRY_MAX_DELAY", "4")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) retry attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def call(self, fn: Callable[[], T], operation: str, user_key: Optional[str] = None,
+             idempotent: bool = True) -> T:
+        """Run ``fn`` under the rate limiter, retry policy and circuit breaker.
+
+        Non-idempotent operations (inserts) are only retried on rate-limit
+        responses, which Google rejects before doing any work.
+
+        Raises:
+            CalendarUnavailableError: When the breaker is open, the rate limit
+                wait is too long, or transient errors persist after retries.
+        """
+        if not self.breaker.allow_request():
+            BREAKER_REJECTIONS.inc(operation=operation)
+            CALLS.inc(operation=operation, outcome="rejected")
+            raise CalendarUnavailableError("Calendar circuit breaker is open")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.rate_limiter.acquire(user_key)
+            except CalendarUnavailableError:
+                CALLS.inc(operation=operation, outcome="throttled")
+                # A local throttle says nothing about Google's health.
+                self.breaker.release_probe()
+                raise
+
+            try:
+                result = fn()
+            except Exception as exc:
+                transient = is_transient_error(exc)
+                retryable = transient and (idempotent or is_rate_limit_error(exc))
+                if retryable and attempt < self.max_attempts:
+                    delay = self.backoff(attempt)
+                    RETRIES.inc(operation=operation)
+                    logger.warning(
+                        f"Calendar {operation} failed with {exc!r}; retry {attempt}/{self.max_attempts - 1} in {delay:.2f}s"
+                    )
+                    self._sleep(delay)
+                    continue
+
+                if transient:
+                    self.breaker.record_failure()
+                    CALLS.inc(operation=operation, outcome="unavailable")
+                    raise CalendarUnavailableError(
+                        f"Calendar {operation} failed after {attempt} attempt(s): {exc}"
+                    ) from exc
+
+                # Permanent errors (bad request, not found) mean Google is up.
+                self.breaker.record_success()
+                CALLS.inc(operation=operation, outcome="error")
+                raise
+
+            self.breaker.record_success()
+            CALLS.inc(operation=operation, outcome="ok")
+            return result
+
+
+_default_resilience: Optional[CalendarResilience] = None
+_default_lock = threading.Lock()
+
+
+def get_default_resilience() -> CalendarResilience:
+    """Process-wide policy, so quota and breaker state survive client rebuilds."""
+    global _default_resilience
+    with _default_lock:
+        if _default_resilience is None:
+            _default_resilience = CalendarResilience.from_env()
+        return _default_resilience
@@ -3,30 +3,83 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 from googleapiclient.errors import HttpError
+from google_auth_httplib2 import AuthorizedHttp
 import datetime
 import os
 import logging
 import datetime 
-from dateutil import parser
-import pytz
+import threading
+from typing import Optional
+import httplib2
+from services.calendar_credentials import (
+    CalendarClientPool,
+    CalendarCredentialsError,
+    UserCalendarClient,
+    load_client_config,
+)
+from services.calendar_provider import CalendarProvider
+from services.calendar_resilience import CalendarResilience, get_default_resilience
+from services.metrics import registry
+
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+MAX_PAGE_SIZE = 2500  # Largest maxResults the events.list endpoint accepts
 
 logger = logging.getLogger("agent")
 
-class CalendarService:
+SHARED_FALLBACKS = registry.counter(
+    "calendar_shared_account_fallbacks_total",
+    "Calendar calls served by the shared account, by reason (no_token: the user has no stored token; no_user).",
+)
+
+class CalendarService(CalendarProvider):
     """A service for interacting with Google Calendar."""
 
-    def __init__(self, credentials_path: str = "../../config/credentials.json", token_path: str = "token.json"):
+    name = "google"
+
+    def __init__(
+        self,
+        credentials_path: str = "../../config/credentials.json",
+        token_path: str = "token.json",
+        resilience: Optional[CalendarResilience] = None,
+        db=None,
+        shared_account: Optional[bool] = None,
+    ):
         """
         Initializes the Google Calendar client with proper authentication.
 
         Args:
             credentials_path (str): Path to OAuth 2.0 client credentials JSON file.
             token_path (str): Path to store the user's access and refresh tokens.
+            resilience (CalendarResilience): Rate limit, retry and circuit breaker
+                policy applied to every API call. Defaults to the process-wide policy.
+            db: ``AppDatabase`` holding per-user tokens; pass the process's instance so
+                refreshed tokens are written through it. Created on first per-user call if omitted.
+            shared_account (bool): Whether to also authorize the single ``token.json``
+                account, used for calls without a user and for users without a stored
+                token. Defaults to the ``CALENDAR_SHARED_ACCOUNT`` env var (true).
         """
         self.credentials_path = credentials_path
         self.token_path = token_path
         self.service = None
+        self.creds = None
+        self.http_timeout = float(os.getenv("CALENDAR_HTTP_TIMEOUT", "10"))
+        self.resilience = resilience or get_default_resilience()
+        self._local = threading.local()
+        if shared_account is None:
+            shared_account = os.getenv("CALENDAR_SHARED_ACCOUNT", "true").lower() in ("1", "true", "yes")
+        self.shared_account = shared_account
+        self._db = db
+        self.pool = CalendarClientPool(
+            db=db,
+            client_config_loader=lambda: load_client_config(self.credentials_path),
+            scopes=SCOPES,
+            max_size=int(os.getenv("CALENDAR_CLIENT_CACHE_SIZE", "256")),
+            http_timeout=self.http_timeout,
+        )
+
+        if not self.shared_account:
+            logger.info("Shared calendar account disabled; using per-user credentials only.")
+            return
 
         try:
             logger.info("Initializing Google Calendar service...")
@@ -68,7 +121,8 @@ class CalendarService:
                     logger.debug(f"Credentials saved to {self.token_path}")
 
             # Build the calendar service
-            service = build("calendar", "v3", credentials=creds)
+            self.creds = creds
+            service = build("calendar", "v3", http=self._thread_http())
             logger.debug("Google Calendar service object created.")
             return service
 
@@ -82,7 +136,69 @@ class CalendarService:
             logger.error(f"Unexpected error while creating Google Calendar service: {e}", exc_info=True)
             raise
 
-    def create_meeting(self, summary: str, start_time: str, end_time: str, attendees: list[str],timezone : str):
+    def _thread_http(self) -> AuthorizedHttp:
+        """Return an authorized, timeout-bounded HTTP client for the calling thread.
+
+        httplib2 connections are not thread-safe, and calendar calls are made
+        from worker threads, so each thread gets its own client.
+        """
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=httplib2.Http(timeout=self.http_timeout))
+            self._local.http = http
+        return http
+
+    def _user_client(self, user_id: int) -> UserCalendarClient:
+        if self.pool.db is None:
+            if self._db is None:
+                from db.AppDatabase import AppDatabase
+                self._db = AppDatabase()
+            self.pool.db = self._db
+        return self.pool.get(user_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.pool.invalidate(user_id)
+
+    def _execute(self, make_request, operation: str, user_id: Optional[int] = None, idempotent: bool = True):
+        """Execute a Google API request for a user through the resilience layer.
+
+        Args:
+            make_request: Builds the request from an authorized service object.
+            operation (str): Operation name used for metrics and logs.
+            user_id (int): User whose calendar to use; ``None`` uses the shared account.
+            idempotent (bool): Whether the request is safe to retry on server errors.
+        """
+        client = None
+        if user_id is not None:
+            try:
+                client = self._user_client(user_id)
+            except CalendarCredentialsError:
+                if self.service is None:
+                    raise
+                SHARED_FALLBACKS.inc(reason="no_token")
+                logger.warning(f"No calendar token for user_id={user_id}; using the shared account for {operation}.")
+        elif self.service is None:
+            raise CalendarCredentialsError("No user given and the shared calendar account is disabled.")
+        else:
+            SHARED_FALLBACKS.inc(reason="no_user")
+            logger.info(f"No user given; using the shared calendar account for {operation}.")
+
+        service = client.service if client else self.service
+        http = client.http if client else self._thread_http
+        request = make_request(service)
+        try:
+            return self.resilience.call(
+                lambda: request.execute(http=http()),
+                operation=operation,
+                user_key=str(user_id) if user_id is not None else None,
+                idempotent=idempotent,
+            )
+        finally:
+            if client is not None:
+                self.pool.persist(client)
+
+    def create_meeting(self, summary: str, start_time: str, end_time: str, attendees: list[str],timezone : str,
+                       user_id: Optional[int] = None, event_id: Optional[str] = None):
         """Create a new calendar meeting."""
         cleaned_attendees = [email.replace(' ', '') for email in attendees]
         event = {
@@ -91,83 +207,65 @@ class CalendarService:
             "end": {"dateTime": end_time, "timeZone": timezone},
             "attendees": [{"email": email} for email in cleaned_attendees],
         }
-        created_event = self.service.events().insert(calendarId="primary", body=event).execute()
+        if event_id:
+            event["id"] = event_id
+        try:
+            # A client-supplied ID makes the insert safe to retry on 5xx/timeouts.
+            created_event = self._execute(
+                lambda service: service.events().insert(calendarId="primary", body=event),
+                "insert", user_id=user_id, idempotent=bool(event_id),
+            )
+        except HttpError as e:
+            if not event_id or e.resp.status != 409:
+                raise
+            # 409 duplicate: an earlier attempt already created this event.
+            logger.info(f"Calendar event {event_id} already exists; reusing it")
+            created_event = self._execute(
+                lambda service: service.events().get(calendarId="primary", eventId=event_id),
+                "get", user_id=user_id,
+            )
         return created_event.get("id"), created_event.get("htmlLink")
 
-    def list_meetings(self, max_results: int = 10):
-        """List upcoming meetings."""
-        now = datetime.datetime.utcnow().isoformat() + "Z"
-        events_result = (
-            self.service.events()
-            .list(calendarId="primary", timeMin=now, maxResults=max_results, singleEvents=True, orderBy="startTime")
-            .execute()
-        )
-        logger.info(events_result)
-        return events_result.get("items", [])
+    def list_meetings(self, max_results: int = 10, user_id: Optional[int] = None,
+                      time_min: Optional[str] = None, time_max: Optional[str] = None):
+        """List meetings from ``time_min`` (default now), following result pages up to ``max_results``."""
+        time_min = time_min or datetime.datetime.utcnow().isoformat() + "Z"
+        items = []
+        page_token = None
+        while True:
+            events_result = self._execute(
+                lambda service: service.events().list(
+                    calendarId="primary", timeMin=time_min, timeMax=time_max,
+                    maxResults=min(max_results - len(items), MAX_PAGE_SIZE),
+                    singleEvents=True, orderBy="startTime", pageToken=page_token,
+                ),
+                "list", user_id=user_id,
+            )
+            items.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token or len(items) >= max_results:
+                break
+        logger.debug(f"Fetched {len(items)} calendar events for user_id={user_id}")
+        return items
 
-    def cancel_meeting(self, event_id: str):
+    def cancel_meeting(self, event_id: str, user_id: Optional[int] = None):
         """Cancel a meeting by event ID."""
-        self.service.events().delete(calendarId="primary", eventId=event_id).execute()
+        self._execute(
+            lambda service: service.events().delete(calendarId="primary", eventId=event_id),
+            "delete", user_id=user_id,
+        )
         return True
 
-    def reschedule_meeting(self, event_id: str, new_start: str, new_end: str):
+    def reschedule_meeting(self, event_id: str, new_start: str, new_end: str, user_id: Optional[int] = None):
         """Reschedule an existing meeting."""
-        event = self.service.events().get(calendarId="primary", eventId=event_id).execute()
+        event = self._execute(
+            lambda service: service.events().get(calendarId="primary", eventId=event_id),
+            "get", user_id=user_id,
+        )
         event["start"]["dateTime"] = new_start
         event["end"]["dateTime"] = new_end
-        updated_event = self.service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
-        return updated_event.get("htmlLink")    
-    
-    def process_events(self, events: list, timezone: str):
-        """Convert raw Google Calendar events into frontend-friendly format."""
-        try:
-            
-            tz = pytz.timezone(timezone)
-    
-            processed_events = []
-            for event in events:
-                #start_time_aware = parser.parse(event["start"]["dateTime"])
-                #end_time_aware = parser.parse(event["end"]["dateTime"])
-                start = event.get("start", {})
-                if "dateTime" in start:
-                    start_time_aware = parser.parse(start["dateTime"])
-                elif "date" in start:
-                    start_time_aware = parser.parse(start["date"])
-                else:
-            # If neither exists, skip
-                    continue
-
-                end = event.get("end", {})
-                if "dateTime" in end:
-                    end_time_aware = parser.parse(end["dateTime"])
-                elif "date" in start:
-                    end_time_aware = parser.parse(end["date"])
-                else:
-            # If neither exists, skip
-                    continue
-
-
-                processed_events.append({
-                    "id": event.get("id", ""),
-                    "title": event.get("summary", "No Title"),
-                    "description": event.get("description", ""),
-                    "location": event.get("location", ""),
-                    "status": event.get("status", "confirmed"),
-                    "organizer": event.get("organizer", {}).get("email", ""),
-                    "creator": event.get("creator", {}).get("email", ""),
-                    "created": event.get("created", ""),
-                    "updated": event.get("updated", ""),
-                    "attendees": event.get("attendees", []),
-                    "hangoutLink": event.get("hangoutLink", ""),
-                    "htmlLink": event.get("htmlLink", ""),
-                    "recurrence": event.get("recurrence", []),
-                    "recurringEventId": event.get("recurringEventId", ""),
-                    "start": start_time_aware.astimezone(tz).isoformat(),
-                    "end": end_time_aware.astimezone(tz).isoformat(),
-                })
-    
-            return processed_events
-    
-        except Exception as e:
-            logger.error(f"Error in process_events: {e}", exc_info=True)
-            return []
\ No newline at end of file
+        updated_event = self._execute(
+            lambda service: service.events().update(calendarId="primary", eventId=event_id, body=event),
+            "update", user_id=user_id,
+        )
+        return updated_event.get("htmlLink")
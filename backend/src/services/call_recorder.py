@@ -0,0 +1,322 @@
+import asyncio
+import contextlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import av
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice import io
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+RECORDINGS = registry.counter("agent_call_recordings_total", "Call recordings by result (saved, failed).")
+RECORDER_DROPPED = registry.counter(
+    "agent_recorder_dropped_frames_total", "Audio frames a recorder dropped because its queue was full, by channel."
+)
+RECORDER_CPU = registry.histogram(
+    "agent_recorder_cpu_ratio", "Encoder-thread CPU time over recorded duration, per call."
+)
+RECORDER_MEMORY = registry.histogram(
+    "agent_recorder_peak_buffer_bytes", "Most audio a recorder held in memory before encoding it, per call."
+)
+
+CALLER, AGENT = 0, 1
+CODECS = {"opus": ("libopus", "ogg"), "flac": ("flac", "flac")}
+
+# Audio is encoded once it is this old; a late caller frame or a
+# barge-in that cuts the agent short can still change it until then.
+SETTLE_SECONDS = 1.0
+FLUSH_INTERVAL = 1.0
+# A frame this close to where its source left off continues it
+# (network jitter, TTS pushed ahead of playback); further away starts a new run.
+RESYNC_SECONDS = 0.1
+
+
+@dataclass
+class RecordingResult:
+    path: str
+    duration_seconds: float
+    size_bytes: int
+    cpu_seconds: float
+    peak_buffer_bytes: int
+    dropped_frames: int
+
+
+@dataclass
+class _Frame:
+    channel: int
+    source: str
+    at: float
+    pcm: bytes
+    sample_rate: int
+    num_channels: int
+
+
+@dataclass
+class _Truncate:
+    channel: int
+    at: float
+
+
+class CallRecorder:
+    """Records a call to disk: the caller on the left channel, the agent on the right.
+
+    The audio path only hands frames to a bounded queue and never waits; when
+    the queue is full the frame is dropped and counted. A background thread
+    places frames on the call's timeline, encodes each settled stretch
+    (Opus in Ogg, or FLAC) and writes it to the file as it goes, so memory
+    stays at a few seconds of audio per call. When the agent is interrupted,
+    the speech it never played is cut from the recording.
+    """
+
+    def __init__(self, path: str, codec: str = "opus", sample_rate: int = 48000, max_queue: int = 1000):
+        """
+        Args:
+            path (str): File to write.
+            codec (str): ``opus`` (Ogg) or ``flac``.
+            sample_rate (int): Recording rate; both sides are resampled to it.
+            max_queue (int): Frames that may wait for the encoder (about 10 ms each).
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported recording codec '{codec}'; use one of {', '.join(CODECS)}.")
+        self.path = path
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._result: Optional[RecordingResult] = None
+        self.started_at: Optional[float] = None
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> Optional["CallRecorder"]:
+        """Recorder for one call if ``AGENT_RECORDING_DIR`` is set, else None (recording is opt-in)."""
+        directory = os.getenv("AGENT_RECORDING_DIR")
+        if not directory:
+            return None
+        codec = os.getenv("AGENT_RECORDING_CODEC", "opus").lower()
+        extension = CODECS.get(codec, ("", "ogg"))[1]
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        path = os.path.join(directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+        return cls(path, codec=codec, max_queue=int(os.getenv("AGENT_RECORDING_QUEUE_FRAMES", "1000")))
+
+    def start(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"call-recorder-{os.path.basename(self.path)}",
+                                        daemon=True)
+        self._thread.start()
+
+    def push(self, channel: int, frame: rtc.AudioFrame, source: Optional[str] = None) -> None:
+        """Queue ``frame`` as heard now; never blocks."""
+        if self.started_at is None or self._closing.is_set():
+            return
+        item = _Frame(channel, source or str(channel), time.time(), bytes(frame.data),
+                      frame.sample_rate, frame.num_channels)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            RECORDER_DROPPED.inc(channel="caller" if channel == CALLER else "agent")
+
+    def truncate(self, channel: int) -> None:
+        """Drop audio queued on ``channel`` past now (agent speech cut off by a barge-in)."""
+        if self.started_at is None or self._closing.is_set():
+            return
+        with contextlib.suppress(queue.Full):
+            self._queue.put_nowait(_Truncate(channel, time.time()))
+
+    async def record_track(self, track: rtc.Track, source: str) -> None:
+        """Copy a remote audio track into the caller channel until it ends."""
+        stream = rtc.AudioStream(track, sample_rate=self.sample_rate, num_channels=1)
+        try:
+            async for event in stream:
+                self.push(CALLER, event.frame, source)
+        finally:
+            await stream.aclose()
+
+    def wrap_output(self, output: io.AudioOutput) -> "RecordingAudioOutput":
+        """Pass-through for the agent's audio output that also records what it plays."""
+        return RecordingAudioOutput(self, output)
+
+    async def aclose(self, timeout: float = 10.0) -> Optional[RecordingResult]:
+        """Finish the file; returns what was recorded, or None if recording failed."""
+        if self._thread is None:
+            return None
+        self._closing.set()
+        with contextlib.suppress(queue.Full):
+            self._queue.put_nowait(None)  # wake the encoder
+        await asyncio.to_thread(self._thread.join, timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Recorder for {self.path} did not finish within {timeout}s")
+            return None
+        return self._result
+
+    def _run(self) -> None:
+        timeline = _Timeline(self.sample_rate, self.started_at)
+        cpu_start = time.thread_time()
+        frame_bytes = self.sample_rate // 100 * 2
+        peak = 0
+        codec, container_format = CODECS[self.codec]
+        try:
+            with av.open(self.path, mode="w", format=container_format) as container:
+                stream = container.add_stream(codec, rate=self.sample_rate, layout="stereo")
+                last_flush = time.monotonic()
+                while not (self._closing.is_set() and self._queue.empty()):
+                    try:
+                        item = self._queue.get(timeout=FLUSH_INTERVAL)
+                    except queue.Empty:
+                        item = None
+                    if isinstance(item, _Frame):
+                        timeline.place(item)
+                    elif isinstance(item, _Truncate):
+                        timeline.truncate(item.channel, item.at)
+                    peak = max(peak, timeline.buffered_bytes + self._queue.qsize() * frame_bytes)
+                    if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                        self._encode(container, stream, timeline.take(time.time() - SETTLE_SECONDS))
+                        last_flush = time.monotonic()
+                self._encode(container, stream, timeline.take(None))
+                for packet in stream.encode(None):
+                    container.mux(packet)
+        except Exception:
+            logger.exception(f"Recording to {self.path} failed")
+            RECORDINGS.inc(result="failed")
+            return
+        cpu = time.thread_time() - cpu_start
+        duration = timeline.cursor / self.sample_rate
+        self._result = RecordingResult(
+            path=self.path,
+            duration_seconds=duration,
+            size_bytes=os.path.getsize(self.path),
+            cpu_seconds=cpu,
+            peak_buffer_bytes=peak,
+            dropped_frames=self.dropped,
+        )
+        RECORDINGS.inc(result="saved")
+        if duration > 0:
+            RECORDER_CPU.observe(cpu / duration)
+        RECORDER_MEMORY.observe(peak)
+
+    def _encode(self, container, stream, block: Optional[np.ndarray]) -> None:
+        if block is None or not block.shape[1]:
+            return
+        frame = av.AudioFrame.from_ndarray(np.ascontiguousarray(block.T).reshape(1, -1), format="s16", layout="stereo")
+        frame.sample_rate = self.sample_rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+
+
+class _Timeline:
+    """Both channels' audio placed by sample position, from the first frame to the encoded cursor."""
+
+    def __init__(self, sample_rate: int, t0: float):
+        self.sample_rate = sample_rate
+        self.t0 = t0
+        self.cursor = 0  # everything before this sample is encoded
+        self._placed: List[List[Tuple[int, np.ndarray]]] = [[], []]
+        self._next: Dict[str, int] = {}  # where each source's run continues
+        self._channels: Dict[str, int] = {}
+        self._resamplers: Dict[str, Tuple[int, av.AudioResampler]] = {}
+        self.buffered_bytes = 0
+
+    def _mono(self, item: _Frame) -> np.ndarray:
+        samples = np.frombuffer(item.pcm, dtype=np.int16)
+        if item.num_channels > 1:
+            samples = samples.reshape(-1, item.num_channels).mean(axis=1).astype(np.int16)
+        if item.sample_rate == self.sample_rate:
+            return samples
+        rate, resampler = self._resamplers.get(item.source, (None, None))
+        if rate != item.sample_rate:
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=self.sample_rate)
+            self._resamplers[item.source] = (item.sample_rate, resampler)
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = item.sample_rate
+        out = [f.to_ndarray().reshape(-1) for f in resampler.resample(frame)]
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.int16)
+
+    def place(self, item: _Frame) -> None:
+        samples = self._mono(item)
+        arrived = round((item.at - self.t0) * self.sample_rate)
+        position = self._next.get(item.source)
+        if position is None or arrived > position + RESYNC_SECONDS * self.sample_rate:
+            position = arrived
+        self._next[item.source] = position + len(samples)
+        self._channels[item.source] = item.channel
+        if position < self.cursor:
+            # Already encoded; keep only the part still ahead of the cursor
+            samples = samples[self.cursor - position:]
+            position = self.cursor
+        if len(samples):
+            self._placed[item.channel].append((position, samples))
+            self.buffered_bytes += samples.nbytes
+
+    def truncate(self, channel: int, at: float) -> None:
+        cut = max(self.cursor, round((at - self.t0) * self.sample_rate))
+        self._placed[channel] = [(position, samples[:cut - position])
+                                 for position, samples in self._placed[channel] if position < cut]
+        for source, source_channel in self._channels.items():
+            if source_channel == channel and self._next.get(source, 0) > cut:
+                self._next[source] = cut
+        self._recount()
+
+    def _recount(self) -> None:
+        self.buffered_bytes = sum(samples.nbytes for placed in self._placed for _, samples in placed)
+
+    def take(self, until: Optional[float]) -> Optional[np.ndarray]:
+        """Mixed stereo samples from the cursor to ``until`` (or to the end of what's placed)."""
+        if until is None:
+            end = max((p + len(s) for placed in self._placed for p, s in placed), default=self.cursor)
+        else:
+            end = round((until - self.t0) * self.sample_rate)
+        if end <= self.cursor:
+            return None
+        block = np.zeros((2, end - self.cursor), dtype=np.int32)
+        for channel, placed in enumerate(self._placed):
+            kept = []
+            for position, samples in placed:
+                stop = position + len(samples)
+                lo, hi = max(position, self.cursor), min(stop, end)
+                if hi > lo:
+                    block[channel, lo - self.cursor:hi - self.cursor] += samples[lo - position:hi - position]
+                if stop > end:
+                    kept.append((max(position, end), samples[max(0, end - position):]))
+            self._placed[channel] = kept
+        self.cursor = end
+        self._recount()
+        return np.clip(block, -32768, 32767).astype(np.int16)
+
+
+class RecordingAudioOutput(io.AudioOutput):
+    """Forwards the agent's audio to the next output and hands a copy to the recorder."""
+
+    def __init__(self, recorder: CallRecorder, next_in_chain: io.AudioOutput):
+        super().__init__(
+            label="CallRecorder",
+            capabilities=io.AudioOutputCapabilities(pause=True),
+            next_in_chain=next_in_chain,
+            sample_rate=next_in_chain.sample_rate,
+        )
+        self._recorder = recorder
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        self._recorder.push(AGENT, frame)
+        await self.next_in_chain.capture_frame(frame)
+
+    def flush(self) -> None:
+        super().flush()
+        self.next_in_chain.flush()
+
+    def clear_buffer(self) -> None:
+        self.next_in_chain.clear_buffer()
+        self._recorder.truncate(AGENT)
@@ -0,0 +1,212 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.latency import calls_in_flight
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+WORKER_LOAD = registry.gauge(
+    "agent_worker_load", "Load reported to the LiveKit dispatcher (component=score) and its inputs."
+)
+JOBS_REJECTED = registry.counter("agent_jobs_rejected_total", "Job requests turned away, by reason.")
+
+DEFAULT_LOAD_DIR = os.path.join(tempfile.gettempdir(), "vocameet-agent-load")
+DEFAULT_DRAIN_FILE = os.path.join(tempfile.gettempdir(), "vocameet-agent.drain")
+
+
+# ---------------- JOB PROCESS SIDE ----------------
+class JobLoadReporter:
+    """Publishes one job process's event-loop lag and pending calls for the worker.
+
+    Jobs run in child processes while ``load_fnc`` runs in the worker, so each
+    job writes a small JSON snapshot to ``directory`` every ``interval``
+    seconds; ``read_snapshots`` collects them on the worker side.
+    """
+
+    def __init__(self, directory: Optional[str] = None, interval: float = 1.0, window: int = 10):
+        self.directory = directory or os.getenv("AGENT_LOAD_DIR", DEFAULT_LOAD_DIR)
+        self.interval = interval
+        self.path = os.path.join(self.directory, f"{os.getpid()}.json")
+        self._lags = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, room: str) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(room), name="job-load-reporter")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
+
+    def snapshot(self, room: str) -> Dict[str, Any]:
+        pending = calls_in_flight()
+        return {
+            "pid": os.getpid(),
+            "room": room,
+            "lag": max(self._lags, default=0.0),
+            "pending": sum(pending.values()),
+            "pending_by_kind": pending,
+            "updated": time.time(),
+        }
+
+    def write(self, room: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(room), f)
+        os.replace(tmp_path, self.path)
+
+    async def _run(self, room: str) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(0.0, loop.time() - started - self.interval))
+            try:
+                self.write(room)
+            except OSError as e:
+                logger.warning(f"Could not publish job load: {e}")
+
+
+def read_snapshots(directory: Optional[str] = None, max_age: float = 10.0) -> List[Dict[str, Any]]:
+    """Fresh snapshots from running jobs; stale ones (crashed jobs) are deleted."""
+    directory = directory or os.getenv("AGENT_LOAD_DIR", DEFAULT_LOAD_DIR)
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    now = time.time()
+    snapshots = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - snapshot.get("updated", 0) > max_age:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            continue
+        snapshots.append(snapshot)
+    return snapshots
+
+
+# ---------------- WORKER SIDE ----------------
+class CapacityModel:
+    """Decides how loaded this worker is and whether it takes another call.
+
+    The score is the most saturated of four signals, each scaled to 0..1:
+    active sessions over ``max_sessions``, the worst job's event-loop lag over
+    ``lag_budget``, CPU, and pending tool/DB/calendar calls over
+    ``pending_budget``. LiveKit stops dispatching once it crosses the
+    worker's ``load_threshold``; ``admit`` also rejects jobs past
+    ``max_sessions``. Touching ``drain_file`` after the worker started puts
+    it in drain mode: load reads 1.0 and new jobs are rejected while
+    running calls finish, which is what a deploy waits for.
+    """
+
+    def __init__(self, max_sessions: int = 8, lag_budget: float = 0.2, pending_budget: int = 32,
+                 drain_file: str = DEFAULT_DRAIN_FILE, load_dir: Optional[str] = None,
+                 cpu_percent: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            max_sessions (int): Concurrent calls this worker accepts.
+            lag_budget (float): Event-loop lag (seconds) that counts as full.
+            pending_budget (int): In-flight tool/DB/calendar calls that count as full.
+            drain_file (str): Touch to drain this worker.
+            load_dir (str): Where job processes publish their snapshots.
+            cpu_percent (Callable): Returns CPU use in 0..1; defaults to LiveKit's CPU monitor.
+        """
+        self.max_sessions = max_sessions
+        self.lag_budget = lag_budget
+        self.pending_budget = pending_budget
+        self.drain_file = drain_file
+        self.load_dir = load_dir
+        self.started_at = time.time()
+        self._cpu_percent = cpu_percent
+        self._active_sessions = 0
+        self._was_draining = False
+
+    @classmethod
+    def from_env(cls) -> "CapacityModel":
+        env = os.getenv
+        return cls(
+            max_sessions=int(env("AGENT_MAX_SESSIONS", "8")),
+            lag_budget=float(env("AGENT_LOAD_LAG_BUDGET_MS", "200")) / 1000,
+            pending_budget=int(env("AGENT_LOAD_PENDING_BUDGET", "32")),
+            drain_file=env("AGENT_DRAIN_FILE", DEFAULT_DRAIN_FILE),
+            load_dir=env("AGENT_LOAD_DIR"),
+        )
+
+    def draining(self) -> bool:
+        """True once the drain file was touched after this worker started.
+
+        A file left over from the previous deploy is older and is ignored.
+        """
+        try:
+            return os.path.getmtime(self.drain_file) >= self.started_at
+        except OSError:
+            return False
+
+    def score(self, active_sessions: int, cpu: float,
+              snapshots: List[Dict[str, Any]]) -> Tuple[float, Dict[str, float]]:
+        components = {
+            "sessions": active_sessions / self.max_sessions if self.max_sessions else 1.0,
+            "lag": max((s.get("lag", 0.0) for s in snapshots), default=0.0) / self.lag_budget,
+            "cpu": cpu,
+            "pending": sum(s.get("pending", 0) for s in snapshots) / self.pending_budget,
+        }
+        if self.draining():
+            return 1.0, components
+        return min(1.0, max(components.values())), components
+
+    def _cpu(self) -> float:
+        if self._cpu_percent is None:
+            from livekit.agents.utils.hw import get_cpu_monitor
+
+            monitor = get_cpu_monitor()
+            self._cpu_percent = lambda: monitor.cpu_percent(interval=0.5)
+        return self._cpu_percent()
+
+    def load(self, worker: Any) -> float:
+        """``load_fnc`` for ``WorkerOptions``; LiveKit calls it in a thread every few seconds."""
+        self._active_sessions = len(worker.active_jobs)
+        score, components = self.score(self._active_sessions, self._cpu(), read_snapshots(self.load_dir))
+        WORKER_LOAD.set(score, component="score")
+        for name, value in components.items():
+            WORKER_LOAD.set(value, component=name)
+
+        draining = self.draining()
+        if draining != self._was_draining:
+            self._was_draining = draining
+            logger.info(f"Worker drain mode {'on' if draining else 'off'} "
+                        f"({self._active_sessions} sessions still running)")
+        return score
+
+    async def admit(self, request: Any) -> None:
+        """``request_fnc`` for ``WorkerOptions``: accept unless draining or full."""
+        reason = None
+        if self.draining():
+            reason = "draining"
+        elif self._active_sessions >= self.max_sessions:
+            reason = "full"
+        if reason:
+            JOBS_REJECTED.inc(reason=reason)
+            logger.info(f"Rejecting job for room {request.room.name}: worker {reason}")
+            await request.reject()
+            return
+        # Counted now so a burst of requests between load updates can't overshoot
+        self._active_sessions += 1
+        await request.accept()
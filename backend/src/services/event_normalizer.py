@@ -0,0 +1,98 @@
+import datetime
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+import pytz
+from dateutil import parser
+
+logger = logging.getLogger("agent")
+
+
+@lru_cache(maxsize=128)
+def get_zone(name: str) -> datetime.tzinfo:
+    """Return a cached pytz zone; building one per call is surprisingly costly."""
+    return pytz.timezone(name)
+
+
+def parse_event_time(value: str) -> datetime.datetime:
+    """Parse a Google Calendar timestamp or date.
+
+    RFC 3339 values (``2025-10-14T09:00:00+05:30``, ``...Z``) and plain dates
+    take the ``datetime.fromisoformat`` fast path; anything else falls back to
+    ``dateutil``.
+    """
+    try:
+        if value.endswith("Z"):
+            # fromisoformat only accepts "Z" from Python 3.11 onwards.
+            value = value[:-1] + "+00:00"
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return parser.parse(value)
+
+
+def _event_time(boundary: dict) -> Optional[datetime.datetime]:
+    value = boundary.get("dateTime") or boundary.get("date")
+    return parse_event_time(value) if value else None
+
+
+_FIELD_GETTERS: Dict[str, Callable[[dict], object]] = {
+    "id": lambda e: e.get("id", ""),
+    "title": lambda e: e.get("summary", "No Title"),
+    "description": lambda e: e.get("description", ""),
+    "location": lambda e: e.get("location", ""),
+    "status": lambda e: e.get("status", "confirmed"),
+    "organizer": lambda e: e.get("organizer", {}).get("email", ""),
+    "creator": lambda e: e.get("creator", {}).get("email", ""),
+    "created": lambda e: e.get("created", ""),
+    "updated": lambda e: e.get("updated", ""),
+    "attendees": lambda e: e.get("attendees", []),
+    "hangoutLink": lambda e: e.get("hangoutLink", ""),
+    "htmlLink": lambda e: e.get("htmlLink", ""),
+    "recurrence": lambda e: e.get("recurrence", []),
+    "recurringEventId": lambda e: e.get("recurringEventId", ""),
+}
+
+EVENT_FIELDS = (*_FIELD_GETTERS, "start", "end")
+
+
+def iter_normalized_events(
+    events: Iterable[dict], timezone: str, fields: Optional[Sequence[str]] = None
+) -> Iterator[dict]:
+    """Lazily convert raw Google Calendar events into the frontend format.
+
+    Args:
+        events: Raw event resources from the calendar provider.
+        timezone (str): IANA zone the ``start``/``end`` values are converted to.
+        fields: Optional projection, e.g. ``("id", "title", "start", "end")``.
+            Defaults to every field in ``EVENT_FIELDS``.
+
+    Yields:
+        dict: One normalized event per input event that has a start and end.
+
+    Raises:
+        ValueError: If ``fields`` names an unknown field.
+    """
+    tz = get_zone(timezone)
+    wanted = EVENT_FIELDS if fields is None else tuple(fields)
+    unknown = set(wanted) - set(EVENT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown event fields: {', '.join(sorted(unknown))}")
+
+    getters = [(name, _FIELD_GETTERS[name]) for name in wanted if name in _FIELD_GETTERS]
+    want_start = "start" in wanted
+    want_end = "end" in wanted
+
+    for event in events:
+        start = _event_time(event.get("start", {}))
+        end = _event_time(event.get("end", {}))
+        # Events without both boundaries (e.g. some cancelled instances) are skipped.
+        if start is None or end is None:
+            continue
+
+        item = {name: getter(event) for name, getter in getters}
+        if want_start:
+            item["start"] = start.astimezone(tz).isoformat()
+        if want_end:
+            item["end"] = end.astimezone(tz).isoformat()
+        yield item
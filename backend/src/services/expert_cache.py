@@ -0,0 +1,42 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from services.response_cache import TTLCache
+
+logger = logging.getLogger("agent")
+
+
+class ExpertCache:
+    """In-memory copy of the ``experts`` table for one worker process.
+
+    Experts change rarely, but ``fetch_experts`` and ``get_expert`` run on
+    almost every booking turn. The list is loaded once in prewarm and
+    refreshed after ``ttl`` seconds.
+    """
+
+    def __init__(self, db, ttl: Optional[float] = None):
+        self.db = db
+        ttl = float(os.getenv("EXPERT_CACHE_TTL", "300")) if ttl is None else ttl
+        self._cache = TTLCache("experts", ttl=ttl, max_entries=1)
+
+    def all(self) -> List[Dict[str, Any]]:
+        experts = self._cache.get("all")
+        if experts is None:
+            experts = self.db.get_all_experts() or []
+            self._cache.set("all", experts)
+            logger.info(f"Loaded {len(experts)} experts into the expert cache")
+        return experts
+
+    def get(self, expert_id: int) -> Optional[Dict[str, Any]]:
+        """Look up one expert, falling back to the database for ones added since the last load."""
+        for expert in self.all():
+            if expert.get("id") == expert_id:
+                return expert
+        return self.db.get_expert(expert_id)
+
+    def warm(self) -> int:
+        return len(self.all())
+
+    def invalidate(self) -> None:
+        self._cache.clear()
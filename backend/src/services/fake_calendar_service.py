@@ -0,0 +1,269 @@
+import datetime
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Sequence
+
+from services.calendar_provider import CalendarProvider
+from services.calendar_resilience import CalendarResilience, get_default_resilience
+
+logger = logging.getLogger("agent")
+
+# Google event IDs use base32hex characters (a-v, 0-9).
+_BASE32HEX = "0123456789abcdefghijklmnopqrstuv"
+DEFAULT_USER_KEY = "primary"
+
+
+class FakeCalendarError(Exception):
+    """Injected failure shaped like ``googleapiclient.errors.HttpError``."""
+
+    def __init__(self, status: int, reason: str = "backendError"):
+        super().__init__(f"<FakeCalendarError {status} {reason}>")
+        self.status_code = status
+        self.reason = reason
+        self.error_details = [{"reason": reason}]
+
+
+def _new_event_id() -> str:
+    return "".join(_BASE32HEX[b % 32] for b in uuid.uuid4().bytes)
+
+
+def _utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _rfc3339(dt: datetime.datetime) -> str:
+    return dt.astimezone(datetime.timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _to_utc(value: str) -> datetime.datetime:
+    dt = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+
+class FakeCalendarService(CalendarProvider):
+    """Offline calendar backed by SQLite, for benchmarks and load tests.
+
+    Events are stored in the Google Calendar v3 resource shape and partitioned
+    by user, so one fake can stand in for many users' calendars.
+    Latency and errors can be injected to exercise the resilience layer.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (503, 429),
+        seed: Optional[int] = None,
+        resilience: Optional[CalendarResilience] = None,
+    ):
+        """
+        Args:
+            db_path (str): SQLite path; ``:memory:`` keeps events in this process only.
+            latency_ms (float): Mean artificial latency added to every call.
+            jitter_ms (float): Uniform +/- jitter applied to the latency.
+            error_rate (float): Probability (0-1) that a call fails with an injected error.
+            error_statuses (Sequence[int]): HTTP statuses to pick injected errors from.
+            seed (int): Seed for reproducible latency and error sequences.
+            resilience (CalendarResilience): Policy to run calls through, as for Google.
+        """
+        self.db_path = db_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.resilience = resilience or get_default_resilience()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fake_events (
+                id TEXT NOT NULL,
+                user_key TEXT NOT NULL,
+                start_utc TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'confirmed',
+                body TEXT NOT NULL,
+                PRIMARY KEY (user_key, id)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fake_events_start ON fake_events (user_key, status, start_utc)"
+        )
+        self._conn.commit()
+        logger.info(f"Fake calendar initialized at {db_path}")
+
+    @classmethod
+    def from_env(cls) -> "FakeCalendarService":
+        """Build a fake configured through ``CALENDAR_FAKE_*`` env vars."""
+        env = os.getenv
+        seed = env("CALENDAR_FAKE_SEED")
+        statuses = env("CALENDAR_FAKE_ERROR_STATUSES", "503,429")
+        return cls(
+            db_path=env("CALENDAR_FAKE_DB", ":memory:"),
+            latency_ms=float(env("CALENDAR_FAKE_LATENCY_MS", "0")),
+            jitter_ms=float(env("CALENDAR_FAKE_JITTER_MS", "0")),
+            error_rate=float(env("CALENDAR_FAKE_ERROR_RATE", "0")),
+            error_statuses=[int(s) for s in statuses.split(",") if s.strip()],
+            seed=int(seed) if seed else None,
+        )
+
+    # ---------------- FAULT INJECTION ----------------
+    def _simulate_network(self) -> None:
+        with self._lock:
+            delay_ms = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._random.random() < self.error_rate
+            status = self._random.choice(self.error_statuses) if fail and self.error_statuses else None
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        if status is not None:
+            reason = "rateLimitExceeded" if status in (403, 429) else "backendError"
+            raise FakeCalendarError(status, reason)
+
+    def _call(self, fn, operation: str, user_id: Optional[int], idempotent: bool = True):
+        def attempt():
+            self._simulate_network()
+            return fn()
+
+        user_key = str(user_id) if user_id is not None else None
+        return self.resilience.call(attempt, operation=operation, user_key=user_key, idempotent=idempotent)
+
+    @staticmethod
+    def _owner(user_id: Optional[int]) -> str:
+        return str(user_id) if user_id is not None else DEFAULT_USER_KEY
+
+    # ---------------- STORAGE ----------------
+    def _load(self, user_key: str, event_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM fake_events WHERE user_key = ? AND id = ?", (user_key, event_id)
+            ).fetchone()
+        if not row:
+            raise FakeCalendarError(404, "notFound")
+        event = json.loads(row[0])
+        if event.get("status") == "cancelled":
+            raise FakeCalendarError(410, "deleted")
+        return event
+
+    def _save(self, user_key: str, event: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fake_events (id, user_key, start_utc, status, body) VALUES (?, ?, ?, ?, ?)",
+                (
+                    event["id"],
+                    user_key,
+                    _rfc3339(_to_utc(event["start"]["dateTime"])),
+                    event["status"],
+                    json.dumps(event),
+                ),
+            )
+            self._conn.commit()
+
+    def reset(self) -> None:
+        """Remove every stored event."""
+        with self._lock:
+            self._conn.execute("DELETE FROM fake_events")
+            self._conn.commit()
+
+    # ---------------- PROVIDER API ----------------
+    def create_meeting(self, summary: str, start_time: str, end_time: str, attendees: list[str], timezone: str,
+                       user_id: Optional[int] = None, event_id: Optional[str] = None):
+        """Create a new calendar meeting."""
+        owner = self._owner(user_id)
+
+        def insert():
+            if event_id:
+                try:
+                    # Same ID as an earlier attempt: return that event, like Google's 409.
+                    return self._load(owner, event_id)
+                except FakeCalendarError:
+                    pass
+            now = _rfc3339(_utc_now())
+            new_id = event_id or _new_event_id()
+            event = {
+                "kind": "calendar#event",
+                "etag": f'"{time.time_ns()}"',
+                "id": new_id,
+                "status": "confirmed",
+                "htmlLink": f"https://calendar.example.invalid/event?eid={new_id}",
+                "created": now,
+                "updated": now,
+                "summary": summary,
+                "creator": {"email": f"{owner}@fake.calendar", "self": True},
+                "organizer": {"email": f"{owner}@fake.calendar", "self": True},
+                "start": {"dateTime": start_time, "timeZone": timezone},
+                "end": {"dateTime": end_time, "timeZone": timezone},
+                "iCalUID": f"{new_id}@fake.calendar",
+                "sequence": 0,
+                "attendees": [
+                    {"email": email.replace(" ", ""), "responseStatus": "needsAction"} for email in attendees
+                ],
+                "reminders": {"useDefault": True},
+                "eventType": "default",
+            }
+            self._save(owner, event)
+            return event
+
+        created_event = self._call(insert, "insert", user_id, idempotent=bool(event_id))
+        return created_event.get("id"), created_event.get("htmlLink")
+
+    def list_meetings(self, max_results: int = 10, user_id: Optional[int] = None,
+                      time_min: Optional[str] = None, time_max: Optional[str] = None):
+        """List upcoming meetings."""
+        owner = self._owner(user_id)
+        lower = _rfc3339(_to_utc(time_min)) if time_min else _rfc3339(_utc_now())
+        upper = _rfc3339(_to_utc(time_max)) if time_max else None
+
+        def query():
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT body FROM fake_events
+                    WHERE user_key = ? AND status != 'cancelled' AND start_utc >= ?
+                    AND (? IS NULL OR start_utc < ?)
+                    ORDER BY start_utc LIMIT ?
+                    """,
+                    (owner, lower, upper, upper, max_results),
+                ).fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+        return self._call(query, "list", user_id)
+
+    def cancel_meeting(self, event_id: str, user_id: Optional[int] = None):
+        """Cancel a meeting by event ID."""
+        owner = self._owner(user_id)
+
+        def delete():
+            event = self._load(owner, event_id)
+            event["status"] = "cancelled"
+            event["updated"] = _rfc3339(_utc_now())
+            self._save(owner, event)
+
+        self._call(delete, "delete", user_id)
+        return True
+
+    def reschedule_meeting(self, event_id: str, new_start: str, new_end: str, user_id: Optional[int] = None):
+        """Reschedule an existing meeting."""
+        owner = self._owner(user_id)
+
+        def update():
+            event = self._load(owner, event_id)
+            event["start"]["dateTime"] = new_start
+            event["end"]["dateTime"] = new_end
+            event["sequence"] = event.get("sequence", 0) + 1
+            event["updated"] = _rfc3339(_utc_now())
+            self._save(owner, event)
+            return event
+
+        updated_event = self._call(update, "update", user_id)
+        return updated_event.get("htmlLink")
@@ -0,0 +1,135 @@
+import logging
+import os
+import re
+from typing import Dict, Optional
+
+from services.metrics import registry
+from services.token_count import count_tokens, truncate_lines, truncate_tokens
+
+logger = logging.getLogger("agent")
+
+PROMPT_TOKENS = registry.histogram(
+    "agent_prompt_tokens", "Prompt tokens per LLM turn by part (instructions, history, tools, reported, cached)."
+)
+
+# Rendered in this order. The persona never changes during a call, so it forms
+# a stable prefix that provider-side prompt caching can reuse; the date/time is
+# the only section that changes every turn and therefore goes last.
+SECTION_ORDER = ("persona", "profile", "memory", "resume", "datetime")
+
+DEFAULT_SECTION_BUDGETS = {"profile": 150, "memory": 600, "resume": 250, "datetime": 40}
+
+# Which end of a section survives truncation: recent conversation matters most.
+# Tail sections are transcripts and are cut on line boundaries.
+TRUNCATE_KEEP = {"profile": "head", "memory": "tail", "resume": "tail", "datetime": "head"}
+
+# Fixed framing rendered above a section's text. It is outside the section's
+# budget and never truncated, so a cut transcript still says what it is.
+SECTION_HEADERS = {
+    "memory": (
+        "Here is the last conversation for context:\n"
+        "Pick only the key terms from this text and use them as memory while talking with the user:"
+    ),
+}
+
+# Sections shrunk (in this order) when the whole prompt is over budget.
+SHRINK_ORDER = ("memory", "resume", "profile")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse indentation and runs of blank lines from triple-quoted prompts."""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def dedupe_lines(text: str) -> str:
+    """Drop repeated lines (e.g. the same transcript line stored twice), keeping order."""
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = line.strip().lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+class InstructionBuilder:
+    """Assembles the system prompt from named sections under a token budget.
+
+    Sections are replaced, never appended, so re-running the user lookup (it
+    fires once per subscribed track) cannot duplicate context. ``build``
+    truncates each section to its own budget and then shrinks memory and
+    profile until the whole prompt fits ``budget_tokens``.
+    """
+
+    def __init__(self, persona: str, budget_tokens: Optional[int] = None,
+                 section_budgets: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            persona (str): Static instructions; never truncated.
+            budget_tokens (int): Budget for the whole prompt (``AGENT_PROMPT_BUDGET_TOKENS``).
+            section_budgets (Dict[str, int]): Per-section caps for profile, memory, resume and datetime.
+        """
+        self.budget_tokens = budget_tokens or int(os.getenv("AGENT_PROMPT_BUDGET_TOKENS", "2000"))
+        self.section_budgets = {**DEFAULT_SECTION_BUDGETS, **(section_budgets or {})}
+        self._sections: Dict[str, str] = {"persona": normalize_text(persona)}
+        self._rendered: Dict[str, str] = {}
+
+    def set_section(self, name: str, text: Optional[str]) -> bool:
+        """Replace a section's text. Returns True if the prompt changed."""
+        if name not in SECTION_ORDER:
+            raise ValueError(f"Unknown instruction section '{name}'")
+        text = dedupe_lines(normalize_text(text)) if text else ""
+        if self._sections.get(name, "") == text:
+            return False
+        self._sections[name] = text
+        return True
+
+    def sections(self) -> Dict[str, str]:
+        """The per-call sections (everything but the persona), e.g. for a checkpoint."""
+        return {name: text for name, text in self._sections.items() if name != "persona" and text}
+
+    @staticmethod
+    def _truncate(name: str, text: str, max_tokens: int) -> str:
+        keep = TRUNCATE_KEEP[name]
+        if keep == "tail":
+            return truncate_lines(text, max_tokens, keep=keep)
+        return truncate_tokens(text, max_tokens, keep=keep)
+
+    def build(self) -> str:
+        rendered = {}
+        for name in SECTION_ORDER:
+            text = self._sections.get(name, "")
+            budget = self.section_budgets.get(name)
+            if text and budget is not None:
+                text = self._truncate(name, text, budget)
+            rendered[name] = text
+
+        headers = {name: SECTION_HEADERS[name] for name, text in rendered.items() if text and name in SECTION_HEADERS}
+        overflow = (sum(count_tokens(text) for text in rendered.values())
+                    + sum(count_tokens(header) + 1 for header in headers.values()) - self.budget_tokens)
+        for name in SHRINK_ORDER:
+            if overflow <= 0:
+                break
+            current = count_tokens(rendered[name])
+            target = max(0, current - overflow)
+            rendered[name] = self._truncate(name, rendered[name], target) if target else ""
+            overflow -= current - count_tokens(rendered[name])
+            if not rendered[name] and name in headers:
+                # Nothing left to frame
+                overflow -= count_tokens(headers.pop(name)) + 1
+        if overflow > 0:
+            logger.warning(f"Instructions exceed the {self.budget_tokens}-token budget by {overflow} tokens")
+
+        for name, header in headers.items():
+            rendered[name] = f"{header}\n{rendered[name]}"
+        self._rendered = rendered
+        return "\n\n".join(text for text in rendered.values() if text)
+
+    def token_counts(self) -> Dict[str, int]:
+        """Tokens per section in the last ``build()``, plus ``total``."""
+        counts = {name: count_tokens(text) for name, text in self._rendered.items()}
+        counts["total"] = sum(counts.values())
+        return counts
@@ -0,0 +1,136 @@
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional
+
+from services.metrics import Histogram, registry, summarize
+
+logger = logging.getLogger("agent")
+
+TOOL_LATENCY = registry.histogram(
+    "agent_tool_latency_seconds", "Wall-clock time of agent function tools."
+)
+DB_LATENCY = registry.histogram(
+    "agent_db_latency_seconds", "Wall-clock time of AppDatabase calls made by the agent."
+)
+CALENDAR_LATENCY = registry.histogram(
+    "agent_calendar_latency_seconds", "Wall-clock time of calendar provider calls made by the agent."
+)
+IN_FLIGHT = registry.gauge(
+    "agent_calls_in_flight", "Tool, DB and calendar calls currently running in this process, by kind."
+)
+PIPELINE_LATENCY = registry.histogram(
+    "agent_pipeline_latency_seconds",
+    "LiveKit pipeline timings by stage (eou_delay, transcription_delay, llm_ttft, tts_ttfb, stt_duration).",
+)
+
+# LiveKit metrics ``type`` -> [(attribute, stage label)]
+_PIPELINE_FIELDS = {
+    "eou_metrics": [("end_of_utterance_delay", "eou_delay"), ("transcription_delay", "transcription_delay")],
+    "llm_metrics": [("ttft", "llm_ttft"), ("duration", "llm_duration")],
+    "tts_metrics": [("ttfb", "tts_ttfb")],
+    "stt_metrics": [("duration", "stt_duration")],
+}
+
+
+class SessionLatency:
+    """Latency samples for one call, summarized and stored when the call ends."""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, metric: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[metric].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """``{metric: {count, sum, max, p50, p95, p99}}`` for every metric seen."""
+        with self._lock:
+            return {metric: summarize(values) for metric, values in self._samples.items()}
+
+
+# Set per job so timings from tools, threads and callbacks land on the right call.
+_current_session: ContextVar[Optional[SessionLatency]] = ContextVar("session_latency", default=None)
+
+
+def bind_session(session_latency: SessionLatency) -> Token:
+    """Attribute timings recorded in this context (and tasks/threads it spawns) to a session."""
+    return _current_session.set(session_latency)
+
+
+def observe(histogram: Histogram, metric: str, seconds: float, **labels) -> None:
+    """Record a timing in the worker-wide histogram and the current session."""
+    histogram.observe(seconds, **labels)
+    session_latency = _current_session.get()
+    if session_latency is not None:
+        session_latency.add(metric, seconds)
+
+
+def record_pipeline_metrics(agent_metrics: Any) -> None:
+    """Record the latency fields of a LiveKit ``metrics_collected`` payload."""
+    for attribute, stage in _PIPELINE_FIELDS.get(getattr(agent_metrics, "type", None), ()):
+        value = getattr(agent_metrics, attribute, None)
+        # LiveKit reports -1 / 0 for stages that didn't happen (e.g. cancelled TTS).
+        if value is not None and value > 0:
+            observe(PIPELINE_LATENCY, f"pipeline.{stage}", value, stage=stage)
+
+
+def timed_tool(fn: Callable) -> Callable:
+    """Time an async function tool. Apply below ``@function_tool``."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "ok"
+        IN_FLIGHT.inc(kind="tool")
+        try:
+            return await fn(*args, **kwargs)
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            IN_FLIGHT.dec(kind="tool")
+            observe(TOOL_LATENCY, f"tool.{fn.__name__}", time.perf_counter() - start,
+                    tool=fn.__name__, outcome=outcome)
+
+    return wrapper
+
+
+class TimedProxy:
+    """Wraps an object so every method call is timed into ``histogram``.
+
+    Used for the agent's ``AppDatabase`` and calendar provider, so call sites
+    (including ``asyncio.to_thread`` ones) don't need their own timers.
+    """
+
+    def __init__(self, target: Any, histogram: Histogram, kind: str):
+        self._target = target
+        self._histogram = histogram
+        self._kind = kind
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            IN_FLIGHT.inc(kind=self._kind)
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                IN_FLIGHT.dec(kind=self._kind)
+                observe(self._histogram, f"{self._kind}.{name}", time.perf_counter() - start, op=name)
+
+        self.__dict__[name] = timed
+        return timed
+
+
+def calls_in_flight() -> Dict[str, int]:
+    """Running tool, DB and calendar calls in this process, by kind."""
+    return {dict(key).get("kind", ""): int(value) for key, value in IN_FLIGHT.samples()}
@@ -0,0 +1,209 @@
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter as TallyCounter
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+LOOP_LAG = registry.histogram("agent_event_loop_lag_seconds", "Event-loop lag: oversleep of the monitor's timer.")
+BLOCKING_CALLS = registry.counter(
+    "agent_event_loop_blocked_total", "Event-loop stalls over the threshold, by call site."
+)
+
+# Code under src/ is "ours"; the innermost such frame is what blocked the loop.
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# asyncio runs every callback and task step from Handle._run in this file.
+_HANDLE_RUN = os.path.join("asyncio", "events.py")
+
+# Room/session tags, shared (as one dict) by every task a job spawns.
+_tags: ContextVar[Optional[Dict[str, str]]] = ContextVar("loop_monitor_tags", default=None)
+
+
+def set_tags(**tags: str) -> Dict[str, str]:
+    """Start a tag set for this job (e.g. ``room``); tasks created afterwards inherit it."""
+    current = dict(tags)
+    _tags.set(current)
+    return current
+
+
+def update_tags(**tags: str) -> None:
+    """Add tags (e.g. ``session`` once it is known) to the current job's tag set."""
+    current = _tags.get()
+    if current is None:
+        set_tags(**tags)
+    else:
+        current.update(tags)
+
+
+@dataclass
+class BlockingEvent:
+    """One stall of the event loop and what was running when it was caught."""
+
+    call_site: str
+    stack: List[str]
+    task: Optional[str]
+    tags: Dict[str, str] = field(default_factory=dict)
+    started_at: float = 0.0
+    duration: float = 0.0
+
+
+def call_site(frames: List[traceback.FrameSummary], roots: Tuple[str, ...] = (_SRC_DIR,)) -> str:
+    """Name a stall by its outermost and innermost frames in our code (under ``roots``).
+
+    ``agent.py:schedule_meeting > AppDatabase.py:is_within_availability``;
+    line numbers are left out so samples of the same stall aggregate.
+    """
+    # Only the callback or task step that is running, not what started the loop.
+    step = max((i for i, f in enumerate(frames) if f.filename.endswith(_HANDLE_RUN)), default=-1)
+    frames = frames[step + 1:]
+    ours = [f for f in frames if f.filename.startswith(roots) and f.filename != __file__]
+    picked = [ours[0], ours[-1]] if len(ours) > 1 else ours or frames[-1:]
+    names = [f"{os.path.basename(f.filename)}:{f.name}" for f in picked]
+    return " > ".join(dict.fromkeys(names)) or "unknown"
+
+
+class LoopMonitor:
+    """Samples event-loop lag and catches whatever blocks the loop.
+
+    A timer task on the loop records lag and refreshes a heartbeat. A watchdog
+    thread notices when the heartbeat goes stale for longer than ``threshold``
+    and captures the loop thread's stack at that moment, so the blocking call
+    (say ``schedule_meeting`` inside ``is_within_availability``) is caught in
+    the act. Each stall is logged with the room/session tags of the task
+    that was running and counted per call site.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05, history: int = 100,
+                 roots: Tuple[str, ...] = (_SRC_DIR,)):
+        """
+        Args:
+            threshold (float): Seconds the loop may stall before it is reported.
+            interval (float): Seconds between lag samples.
+            history (int): Recent stalls kept for ``report``.
+            roots (Tuple[str, ...]): Directories whose frames name the call site.
+        """
+        self.threshold = threshold
+        self.roots = roots
+        self.interval = interval
+        self.events: Deque[BlockingEvent] = deque(maxlen=history)
+        self.counts: TallyCounter = TallyCounter()
+        self._worst: Dict[str, float] = {}
+        self._task_tags: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, str]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._open: Optional[BlockingEvent] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["LoopMonitor"]:
+        """A monitor if ``AGENT_LOOP_MONITOR`` is enabled, else None."""
+        if os.getenv("AGENT_LOOP_MONITOR", "").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            threshold=float(os.getenv("AGENT_LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000,
+            interval=float(os.getenv("AGENT_LOOP_LAG_INTERVAL_MS", "50")) / 1000,
+        )
+
+    def start(self) -> None:
+        """Attach to the running loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._install_task_factory(loop)
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler = loop.create_task(self._sample(), name="loop-monitor")
+        threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True).start()
+        logger.info(f"Loop monitor started (threshold={self.threshold * 1000:.0f}ms)")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+        self._loop = None
+
+    def _install_task_factory(self, loop: asyncio.AbstractEventLoop) -> None:
+        previous = loop.get_task_factory()
+
+        def factory(loop, coro, **kwargs):
+            task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+            # Read in the creating context, which the task copies.
+            tags = _tags.get()
+            if tags is not None:
+                self._task_tags[task] = tags
+            return task
+
+        loop.set_task_factory(factory)
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stopped.is_set():
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG.observe(lag)
+            with self._lock:
+                self._heartbeat = time.monotonic()
+                event, self._open = self._open, None
+            if event is not None:
+                event.duration = lag
+                self._record(event)
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(poll):
+            with self._lock:
+                stalled = time.monotonic() - self._heartbeat - self.interval
+                if self._open is not None or stalled < self.threshold:
+                    continue
+                self._open = self._capture()
+
+    def _capture(self) -> BlockingEvent:
+        frame = sys._current_frames().get(self._loop_thread)
+        frames = traceback.extract_stack(frame) if frame is not None else []
+        task = None
+        with contextlib.suppress(RuntimeError):
+            task = asyncio.current_task(self._loop)
+        return BlockingEvent(
+            call_site=call_site(frames, self.roots),
+            stack=traceback.format_list(frames[-12:]),
+            task=task.get_name() if task is not None else None,
+            tags=dict(self._task_tags.get(task, {})) if task is not None else {},
+            started_at=time.time(),
+        )
+
+    def _record(self, event: BlockingEvent) -> None:
+        self.events.append(event)
+        self.counts[event.call_site] += 1
+        self._worst[event.call_site] = max(self._worst.get(event.call_site, 0.0), event.duration)
+        BLOCKING_CALLS.inc(site=event.call_site)
+        tags = " ".join(f"{k}={v}" for k, v in event.tags.items())
+        logger.warning(
+            f"Event loop blocked for {event.duration * 1000:.0f}ms in {event.call_site} "
+            f"(task={event.task} {tags})\n{''.join(event.stack)}"
+        )
+
+    def report(self, limit: int = 10) -> List[Dict[str, object]]:
+        """Call sites that blocked the loop most often, with their worst stall."""
+        return [
+            {"call_site": site, "count": count, "max_ms": round(self._worst[site] * 1000, 1)}
+            for site, count in self.counts.most_common(limit)
+        ]
@@ -0,0 +1,244 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger("agent")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    """Normalize a labels dict into a hashable, ordered key."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in key)
+    return "{" + inner + "}"
+
+
+class Counter:
+    """A monotonically increasing counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def to_dict(self) -> Dict[str, float]:
+        return {_format_labels(key) or "_": value for key, value in self.samples()}
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.samples()]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, e.g. a circuit breaker state."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Count, sum, max and nearest-rank p50/p95/p99 of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "sum": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    result = {"count": len(ordered), "sum": sum(ordered), "max": ordered[-1]}
+    for q in QUANTILES:
+        rank = max(0, math.ceil(q * len(ordered)) - 1)
+        result[f"p{int(q * 100)}"] = ordered[rank]
+    return result
+
+
+class Histogram:
+    """Latency distribution with p50/p95/p99 over a sliding window of samples.
+
+    Quantiles are computed from the most recent ``window`` observations per
+    label set; count and sum cover every observation. Rendered as a
+    Prometheus summary.
+    """
+
+    kind = "summary"
+
+    def __init__(self, name: str, description: str = "", window: int = 2048):
+        self.name = name
+        self.description = description
+        self.window = window
+        self._windows: Dict[LabelKey, Deque[float]] = {}
+        self._totals: Dict[LabelKey, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = deque(maxlen=self.window)
+            window.append(value)
+            count, total = self._totals.get(key, (0, 0.0))
+            self._totals[key] = (count + 1, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _summary(self, key: LabelKey) -> Dict[str, float]:
+        result = summarize(self._windows.get(key, ()))
+        result["count"], result["sum"] = self._totals.get(key, (0, 0.0))
+        return result
+
+    def summary(self, **labels) -> Dict[str, float]:
+        with self._lock:
+            return self._summary(_label_key(labels))
+
+    def samples(self) -> List[Tuple[LabelKey, Dict[str, float]]]:
+        with self._lock:
+            return [(key, self._summary(key)) for key in self._windows]
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {_format_labels(key) or "_": summary for key, summary in self.samples()}
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, summary in self.samples():
+            for q in QUANTILES:
+                quantile_key = tuple(sorted((*key, ("quantile", str(q)))))
+                lines.append(f"{self.name}{_format_labels(quantile_key)} {summary[f'p{int(q * 100)}']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {summary['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {summary['count']}")
+        return lines
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics.
+
+    Metrics are created on first use and shared afterwards, so modules can
+    declare them at import time without coordinating with each other.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, description)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "") -> Histogram:
+        return self._get_or_create(Histogram, name, description)
+
+    def get(self, name: str) -> Optional[Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Return all metric values as plain dicts, suitable for JSON."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.to_dict() for metric in metrics}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1",
+                         metrics: MetricsRegistry = registry) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` from a daemon thread.
+
+    Used by processes that don't run the FastAPI app, such as agent workers.
+    If ``port`` is taken, e.g. by a sibling job process, an ephemeral port is used.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError:
+        server = ThreadingHTTPServer((host, 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from services.metrics import registry
+from services.response_cache import TTLCache
+
+logger = logging.getLogger("agent")
+
+PARTICIPANT_INITS = registry.counter(
+    "agent_participant_inits_total", "Participant setups by result (run, shared, failed)."
+)
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """What a call needs to know about a known user."""
+
+    user_id: int
+    last_conversation: Optional[str] = None
+
+
+class UserProfileCache:
+    """Process-wide user profiles by email, so a reconnect doesn't hit the DB again.
+
+    Unknown emails are not cached: a user who signs up mid-call is found on
+    the next lookup.
+    """
+
+    def __init__(self, db, ttl: Optional[float] = None):
+        self.db = db
+        ttl = float(os.getenv("USER_PROFILE_TTL", "300")) if ttl is None else ttl
+        self._cache = TTLCache("user_profiles", ttl=ttl, max_entries=256)
+
+    def get(self, email: str) -> Optional[UserProfile]:
+        """Blocking; call it with ``asyncio.to_thread``."""
+        key = email.strip().lower()
+        profile = self._cache.get(key)
+        if profile is not None:
+            return profile
+        user_id = self.db.get_user_by_email(email)
+        if not user_id:
+            return None
+        profile = UserProfile(user_id=user_id, last_conversation=self.db.get_transcription(user_id))
+        self._cache.set(key, profile)
+        return profile
+
+    def invalidate(self, email: str) -> None:
+        self._cache.invalidate(email.strip().lower())
+
+
+class ParticipantRegistry:
+    """Runs a session's participant setup once per key (identity and session GUID).
+
+    ``track_subscribed`` fires for every track a participant publishes. The
+    first event runs the setup; events that arrive while it runs, or after,
+    get the same result. A setup that fails or is cancelled is forgotten so
+    the next track event retries it.
+    """
+
+    def __init__(self):
+        self._runs: Dict[Hashable, asyncio.Future] = {}
+
+    async def ensure(self, key: Hashable, init: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._runs.get(key)
+        if future is not None:
+            PARTICIPANT_INITS.inc(result="shared")
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._runs[key] = future
+        try:
+            result = await init()
+        except BaseException as e:
+            PARTICIPANT_INITS.inc(result="failed")
+            del self._runs[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; don't warn about it going unretrieved
+            else:
+                future.cancel()
+            raise
+        PARTICIPANT_INITS.inc(result="run")
+        future.set_result(result)
+        return result
@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import hashlib
+import itertools
+import logging
+import os
+import re
+import wave
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+PHRASE_PLAYS = registry.counter(
+    "agent_phrase_plays_total", "Fixed phrases spoken, by phrase and source (cache or tts)."
+)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "cache", "phrases")
+
+# Fixed lines the agent says in every call. Rendering them once per voice
+# skips an LLM and TTS round trip each time they are spoken.
+PHRASES: Dict[str, str] = {
+    # Played to callers we can't greet by name, so it must not assume they've called before
+    "greeting": "Hello! I can help you schedule meetings with our experts. Would you like to book a time?",
+    "filler_moment": "One moment, please.",
+    "filler_check": "Let me check that for you.",
+    "filler_lookup": "Just a second while I look that up.",
+}
+FILLERS = ("filler_moment", "filler_check", "filler_lookup")
+
+# Known callers are greeted by name through TTS instead of the cached clip
+NAMED_GREETING = "Hi {name}, welcome back. I can help you schedule meetings. Would you like to book a time?"
+
+
+def named_greeting(name: Optional[str]) -> Optional[str]:
+    """The greeting for a caller known by ``name``; None means play the cached ``greeting``."""
+    first = (name or "").strip().split(" ")[0]
+    return NAMED_GREETING.format(name=first) if first else None
+
+
+@dataclass(frozen=True)
+class Clip:
+    """Pre-rendered 16-bit PCM audio for one phrase."""
+
+    text: str
+    pcm: bytes
+    sample_rate: int
+    num_channels: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+    async def frames(self, frame_ms: int = 20) -> AsyncIterator[Any]:
+        """Yield the clip as ``rtc.AudioFrame`` chunks for ``AgentSession.say``."""
+        from livekit import rtc
+
+        samples = self.sample_rate * frame_ms // 1000
+        step = samples * 2 * self.num_channels
+        for offset in range(0, len(self.pcm), step):
+            chunk = self.pcm[offset:offset + step]
+            yield rtc.AudioFrame(chunk, self.sample_rate, self.num_channels, len(chunk) // (2 * self.num_channels))
+
+
+class PhraseCache:
+    """Audio for ``PHRASES`` in one TTS voice, kept as WAV files on disk.
+
+    ``load`` reads whatever is already rendered (cheap, done in prewarm);
+    ``render`` synthesizes the missing phrases with a TTS instance, either at
+    build time or in the background of the first call. Clips are keyed by a
+    hash of their text, so editing a phrase re-renders it.
+    """
+
+    def __init__(self, voice: str, directory: Optional[str] = None,
+                 phrases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            voice (str): Voice identifier, e.g. ``azure-en-IN-AartiNeural``.
+            directory (str): Cache root (``PHRASE_CACHE_DIR``).
+            phrases (Dict[str, str]): Phrase key -> text; defaults to ``PHRASES``.
+        """
+        self.voice = voice
+        root = directory or os.getenv("PHRASE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.directory = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]+", "_", voice))
+        self.phrases = dict(PHRASES if phrases is None else phrases)
+        self._clips: Dict[str, Clip] = {}
+        self._fillers = itertools.cycle([key for key in FILLERS if key in self.phrases] or [None])
+        self._render_lock = asyncio.Lock()
+
+    def path(self, key: str) -> str:
+        digest = hashlib.sha1(self.phrases[key].encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.directory, f"{key}-{digest}.wav")
+
+    def get(self, key: str) -> Optional[Clip]:
+        return self._clips.get(key)
+
+    def missing(self) -> List[str]:
+        return [key for key in self.phrases if key not in self._clips]
+
+    def load(self) -> int:
+        """Read rendered clips from disk. Returns how many are available."""
+        for key, text in self.phrases.items():
+            path = self.path(key)
+            if key in self._clips or not os.path.exists(path):
+                continue
+            try:
+                with wave.open(path, "rb") as wav:
+                    self._clips[key] = Clip(text, wav.readframes(wav.getnframes()),
+                                            wav.getframerate(), wav.getnchannels())
+            except (OSError, wave.Error, EOFError) as e:
+                logger.warning(f"Ignoring unreadable phrase clip {path}: {e}")
+        return len(self._clips)
+
+    def store(self, key: str, pcm: bytes, sample_rate: int, num_channels: int) -> Clip:
+        """Write one clip to disk (atomically) and keep it in memory."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        with wave.open(tmp_path, "wb") as wav:
+            wav.setnchannels(num_channels)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        os.replace(tmp_path, path)
+        clip = Clip(self.phrases[key], pcm, sample_rate, num_channels)
+        self._clips[key] = clip
+        return clip
+
+    async def render(self, tts: Any, keys: Optional[Iterable[str]] = None) -> int:
+        """Synthesize missing phrases with a LiveKit ``tts.TTS``. Returns how many were rendered."""
+        rendered = 0
+        async with self._render_lock:
+            for key in list(keys or self.missing()):
+                if key in self._clips:
+                    continue
+                try:
+                    frames = [ev.frame async for ev in tts.synthesize(self.phrases[key])]
+                except Exception as e:
+                    logger.warning(f"Could not render phrase '{key}' for {self.voice}: {e}")
+                    continue
+                if not frames:
+                    continue
+                pcm = b"".join(bytes(frame.data) for frame in frames)
+                self.store(key, pcm, frames[0].sample_rate, frames[0].num_channels)
+                rendered += 1
+        if rendered:
+            logger.info(f"Rendered {rendered} phrase clips for {self.voice}")
+        return rendered
+
+    def next_filler(self) -> Optional[str]:
+        """Rotate through the filler phrases so repeats sound less robotic."""
+        return next(self._fillers)
+
+    def play(self, session: Any, key: str, add_to_chat_ctx: bool = True) -> Any:
+        """Speak a phrase: instantly from the cache, otherwise through TTS (no LLM)."""
+        clip = self._clips.get(key)
+        text = self.phrases[key]
+        PHRASE_PLAYS.inc(phrase=key, source="cache" if clip else "tts")
+        if clip is None:
+            return session.say(text, add_to_chat_ctx=add_to_chat_ctx)
+        return session.say(text, audio=clip.frames(), add_to_chat_ctx=add_to_chat_ctx)
+
+
+def speaks_filler(threshold: Optional[float] = None) -> Callable[[Callable], Callable]:
+    """Play a cached filler if an async tool runs longer than ``threshold`` seconds.
+
+    Apply below ``@function_tool``. The agent (``args[0]``) provides the cache
+    as ``phrases`` and the session as ``agent_session``; without either the
+    tool runs unchanged. Defaults to ``AGENT_FILLER_AFTER_SECONDS``.
+    """
+    delay = threshold if threshold is not None else float(os.getenv("AGENT_FILLER_AFTER_SECONDS", "1.2"))
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            agent = args[0] if args else None
+            cache: Optional[PhraseCache] = getattr(agent, "phrases", None)
+            session = getattr(agent, "agent_session", None)
+            if cache is None or session is None:
+                return await fn(*args, **kwargs)
+
+            async def filler_later():
+                await asyncio.sleep(delay)
+                key = cache.next_filler()
+                if key:
+                    cache.play(session, key, add_to_chat_ctx=False)
+
+            timer = asyncio.create_task(filler_later())
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                timer.cancel()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from services.metrics import registry
+
+CACHE_LOOKUPS = registry.counter(
+    "response_cache_lookups_total", "Cache lookups by cache name and result (hit, miss, expired)."
+)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    Keys are expected to be tuples whose first element identifies the owner
+    (e.g. a user ID), so ``invalidate_prefix`` can drop everything for one user.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                CACHE_LOOKUPS.inc(cache=self.name, result="expired")
+                return None
+            self._entries.move_to_end(key)
+            CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_prefix(self, owner: Hashable) -> int:
+        """Drop every tuple key whose first element is ``owner``; returns the count."""
+        with self._lock:
+            stale = [k for k in self._entries if isinstance(k, tuple) and k and k[0] == owner]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+CHECKPOINTS = registry.counter(
+    "agent_session_checkpoints_total", "Session checkpoint operations by result (saved, failed, resumed, missing)."
+)
+RESUME_SECONDS = registry.histogram(
+    "agent_session_resume_seconds", "Time from participant join to a resumed session being ready."
+)
+
+CHECKPOINT_VERSION = 1
+
+# ``UserData`` fields worth restoring; sessions, caches and tasks are rebuilt.
+USERDATA_FIELDS = (
+    "user_id", "user_name", "user_email", "user_age", "user_gender",
+    "last_conversation_for_reference", "greeted", "booking_intent", "tool_calls",
+)
+
+# Per tool call kept in the history: arguments and output are cut to this many characters.
+TOOL_TEXT_LIMIT = 200
+
+
+def record_tool_call(history: List[Dict[str, Any]], name: str, arguments: str, output: str,
+                     is_error: bool = False, limit: int = 20) -> None:
+    """Append one call to ``history`` (oldest dropped past ``limit``)."""
+    history.append({
+        "name": name,
+        "arguments": arguments[:TOOL_TEXT_LIMIT],
+        "output": output[:TOOL_TEXT_LIMIT],
+        "error": is_error,
+    })
+    del history[:-limit]
+
+
+def capture(userdata: Any, sections: Dict[str, str]) -> Dict[str, Any]:
+    """JSON-serializable snapshot of a call's state."""
+    return {
+        "version": CHECKPOINT_VERSION,
+        "saved_at": time.time(),
+        "userdata": {name: getattr(userdata, name, None) for name in USERDATA_FIELDS},
+        "sections": {name: text for name, text in sections.items() if name not in ("datetime", "resume")},
+    }
+
+
+def restore(userdata: Any, state: Dict[str, Any]) -> Dict[str, str]:
+    """Copy a snapshot back onto ``userdata``; returns the instruction sections to reapply."""
+    for name, value in state.get("userdata", {}).items():
+        if name in USERDATA_FIELDS and value is not None:
+            setattr(userdata, name, value)
+    return dict(state.get("sections", {}))
+
+
+def resume_section(state: Dict[str, Any], recent: int = 5) -> str:
+    """Instruction text telling the LLM where the interrupted call left off."""
+    data = state.get("userdata", {})
+    lines = ["The call dropped and the user has reconnected. They were already greeted, so do not greet "
+             "them again; briefly confirm where you left off and continue."]
+    calls = (data.get("tool_calls") or [])[-recent:]
+    if calls:
+        lines.append("Your most recent actions:")
+        lines.extend(
+            f"- {call['name']}({call['arguments']}) -> {'error: ' if call.get('error') else ''}{call['output']}"
+            for call in calls
+        )
+    intent = data.get("booking_intent")
+    if intent:
+        details = ", ".join(f"{key} {value}" for key, value in intent.items() if value is not None)
+        lines.append(f"A booking was in progress and is not confirmed yet: {details}.")
+    return "\n".join(lines)
+
+
+class SessionCheckpointer:
+    """Writes and reads one call's checkpoint, keyed by its session GUID.
+
+    A worker restart or a rejoin that lands on a new job loses everything held
+    in memory. The agent saves a compact snapshot (``capture``) after setup
+    and after each batch of tool calls; a participant who rejoins with the
+    same GUID within ``ttl`` seconds gets it back with one SQLite read
+    instead of the profile lookup and a second greeting.
+    """
+
+    def __init__(self, db, session_guid: str, ttl: Optional[float] = None):
+        """
+        Args:
+            db: ``AppDatabase`` holding the ``session_checkpoints`` table.
+            session_guid (str): Call being checkpointed.
+            ttl (float): Seconds a checkpoint can be resumed (``SESSION_CHECKPOINT_TTL``).
+        """
+        self.db = db
+        self.session_guid = session_guid
+        self.ttl = float(os.getenv("SESSION_CHECKPOINT_TTL", "900")) if ttl is None else ttl
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            state = await asyncio.to_thread(self.db.get_session_checkpoint, self.session_guid, self.ttl)
+        except Exception:
+            logger.exception(f"Could not read the checkpoint for session {self.session_guid}")
+            state = None
+        if state is not None and state.get("version") != CHECKPOINT_VERSION:
+            state = None
+        CHECKPOINTS.inc(result="resumed" if state else "missing")
+        return state
+
+    async def save(self, snapshot: Callable[[], Dict[str, Any]]) -> bool:
+        """Write ``snapshot()``; taken under a lock so saves land in order."""
+        async with self._lock:
+            state = snapshot()
+            user_id = state.get("userdata", {}).get("user_id")
+            try:
+                saved = await asyncio.to_thread(self.db.save_session_checkpoint, self.session_guid, user_id, state)
+            except Exception:
+                logger.exception(f"Could not checkpoint session {self.session_guid}")
+                saved = False
+        CHECKPOINTS.inc(result="saved" if saved else "failed")
+        return saved
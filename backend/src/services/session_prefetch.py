@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+from collections import Counter as TallyCounter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from services.metrics import registry
+from services.response_cache import TTLCache
+from services.task_supervisor import TaskSupervisor
+
+logger = logging.getLogger("agent")
+
+PREFETCH_RESULTS = registry.counter(
+    "session_prefetch_total", "Session prefetch lookups by key and result (hit, waited, miss)."
+)
+
+
+class SessionPrefetcher:
+    """Loads what a caller usually asks for first, as soon as they are identified.
+
+    Upcoming meetings, recent appointments, the expert list and free slots
+    for the caller's usual expert are fetched concurrently in the background
+    and kept in a cache scoped to this session. Tools call ``get`` and fall
+    back to a live lookup when the value is missing or stale.
+    """
+
+    def __init__(self, db, calendar, experts, ttl: Optional[float] = None,
+                 meetings_limit: int = 20, slot_limit: int = 3, slot_minutes: int = 30,
+                 tasks: Optional[TaskSupervisor] = None):
+        """
+        Args:
+            db: ``AppDatabase`` for appointments and slots.
+            calendar: ``CalendarProvider`` for upcoming meetings.
+            experts: ``ExpertCache`` for the expert list.
+            tasks (TaskSupervisor): The session's supervisor the loads run under, so
+                they are bounded and cancelled with the session. A private one if omitted.
+            ttl (float): Seconds a prefetched value stays fresh (``SESSION_PREFETCH_TTL``).
+            meetings_limit (int): Upcoming meetings to load.
+            slot_limit (int): Free slots to load for the usual expert.
+            slot_minutes (int): Length of those slots.
+        """
+        self.db = db
+        self.calendar = calendar
+        self.experts = experts
+        self.meetings_limit = meetings_limit
+        self.slot_limit = slot_limit
+        self.slot_minutes = slot_minutes
+        ttl = float(os.getenv("SESSION_PREFETCH_TTL", "120")) if ttl is None else ttl
+        self._cache = TTLCache("session_prefetch", ttl=ttl, max_entries=16)
+        self.tasks = tasks or TaskSupervisor("prefetch")
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.user_id: Optional[int] = None
+
+    def start(self, user_id: int) -> None:
+        """Kick off every load for ``user_id``; a no-op if already started for them."""
+        if self.user_id == user_id and self._tasks:
+            return
+        self.user_id = user_id
+        self._spawn("meetings", lambda: self.calendar.list_meetings(max_results=self.meetings_limit, user_id=user_id))
+        self._spawn("appointments", lambda: self.db.get_recent_appointments(user_id))
+        self._spawn("experts", self.experts.all)
+        self._spawn_task("usual_slots", self._load_usual_slots())
+        logger.info(f"Started session prefetch for user_id={user_id}")
+
+    def _spawn(self, key: str, load: Callable[[], Any]) -> None:
+        self._spawn_task(key, self._load(key, load))
+
+    def _spawn_task(self, key: str, coro) -> None:
+        # None when the session is at its task bound; get() then falls back to a live lookup
+        task = self.tasks.spawn(coro, f"prefetch-{key}")
+        if task is not None:
+            self._tasks[key] = task
+
+    async def _load(self, key: str, load: Callable[[], Any], store: bool = True) -> Any:
+        try:
+            value = await asyncio.to_thread(load)
+        except Exception as e:
+            logger.warning(f"Session prefetch of {key} failed: {e}")
+            return None
+        if store:
+            self._cache.set(key, value)
+        return value
+
+    async def _load_usual_slots(self) -> Optional[Dict[str, Any]]:
+        task = self._tasks.get("appointments")
+        appointments = await task if task is not None else None
+        if not appointments:
+            return None
+        expert_id, _ = TallyCounter(a["expert_id"] for a in appointments if a.get("expert_id")).most_common(1)[0]
+        origin = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        slots = await self._load("usual_slots", lambda: self.db.suggest_next_available_slots(
+            expert_id, origin, duration_minutes=self.slot_minutes, limit=self.slot_limit
+        ), store=False)
+        if slots is None:
+            return None
+        value = {"expert_id": expert_id, "origin": origin, "slots": slots}
+        self._cache.set("usual_slots", value)
+        return value
+
+    async def get(self, key: str, wait: Optional[float] = None) -> Any:
+        """Return the fresh prefetched value for ``key``, or None.
+
+        If the load is still running, wait up to ``wait`` seconds
+        (``SESSION_PREFETCH_WAIT``) for it rather than starting a duplicate call.
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            PREFETCH_RESULTS.inc(key=key, result="hit")
+            return value
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            wait = float(os.getenv("SESSION_PREFETCH_WAIT", "1.5")) if wait is None else wait
+            try:
+                value = await asyncio.wait_for(asyncio.shield(task), timeout=wait)
+            except asyncio.TimeoutError:
+                value = None
+            if value is not None:
+                PREFETCH_RESULTS.inc(key=key, result="waited")
+                return value
+        PREFETCH_RESULTS.inc(key=key, result="miss")
+        return None
+
+    async def upcoming_meetings(self, max_results: int) -> Optional[List[dict]]:
+        """Prefetched upcoming meetings, if they cover ``max_results``."""
+        if max_results > self.meetings_limit:
+            return None
+        meetings = await self.get("meetings")
+        return None if meetings is None else meetings[:max_results]
+
+    async def usual_slots(self, expert_id: int, desired_start: datetime, duration_minutes: int,
+                          limit: int) -> Optional[list]:
+        """Prefetched free slots, if they answer this exact question."""
+        if duration_minutes != self.slot_minutes or limit > self.slot_limit:
+            return None
+        cached = await self.get("usual_slots", wait=0)
+        # Slots were searched from the prefetch time; only "as soon as possible" matches.
+        if not cached or cached["expert_id"] != expert_id or desired_start > cached["origin"] + timedelta(minutes=1):
+            return None
+        return cached["slots"][:limit]
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop values a booking change made stale."""
+        for key in keys:
+            self._cache.invalidate(key)
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._cache.clear()
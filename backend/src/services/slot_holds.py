@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+HOLDS = registry.counter(
+    "agent_slot_holds_total", "Offered slots by hold result (held, contended, released, failed)."
+)
+
+
+class SlotHolds:
+    """Tentative holds on the slots one call has offered.
+
+    Between "here are three times" and "the second one" another call could
+    book the slot, and the booking would fail into a fresh search. Offered
+    slots are held in the ``slot_holds`` table for ``ttl`` seconds; other
+    calls' slot searches and conflict checks skip them. Each offer replaces
+    the call's previous holds, and they are dropped on booking and when the
+    caller leaves. Expired holds are ignored, and pruned at startup.
+    """
+
+    def __init__(self, db, holder: str, ttl: Optional[float] = None):
+        """
+        Args:
+            db: ``AppDatabase`` holding the ``slot_holds`` table.
+            holder (str): Call the holds belong to; the room name, so a call resumed elsewhere keeps them.
+            ttl (float): Seconds a hold lasts (``SLOT_HOLD_TTL``).
+        """
+        self.db = db
+        self.holder = holder
+        self.ttl = float(os.getenv("SLOT_HOLD_TTL", "180")) if ttl is None else ttl
+
+    async def hold(self, slots: Sequence[Tuple]) -> List[Tuple]:
+        """Hold ``(expert_id, start, end)`` slots; returns those held, as another call may have some."""
+        if not slots:
+            return []
+        try:
+            held = await asyncio.to_thread(self.db.hold_slots, self.holder, list(slots), self.ttl)
+        except Exception:
+            logger.exception(f"Could not hold slots for {self.holder}")
+            held = None
+        if held is None:
+            HOLDS.inc(len(slots), result="failed")
+            # Offer them anyway; the booking's conflict check still protects them
+            return list(slots)
+        HOLDS.inc(len(held), result="held")
+        if len(held) < len(slots):
+            HOLDS.inc(len(slots) - len(held), result="contended")
+        return held
+
+    async def release(self) -> int:
+        try:
+            released = await asyncio.to_thread(self.db.release_slot_holds, self.holder)
+        except Exception:
+            logger.exception(f"Could not release slot holds for {self.holder}")
+            return 0
+        HOLDS.inc(released, result="released")
+        return released
@@ -0,0 +1,110 @@
+import datetime
+import re
+from typing import List, Optional
+
+# Everything the TTS should not read literally, matched in one pass per chunk.
+# Underscores only count as markdown at word edges, so "john_doe@x.com" survives.
+_SPEECH_TOKENS = re.compile(
+    r"(?P<url>https?://[^\s<>()\[\]]+)"
+    r"|(?P<link>\[(?P<link_text>[^\]\n]*)\]\([^)\s]*\))"
+    r"|(?P<iso>\b\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?\b)"
+    r"|(?P<heading>^[ \t]*(?:#{1,6}|[-*+•])[ \t]+)"
+    r"|(?P<emoji>[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]+[ \t]?)"
+    r"|(?P<markup>[*`~#]+|(?<![A-Za-z0-9])_+|_+(?![A-Za-z0-9]))",
+    re.MULTILINE,
+)
+
+# Where a chunk may end: sentence punctuation (or a newline) followed by
+# whitespace, or a clause mark followed by whitespace. "Dr. Rao" is not a sentence end.
+_BOUNDARY = re.compile(
+    r"(?:(?P<sentence>(?<!\b[DM]r)(?<!\bMrs)(?<!\bMs)(?<!\bProf)(?<!\be\.g)(?<!\bi\.e)[.!?]+[\"')\]]*)"
+    r"|(?P<clause>[,;:]))\s+|\n+"
+)
+
+_URL_TRAILING = ".,;:!?'\""
+
+
+def speak_datetime(value: str, today: Optional[datetime.date] = None) -> Optional[str]:
+    """``2025-10-14T09:30:00+05:30`` -> ``Tuesday, October 14 at 9:30 AM``.
+
+    The wall-clock time is read as written; the year is only spoken when it
+    isn't the current one. Returns None if ``value`` isn't a valid date.
+    """
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    today = today or datetime.date.today()
+    spoken = f"{parsed.strftime('%A, %B')} {parsed.day}"
+    if parsed.year != today.year:
+        spoken += f", {parsed.year}"
+    if "T" in value:
+        hour = parsed.hour % 12 or 12
+        minutes = f":{parsed.minute:02d}" if parsed.minute else ""
+        spoken += f" at {hour}{minutes} {'AM' if parsed.hour < 12 else 'PM'}"
+    return spoken
+
+
+def _speakable(match: "re.Match") -> str:
+    kind = match.lastgroup
+    text = match.group(0)
+    if kind == "url":
+        trailing = len(text) - len(text.rstrip(_URL_TRAILING))
+        host = text[: len(text) - trailing].split("/")[2]
+        return f"a link on {host.removeprefix('www.')}{text[len(text) - trailing:]}"
+    if kind == "link":
+        return match.group("link_text")
+    if kind == "iso":
+        return speak_datetime(text) or text
+    return ""
+
+
+def normalize_for_speech(text: str) -> str:
+    """Strip markdown and emoji and make URLs and ISO timestamps speakable."""
+    return _SPEECH_TOKENS.sub(_speakable, text)
+
+
+class SpeechChunker:
+    """Turns a stream of LLM text deltas into normalized, speakable chunks.
+
+    Text is held back only until the next sentence or clause boundary, so
+    tokens that arrive split across deltas (``**``, a URL, a timestamp) are
+    normalized whole while the first clause still reaches the TTS early.
+    Clause boundaries only end a chunk once it has ``min_clause_chars``; a
+    chunk with no boundary at all is cut at whitespace past ``max_chars``.
+    """
+
+    def __init__(self, min_clause_chars: int = 24, max_chars: int = 240):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._scan_from = 0
+
+    def push(self, delta: str) -> List[str]:
+        """Add an LLM delta; return the chunks that are ready to speak."""
+        self._buffer += delta
+        buffer = self._buffer
+        ready: List[str] = []
+        start = 0
+        for match in _BOUNDARY.finditer(buffer, self._scan_from):
+            end = match.end()
+            if match.group("clause") and end - start < self.min_clause_chars:
+                continue
+            ready.append(buffer[start:end])
+            start = end
+        if len(buffer) - start > self.max_chars:
+            cut = buffer.rfind(" ", start, len(buffer) - 1)
+            if cut > start:
+                ready.append(buffer[start:cut + 1])
+                start = cut + 1
+        self._buffer = buffer[start:]
+        # A boundary needs trailing whitespace, which may arrive with the next delta.
+        self._scan_from = max(0, len(self._buffer) - 8)
+        return [chunk for chunk in map(normalize_for_speech, ready) if chunk.strip()]
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left at the end of the stream."""
+        chunk = normalize_for_speech(self._buffer)
+        self._buffer = ""
+        self._scan_from = 0
+        return chunk if chunk.strip() else None
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+from collections import Counter as TallyCounter
+from typing import Coroutine, Dict, List, Optional, Set
+
+from services.metrics import registry
+
+logger = logging.getLogger("agent")
+
+SESSION_TASKS = registry.counter(
+    "agent_session_tasks_total",
+    "Background tasks started by sessions, by outcome (completed, failed, cancelled, rejected, leaked).",
+)
+SESSION_TASKS_LIVE = registry.gauge("agent_session_tasks_live", "Session background tasks still running.")
+
+
+class TaskSupervisor:
+    """Owns one session's background work instead of bare ``asyncio.create_task``.
+
+    Every task is named, held (so it can't be garbage-collected mid-flight),
+    has its exception logged, and counts toward ``max_tasks``: past the bound
+    new work is dropped rather than piling up. ``aclose`` cancels whatever is
+    still running when the session ends and reports tasks that would not
+    stop as leaks.
+    """
+
+    def __init__(self, name: str = "session", max_tasks: Optional[int] = None):
+        """
+        Args:
+            name (str): Prefix for task names and log lines (the room name).
+            max_tasks (int): Tasks allowed at once (``AGENT_SESSION_MAX_TASKS``).
+        """
+        self.name = name
+        self.max_tasks = int(os.getenv("AGENT_SESSION_MAX_TASKS", "32")) if max_tasks is None else max_tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self._outcomes: TallyCounter = TallyCounter()
+        self._closed = False
+
+    def spawn(self, coro: Coroutine, name: str) -> Optional[asyncio.Task]:
+        """Run ``coro`` in the background; None if the session is closed or at its bound."""
+        if self._closed or len(self._tasks) >= self.max_tasks:
+            coro.close()
+            self._count("rejected")
+            logger.warning(f"[{self.name}] Dropped background task {name}: "
+                           f"{'session closed' if self._closed else f'{self.max_tasks} already running'}")
+            return None
+        task = asyncio.get_running_loop().create_task(coro, name=f"{self.name}:{name}")
+        self._tasks.add(task)
+        SESSION_TASKS_LIVE.inc()
+        task.add_done_callback(self._on_done)
+        return task
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        if task not in self._tasks:
+            return
+        self._tasks.discard(task)
+        SESSION_TASKS_LIVE.dec()
+        if task.cancelled():
+            self._count("cancelled")
+        elif task.exception() is not None:
+            self._count("failed")
+            logger.error(f"Background task {task.get_name()} failed", exc_info=task.exception())
+        else:
+            self._count("completed")
+
+    def _count(self, outcome: str) -> None:
+        self._outcomes[outcome] += 1
+        SESSION_TASKS.inc(outcome=outcome)
+
+    def counts(self) -> Dict[str, int]:
+        """Live tasks and how the finished ones ended."""
+        return {
+            "live": len(self._tasks),
+            **{k: self._outcomes[k] for k in ("completed", "failed", "cancelled", "rejected", "leaked")},
+        }
+
+    def cancel_all(self) -> int:
+        """Cancel running tasks but keep accepting new ones (e.g. the participant may rejoin)."""
+        for task in self._tasks:
+            task.cancel()
+        return len(self._tasks)
+
+    async def aclose(self, timeout: float = 2.0) -> List[str]:
+        """Cancel everything, wait up to ``timeout`` seconds, and return the names of leaked tasks."""
+        self._closed = True
+        self.cancel_all()
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        leaked = sorted(task.get_name() for task in self._tasks)
+        for task in list(self._tasks):
+            self._tasks.discard(task)
+            SESSION_TASKS_LIVE.dec()
+            self._count("leaked")
+        if leaked:
+            logger.warning(f"[{self.name}] {len(leaked)} background task(s) ignored cancellation: {leaked}")
+        logger.info(f"[{self.name}] Background tasks at shutdown: {self.counts()}")
+        return leaked
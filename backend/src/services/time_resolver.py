@@ -0,0 +1,410 @@
+import datetime
+import functools
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from livekit.agents.llm import ToolError
+
+from services.event_normalizer import get_zone
+from services.metrics import registry
+
+RESOLUTIONS = registry.counter(
+    "agent_time_resolutions_total", "Natural-language times resolved by result (exact, window, unresolved)."
+)
+
+# Working hours used when only a day is named ("tomorrow", "next week").
+DAY_START = 9
+DAY_END = 18
+
+# Parts of the day as [start, end) hours; "early"/"late" take the first/second half.
+PARTS_OF_DAY = {
+    "morning": (9, 12),
+    "lunch": (12, 14),
+    "afternoon": (12, 17),
+    "evening": (17, 20),
+    "night": (19, 22),
+}
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8, "september": 9,
+    "sept": 9, "sep": 9, "october": 10, "oct": 10, "november": 11, "nov": 11, "december": 12, "dec": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "couple of": 2, "few": 3,
+}
+
+HOUR_WORDS = {word: n for word, n in NUMBER_WORDS.items() if word not in ("a", "an", "couple of", "few")}
+
+_NUM = r"(\d{1,2}|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")"
+_HOUR = r"(\d{1,2}|" + "|".join(HOUR_WORDS) + r")"
+# Four groups: hour, minutes, am/pm, or a word (noon, midday, midnight)
+_CLOCK = rf"(?:{_HOUR}(?::(\d{{2}}))? ?(am|pm)?\b|(noon|midday|midnight))"
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+_RELATIVE = re.compile(rf"\bin (?:a |an )?{_NUM}? ?(minute|min|hour|hr|day|week)s?\b")
+_DAY_WORD = re.compile(r"\b(day after tomorrow|tomorrow|tmrw|today|tonight)\b")
+_WEEKDAY = re.compile(rf"\b(?:(this|next|coming) )?({'|'.join(WEEKDAYS)})\b")
+_WEEK = re.compile(r"\b(this|next|coming) (week|weekend)\b|\b(weekend)\b")
+_MONTH_DAY = re.compile(rf"\b(?:({_MONTH}) (\d{{1,2}})|(\d{{1,2}}) (?:of )?({_MONTH}))(?: (\d{{4}}))?\b")
+_NUMERIC_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?\b")
+_DAY_OF_MONTH = re.compile(r"\bthe (\d{1,2})\b(?!:| ?(?:am|pm))")
+_BETWEEN = re.compile(rf"\b(?:between|from) {_CLOCK} (?:and|to|till|until|-) {_CLOCK}")
+_BOUND = re.compile(rf"\b(after|before|by) {_CLOCK}")
+_HALF_QUARTER = re.compile(rf"\b(half past|quarter past|quarter to) {_HOUR}\b(?: ?(am|pm))?")
+_AT = re.compile(rf"\b(?:at|around|about|@) {_CLOCK}")
+_BARE_CLOCK = re.compile(rf"\b{_HOUR}(?::(\d{{2}}))? ?(am|pm|o'?clock)\b|\b(\d{{1,2}}):(\d{{2}})\b|\b(noon|midday|midnight)\b")
+_PART = re.compile(r"\b(early |late )?(morning|lunch ?time|lunch|afternoon|evening|night|tonight)\b")
+
+
+@dataclass(frozen=True)
+class Clock:
+    hour: int
+    minute: int = 0
+    meridiem: Optional[str] = None  # "am", "pm" or None when not said
+
+
+@dataclass(frozen=True)
+class Parsed:
+    """What an expression says, independent of when it is said (so it can be cached)."""
+
+    day: Optional[Tuple] = None  # ("offset", n) | ("weekday", wd, mode) | ("date", m, d, y) | ("dom", d)
+                                 # | ("week", weeks) | ("weekend", weeks)
+    delta_minutes: Optional[int] = None  # "in 2 hours"
+    clock: Optional[Clock] = None
+    until: Optional[Clock] = None  # end of "between 2 and 4"
+    bound: Optional[str] = None  # "after" or "before"
+    part: Optional[Tuple[int, int]] = None
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """A resolved expression in the caller's timezone.
+
+    ``exact`` windows name a time ("3 pm") and last the meeting's duration;
+    the others ("tomorrow afternoon") span every acceptable start.
+    """
+
+    start: datetime.datetime
+    end: datetime.datetime
+    exact: bool
+    past: bool = False
+
+    def describe(self) -> str:
+        """``Tuesday, October 21 between 12 PM and 5 PM``; speakable, no ISO."""
+        today = datetime.date.today()
+        day = f"{self.start.strftime('%A, %B')} {self.start.day}"
+        if self.start.year != today.year:
+            day += f", {self.start.year}"
+        if self.exact:
+            return f"{day} at {_speak_clock(self.start)}"
+        if self.start.date() != self.end.date():
+            last = self.end - datetime.timedelta(minutes=1)
+            return f"{day} to {last.strftime('%A, %B')} {last.day}"
+        return f"{day} between {_speak_clock(self.start)} and {_speak_clock(self.end)}"
+
+
+def _speak_clock(value: datetime.datetime) -> str:
+    hour = value.hour % 12 or 12
+    minutes = f":{value.minute:02d}" if value.minute else ""
+    return f"{hour}{minutes} {'AM' if value.hour < 12 else 'PM'}"
+
+
+def _number(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    return int(text) if text.isdigit() else NUMBER_WORDS.get(text)
+
+
+def _clock(groups: Tuple) -> Optional[Clock]:
+    """Clock from one ``_CLOCK``'s (hour, minutes, am/pm, word) groups."""
+    hour, minute, meridiem, word = groups
+    if word:
+        return Clock(0, 0, "am") if word == "midnight" else Clock(12, 0, "pm")
+    hour = _number(hour)
+    if hour is None or hour > 23 or (minute and int(minute) > 59):
+        return None
+    return Clock(hour, int(minute or 0), meridiem)
+
+
+def normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"\b([ap])\.?m\.?(?=\s|$|[,!?])", r"\1m", text)
+    text = re.sub(r"(\d)\.(\d{2})\b", r"\1:\2", text)  # 3.30 pm
+    text = re.sub(r"(\d{1,2})(st|nd|rd|th)\b", r"\1", text)  # 14th
+    text = re.sub(r"[,!?;]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@functools.lru_cache(maxsize=1024)
+def parse(text: str) -> Optional[Parsed]:
+    """Parse a normalized expression; None if it names no day or time."""
+    day = None
+    delta = None
+    match = _RELATIVE.search(text)
+    if match:
+        count = _number(match.group(1)) if match.group(1) else 1
+        unit = match.group(2)
+        if count is None:
+            return None
+        if unit in ("day", "week"):
+            day = ("offset", count * (7 if unit == "week" else 1))
+        else:
+            delta = count * (60 if unit in ("hour", "hr") else 1)
+    if day is None and delta is None:
+        day = _parse_day(text)
+
+    clock = until = bound = None
+    match = _BETWEEN.search(text)
+    if match:
+        clock, until = _clock(match.groups()[0:4]), _clock(match.groups()[4:8])
+        if clock and until and clock.meridiem is None and until.meridiem:
+            clock = Clock(clock.hour, clock.minute, until.meridiem if clock.hour <= until.hour else "am")
+    if clock is None:
+        match = _BOUND.search(text)
+        if match:
+            bound = "before" if match.group(1) in ("before", "by") else "after"
+            clock = _clock(match.groups()[1:5])
+    if clock is None:
+        match = _HALF_QUARTER.search(text)
+        if match and _number(match.group(2)) is not None:
+            hour = _number(match.group(2))
+            kind = match.group(1)
+            minute = 30 if kind == "half past" else 15 if kind == "quarter past" else 45
+            clock = Clock((hour - 2) % 12 + 1 if kind == "quarter to" else hour, minute, match.group(3))
+    if clock is None:
+        match = _AT.search(text)
+        if match:
+            clock = _clock(match.groups()[0:4])
+    if clock is None:
+        match = _BARE_CLOCK.search(text)
+        if match:
+            if match.group(6):
+                hour = 0 if match.group(6) == "midnight" else 12
+                clock = Clock(hour, 0, "am" if hour == 0 else "pm")
+            elif match.group(4):
+                clock = Clock(int(match.group(4)), int(match.group(5)))
+            elif _number(match.group(1)) is not None:
+                meridiem = match.group(3) if match.group(3) in ("am", "pm") else None
+                clock = Clock(_number(match.group(1)), int(match.group(2) or 0), meridiem)
+
+    part = None
+    match = _PART.search(text)
+    if match:
+        name = match.group(2).replace(" ", "").replace("time", "")
+        name = "night" if name == "tonight" else name
+        start, end = PARTS_OF_DAY[name]
+        middle = (start + end) / 2
+        if match.group(1) == "early ":
+            end = int(middle)
+        elif match.group(1) == "late ":
+            start = int(middle + 0.5)
+        part = (start, end)
+        if match.group(2) == "tonight" and day is None:
+            day = ("offset", 0)
+
+    if day is None and delta is None and clock is None and part is None:
+        return None
+    return Parsed(day=day, delta_minutes=delta, clock=clock, until=until, bound=bound, part=part)
+
+
+def _parse_day(text: str) -> Optional[Tuple]:
+    match = _DAY_WORD.search(text)
+    if match:
+        word = match.group(1)
+        return ("offset", 2 if word == "day after tomorrow" else 1 if word in ("tomorrow", "tmrw") else 0)
+    match = _WEEK.search(text)
+    if match:
+        kind = match.group(2) or match.group(3)
+        return (kind, 0 if match.group(1) in (None, "this") else 1)
+    match = _WEEKDAY.search(text)
+    if match:
+        return ("weekday", WEEKDAYS.index(match.group(2)), match.group(1) or "")
+    match = _MONTH_DAY.search(text)
+    if match:
+        month = MONTHS[match.group(1) or match.group(4)]
+        day = int(match.group(2) or match.group(3))
+        return ("date", month, day, int(match.group(5)) if match.group(5) else None)
+    match = _NUMERIC_DATE.search(text)
+    if match:
+        # Day first, as our callers (Asia/Kolkata by default) write it
+        year = match.group(3)
+        year = (2000 + int(year) if len(year) == 2 else int(year)) if year else None
+        return ("date", int(match.group(2)), int(match.group(1)), year)
+    match = _DAY_OF_MONTH.search(text)
+    if match:
+        return ("dom", int(match.group(1)))
+    return None
+
+
+def _hour24(clock: Clock, part: Optional[Tuple[int, int]]) -> int:
+    """24-hour value; without am/pm, the part of day or business hours decide."""
+    hour = clock.hour
+    if clock.meridiem == "pm":
+        return hour if hour == 12 else hour + 12
+    if clock.meridiem == "am":
+        return 0 if hour == 12 else hour
+    if hour >= 13:
+        return hour
+    if part is not None:
+        # The part of day decides: "morning at 7" is 7, "evening at 7" is 19
+        for candidate in (hour, hour + 12):
+            if part[0] <= candidate < part[1]:
+                return candidate
+        return hour + 12 if part[0] >= 12 and hour < 12 else hour
+    # "at 3" on a booking call means the afternoon
+    return hour + 12 if 1 <= hour <= 7 else hour
+
+
+def _resolve_day(day: Tuple, today: datetime.date) -> Optional[Tuple[datetime.date, datetime.date]]:
+    """First and last day (inclusive) the expression covers."""
+    kind = day[0]
+    if kind == "offset":
+        first = today + datetime.timedelta(days=day[1])
+        return first, first
+    if kind == "weekday":
+        ahead = (day[1] - today.weekday()) % 7
+        if ahead == 0 and day[2] in ("next", "coming"):
+            ahead = 7
+        first = today + datetime.timedelta(days=ahead)
+        return first, first
+    if kind == "week":
+        monday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(weeks=day[1])
+        if day[1] == 0 and today.weekday() >= 5:
+            # The working week is over; at the weekend "this week" means the coming one
+            monday += datetime.timedelta(weeks=1)
+        return max(monday, today), monday + datetime.timedelta(days=4)
+    if kind == "weekend":
+        saturday = today + datetime.timedelta(days=(5 - today.weekday()) % 7, weeks=day[1])
+        if today.weekday() == 6 and day[1] == 0:
+            return today, today
+        return saturday, saturday + datetime.timedelta(days=1)
+    try:
+        if kind == "date":
+            first = datetime.date(day[3] or today.year, day[1], day[2])
+            if first < today and day[3] is None:
+                first = first.replace(year=today.year + 1)
+        else:  # "dom"
+            first = today.replace(day=day[1])
+            if first < today:
+                month = today.month % 12 + 1
+                first = first.replace(year=today.year + (month == 1), month=month)
+    except ValueError:
+        return None
+    return first, first
+
+
+def resolve(expression: str, timezone: str = "Asia/Kolkata", now: Optional[datetime.datetime] = None,
+            duration_minutes: int = 30) -> Optional[TimeWindow]:
+    """Turn "next Tuesday afternoon" or "tomorrow at 3" into a window in ``timezone``.
+
+    Parsing is cached per expression; only the arithmetic against ``now``
+    runs on every call. Returns None when nothing in the text names a day
+    or a time.
+
+    Args:
+        expression (str): What the caller said.
+        timezone (str): The caller's zone; the result is localized to it.
+        now (datetime): Reference time (aware); defaults to the current time.
+        duration_minutes (int): Length of an exact window.
+    """
+    parsed = parse(normalize(expression))
+    if parsed is None:
+        RESOLUTIONS.inc(result="unresolved")
+        return None
+    tz = get_zone(timezone)
+    now = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(tz)
+
+    def local(day: datetime.date, hour: int, minute: int = 0) -> datetime.datetime:
+        return tz.localize(datetime.datetime.combine(day, datetime.time(hour, minute)))
+
+    duration = datetime.timedelta(minutes=duration_minutes)
+
+    if parsed.delta_minutes is not None:
+        start = now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=parsed.delta_minutes)
+        RESOLUTIONS.inc(result="exact")
+        return TimeWindow(start, start + duration, exact=True)
+
+    days = _resolve_day(parsed.day, now.date()) if parsed.day else (now.date(), now.date())
+    if days is None:
+        RESOLUTIONS.inc(result="unresolved")
+        return None
+    first, last = days
+    part = parsed.part
+
+    if parsed.clock is not None and parsed.bound is None:
+        start = local(first, _hour24(parsed.clock, part), parsed.clock.minute)
+        if parsed.until is not None:
+            end = local(first, _hour24(parsed.until, part), parsed.until.minute)
+            if end <= start:
+                end += datetime.timedelta(hours=12)
+            window = TimeWindow(start, end, exact=False)
+        else:
+            if parsed.day is None and start <= now:
+                start += datetime.timedelta(days=1)
+            window = TimeWindow(start, start + duration, exact=True)
+    else:
+        start_hour, end_hour = part or (DAY_START, DAY_END)
+        start, end = local(first, start_hour), local(last, end_hour)
+        if parsed.bound == "after":
+            start = local(first, _hour24(parsed.clock, part), parsed.clock.minute)
+            end = max(end, start + duration)
+        elif parsed.bound == "before":
+            end = local(first, _hour24(parsed.clock, part), parsed.clock.minute)
+            start = min(start, end - duration)
+        window = TimeWindow(start, end, exact=False)
+
+    window = _against_now(window, now)
+    RESOLUTIONS.inc(result="exact" if window.exact else "window")
+    return window
+
+
+def _against_now(window: TimeWindow, now: datetime.datetime) -> TimeWindow:
+    """Flag a window that is over, and start one that has already begun from now."""
+    if window.end <= now:
+        return TimeWindow(window.start, window.end, window.exact, past=True)
+    if not window.exact and window.start < now:
+        # Today's window has already begun: the earliest start is the next quarter hour
+        rounded = now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=15 - now.minute % 15)
+        return TimeWindow(min(rounded, window.end), window.end, exact=False)
+    return window
+
+
+def resolve_when(value: str, timezone: str = "Asia/Kolkata", now: Optional[datetime.datetime] = None,
+                 duration_minutes: int = 30) -> Optional[TimeWindow]:
+    """Like ``resolve``, but ISO 8601 values (naive ones read in ``timezone``) take a fast path.
+
+    A date without a time ("2026-10-20") is that day's business hours, not
+    an exact midnight.
+    """
+    value = value.strip()
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return resolve(value, timezone, now, duration_minutes)
+    tz = get_zone(timezone)
+    if "T" not in value and " " not in value:
+        day = parsed.date()
+        window = TimeWindow(tz.localize(datetime.datetime.combine(day, datetime.time(DAY_START))),
+                            tz.localize(datetime.datetime.combine(day, datetime.time(DAY_END))), exact=False)
+        return _against_now(window, (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(tz))
+    start = tz.localize(parsed) if parsed.tzinfo is None else parsed.astimezone(tz)
+    return TimeWindow(start, start + datetime.timedelta(minutes=duration_minutes), exact=True)
+
+
+def parse_when(value: str, timezone: str = "Asia/Kolkata", now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """A tool argument as an aware datetime: ISO 8601 or anything ``resolve`` understands.
+
+    A window resolves to its start. Raises ``ToolError``, whose message is
+    passed to the LLM (other exceptions reach it only as an internal error).
+    """
+    window = resolve_when(value, timezone, now)
+    if window is None:
+        raise ToolError(f"Could not understand the time '{value}'. Ask the user for a day and time.")
+    return window.start
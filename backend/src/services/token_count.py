@@ -0,0 +1,85 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger("agent")
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to a character heuristic
+    tiktoken = None
+
+# Typical English prose averages about four characters per token.
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        logger.warning("tiktoken encoding unavailable; estimating token counts from length")
+        return None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Token count of ``text``: exact with ``tiktoken`` installed, estimated otherwise."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Cut ``text`` to at most ``max_tokens``, keeping its start (``head``) or end (``tail``)."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        kept = tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:]
+        return encoding.decode(kept).strip()
+    limit = max_tokens * CHARS_PER_TOKEN
+    if keep == "head":
+        cut = text[:limit]
+        # Don't end mid-word.
+        return cut.rsplit(" ", 1)[0] if " " in cut else cut
+    cut = text[-limit:]
+    return cut.split(" ", 1)[1] if " " in cut else cut
+
+
+def truncate_lines(text: str, max_tokens: int, keep: str = "tail") -> str:
+    """Cut ``text`` to at most ``max_tokens`` by dropping whole lines from the other end.
+
+    For transcripts, where half a line reads as a different message. A single
+    line longer than the budget is cut with ``truncate_tokens``.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    if keep == "tail":
+        lines.reverse()
+    kept = []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line) + (1 if kept else 0)  # the joining newline
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        return truncate_tokens(lines[0], max_tokens, keep=keep) if lines else ""
+    if keep == "tail":
+        kept.reverse()
+    result = "\n".join(kept)
+    # Per-line counts can undercount the joined text by a token or two
+    while len(kept) > 1 and count_tokens(result) > max_tokens:
+        kept.pop(0 if keep == "tail" else -1)
+        result = "\n".join(kept)
+    return result
@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from livekit.agents.llm import utils as llm_utils
+
+from services.booking import SPECIALTY_TERMS
+from services.metrics import registry
+from services.time_resolver import normalize, parse
+from services.token_count import count_tokens
+
+logger = logging.getLogger("agent")
+
+PHASE_CHANGES = registry.counter("agent_tool_phase_changes_total", "Tool-set switches by the phase entered.")
+
+# What the LLM is offered in each phase of a call. resolve_time and
+# get_current_date are everywhere because any phase can meet a spoken date, and
+# the instructions carry only the day. lookup_weather (a template placeholder)
+# is in none.
+_ANY_PHASE = ("resolve_time", "get_current_date")
+PHASE_TOOLS: Dict[str, Tuple[str, ...]] = {
+    # Opening: the caller hasn't said what they want yet
+    "identify": ("find_and_book", "fetch_experts", "list_meetings", "get_the_summary_of_user_info", *_ANY_PHASE),
+    "browse": ("find_and_book", "fetch_experts", "suggest_slots_for_expert", *_ANY_PHASE),
+    "slot": ("find_and_book", "suggest_slots_for_expert", "schedule_meeting", *_ANY_PHASE),
+    "manage": ("list_meetings", "list_meetings_by_date", "cancel_meeting", "reschedule_meeting", *_ANY_PHASE),
+}
+
+_MANAGE = re.compile(
+    r"\b(cancel|reschedul|postpone|move (my|the|it)|my (meetings?|appointments?|bookings?|schedule)"
+    r"|what do i have|upcoming|coming up|already booked)"
+)
+_BROWSE = re.compile(
+    r"\b(expert|doctor|dr|specialist|consult|appointment|book|checkup|check up|see (a|an|someone)|need (a|an|to see)|"
+    + "|".join(re.escape(term) for terms in SPECIALTY_TERMS.values() for term in terms) + r")"
+)
+# Picking or confirming one of the offered slots
+_CHOICE = re.compile(r"\b(first|second|third|last|that one|this one|yes|yeah|sure|okay|ok|go ahead|confirm|works)\b")
+
+# Where each tool leaves the call; None means "depends on whether a booking is still open"
+_AFTER_TOOL: Dict[str, Optional[str]] = {
+    "list_meetings": "manage",
+    "list_meetings_by_date": "manage",
+    "cancel_meeting": "manage",
+    "reschedule_meeting": "manage",
+    "fetch_experts": "browse",
+    "suggest_slots_for_expert": None,
+    "find_and_book": None,
+    "schedule_meeting": None,
+}
+
+
+def tool_schema_tokens(tool: Any) -> int:
+    """Tokens the tool's schema adds to every request that offers it."""
+    try:
+        schema = llm_utils.build_legacy_openai_schema(tool)
+    except Exception:
+        schema = {"name": getattr(tool, "id", ""), "description": getattr(getattr(tool, "info", None), "description", "")}
+    return count_tokens(json.dumps(schema))
+
+
+class ToolPhases:
+    """Picks the function tools the LLM sees for the current phase of the call.
+
+    Every tool schema is sent with every request, so offering all of them
+    costs prompt tokens and gives the model more to choose from on each turn.
+    The phase follows what the caller says (``on_user_turn``) and which tools
+    just ran (``after_tool``); it only changes on a clear signal, so a turn
+    with none keeps the tools the conversation is already using. Set
+    ``AGENT_TOOL_PHASES=0`` to offer every tool.
+    """
+
+    def __init__(self, tools: Iterable[Any], phases: Optional[Dict[str, Tuple[str, ...]]] = None,
+                 initial: str = "identify", enabled: Optional[bool] = None):
+        """
+        Args:
+            tools (Iterable): All of the agent's function tools.
+            phases (Dict[str, Tuple[str, ...]]): Tool names per phase (``PHASE_TOOLS``).
+            initial (str): Phase a call starts in.
+            enabled (bool): Whether to narrow the tools at all (``AGENT_TOOL_PHASES``).
+        """
+        self._tools = {tool.id: tool for tool in tools}
+        self.phases = PHASE_TOOLS if phases is None else phases
+        self.phase = initial
+        self.enabled = os.getenv("AGENT_TOOL_PHASES", "1") != "0" if enabled is None else enabled
+        self._tokens = {name: tool_schema_tokens(tool) for name, tool in self._tools.items()}
+        self._applied: Optional[List[str]] = None
+
+    def names(self, phase: Optional[str] = None) -> List[str]:
+        if not self.enabled:
+            return list(self._tools)
+        return [name for name in self.phases[phase or self.phase] if name in self._tools]
+
+    def tools(self, phase: Optional[str] = None) -> list:
+        return [self._tools[name] for name in self.names(phase)]
+
+    def tokens(self, phase: Optional[str] = None) -> int:
+        """Schema tokens of the tools offered in ``phase`` (the current one by default)."""
+        return sum(self._tokens[name] for name in self.names(phase))
+
+    def all_tokens(self) -> int:
+        return sum(self._tokens.values())
+
+    def take_update(self) -> Optional[list]:
+        """Tools to hand to ``Agent.update_tools`` if they differ from what the LLM has, else None."""
+        names = self.names()
+        if names == self._applied:
+            return None
+        self._applied = names
+        return self.tools()
+
+    def _enter(self, phase: str) -> bool:
+        if phase == self.phase:
+            return False
+        logger.debug(f"Tool phase {self.phase} -> {phase}")
+        self.phase = phase
+        PHASE_CHANGES.inc(phase=phase)
+        return True
+
+    def on_user_turn(self, text: str, booking_intent: Optional[dict] = None) -> bool:
+        """Move to the phase the caller's words point to; returns True if the phase changed."""
+        lowered = (text or "").lower()
+        if _MANAGE.search(lowered):
+            phase = "manage"
+        elif booking_intent and (_CHOICE.search(lowered) or parse(normalize(lowered)) is not None):
+            phase = "slot"
+        elif _BROWSE.search(lowered):
+            phase = "browse"
+        else:
+            return False
+        return self._enter(phase)
+
+    def after_tool(self, name: str, booking_intent: Optional[dict] = None) -> bool:
+        """Move to where ``name`` leaves the call; applied from the next user turn."""
+        if name not in _AFTER_TOOL:
+            return False
+        phase = _AFTER_TOOL[name]
+        if phase is None:
+            # Slots on offer, or the booking went through and the call starts over
+            phase = "slot" if booking_intent else "identify"
+        return self._enter(phase)
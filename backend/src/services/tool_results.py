@@ -0,0 +1,162 @@
+import functools
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import registry
+from services.token_count import count_tokens, truncate_tokens
+
+logger = logging.getLogger("agent")
+
+TOOL_RESULT_TOKENS = registry.histogram(
+    "agent_tool_result_tokens", "Tokens per function tool result, before (raw) and after (shaped) shaping."
+)
+TOOL_BUDGET_EXHAUSTED = registry.counter(
+    "agent_tool_budget_exhausted_total", "Tool results cut short by the per-turn tool-output budget."
+)
+
+# A result never shrinks below this, so the LLM always learns something.
+MIN_RESULT_TOKENS = 40
+
+
+def compact_time(value: Any) -> str:
+    """``2025-10-14T09:00:00+05:30`` -> ``2025-10-14 09:00+05:30``."""
+    text = str(value or "")
+    if len(text) >= 19 and text[10] == "T" and text[16] == ":":
+        return f"{text[:10]} {text[11:16]}{text[19:]}"
+    return text
+
+
+@dataclass(frozen=True)
+class ResultSchema:
+    """How one tool's structured result is rendered for the LLM.
+
+    Rows are written as a header line of terse column names followed by one
+    ``|``-separated line per row, so keys are not repeated per item.
+
+    Attributes:
+        label: Name of the collection, e.g. ``meetings``.
+        columns: ``(terse name, source key)`` pairs, in output order.
+        max_rows: Rows shown before a ``+N more`` hint.
+        formatters: Per source key value formatters.
+    """
+
+    label: str
+    columns: Tuple[Tuple[str, str], ...]
+    max_rows: int = 10
+    formatters: Dict[str, Callable[[Any], str]] = field(default_factory=dict)
+
+    def render_row(self, row: Dict[str, Any]) -> str:
+        values = []
+        for _, key in self.columns:
+            value = row.get(key, "")
+            formatter = self.formatters.get(key)
+            text = formatter(value) if formatter else str(value if value is not None else "")
+            values.append(text.replace("|", "/").replace("\n", " "))
+        return "|".join(values)
+
+    def render(self, rows: List[Dict[str, Any]], max_tokens: int) -> str:
+        header = f"{self.label}: {'|'.join(name for name, _ in self.columns)}"
+        lines = [header]
+        used = count_tokens(header)
+        shown = 0
+        for row in rows[:self.max_rows]:
+            line = self.render_row(row)
+            cost = count_tokens(line) + 1
+            if shown and used + cost > max_tokens:
+                break
+            lines.append(line)
+            used += cost
+            shown += 1
+        remaining = len(rows) - shown
+        if remaining:
+            lines.append(f"+{remaining} more {self.label}; ask the user to narrow it down")
+        return "\n".join(lines)
+
+
+MEETINGS = ResultSchema(
+    "meetings",
+    (("id", "id"), ("title", "summary"), ("start", "start"), ("end", "end")),
+    formatters={"start": compact_time, "end": compact_time},
+)
+EXPERTS = ResultSchema("experts", (("id", "id"), ("name", "name"), ("specialty", "specialty")), max_rows=15)
+
+
+class ToolOutputBudget:
+    """Tokens all tool results may use between two user turns."""
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        self.max_tokens = max_tokens or int(os.getenv("AGENT_TOOL_OUTPUT_BUDGET_TOKENS", "800"))
+        self.used = 0
+
+    def remaining(self) -> int:
+        return max(0, self.max_tokens - self.used)
+
+    def charge(self, tokens: int) -> None:
+        self.used += tokens
+
+    def reset(self) -> None:
+        self.used = 0
+
+
+def shape_result(result: Any, schema: Optional[ResultSchema], max_tokens: int) -> str:
+    """Render a tool result as compact text of at most ``max_tokens`` (roughly)."""
+    if isinstance(result, str):
+        return truncate_tokens(result, max_tokens)
+    if isinstance(result, dict) and schema is not None and isinstance(result.get(schema.label), list):
+        message = str(result.get("message", ""))
+        budget = max(MIN_RESULT_TOKENS, max_tokens - count_tokens(message))
+        return f"{message}\n{schema.render(result[schema.label], budget)}".strip()
+    if isinstance(result, list) and schema is not None:
+        return schema.render(result, max_tokens)
+    return truncate_tokens(str(result), max_tokens)
+
+
+def _has_rows(result: Any, schema: Optional[ResultSchema]) -> bool:
+    """Whether ``result`` is rendered as rows of ``schema`` (and so can drop rows to fit)."""
+    if schema is None:
+        return False
+    return isinstance(result, list) or (isinstance(result, dict) and isinstance(result.get(schema.label), list))
+
+
+def shaped_result(schema: Optional[ResultSchema] = None,
+                  max_tokens: Optional[int] = None) -> Callable[[Callable], Callable]:
+    """Shape an async tool's return value; apply below ``@function_tool``.
+
+    Rows rendered through ``schema`` are capped at ``max_tokens``
+    (``AGENT_TOOL_RESULT_MAX_TOKENS``) and at whatever is left of the agent's
+    per-turn ``tool_budget``, if it has one; dropped rows become a ``+N more``
+    hint. Plain strings are the tool's own answer (a confirmation, a list of
+    options and what to ask next) and are returned whole; they still count
+    against the budget. Anything else is cut to ``max_tokens``.
+    """
+    cap = max_tokens or int(os.getenv("AGENT_TOOL_RESULT_MAX_TOKENS", "300"))
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            result = await fn(*args, **kwargs)
+            if result is None:
+                return result
+            budget: Optional[ToolOutputBudget] = getattr(args[0], "tool_budget", None) if args else None
+            if isinstance(result, str):
+                shaped = result
+                limit = cap
+            else:
+                rows = _has_rows(result, schema)
+                limit = cap if budget is None or not rows else max(MIN_RESULT_TOKENS, min(cap, budget.remaining()))
+                shaped = shape_result(result, schema, limit)
+            tokens = count_tokens(shaped)
+            if limit < cap and shape_result(result, schema, cap) != shaped:
+                TOOL_BUDGET_EXHAUSTED.inc(tool=fn.__name__)
+                logger.info(f"Tool output budget exhausted; {fn.__name__} result cut to {tokens} tokens")
+            if budget is not None:
+                budget.charge(tokens)
+            TOOL_RESULT_TOKENS.observe(count_tokens(str(result)), tool=fn.__name__, part="raw")
+            TOOL_RESULT_TOKENS.observe(tokens, tool=fn.__name__, part="shaped")
+            return shaped
+
+        return wrapper
+
+    return decorator
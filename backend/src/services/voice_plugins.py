@@ -0,0 +1,123 @@
+import importlib
+import logging
+import os
+from types import ModuleType
+from typing import Any, Dict, List
+
+logger = logging.getLogger("agent")
+
+# Importing a LiveKit plugin costs 1-3s of CPU, so only the configured ones are
+# loaded. Plugins register themselves on import and must be imported on the
+# main thread: call preload() from prewarm, not from inside a job.
+PLUGIN_MODULES: Dict[str, str] = {
+    "azure": "livekit.plugins.azure",
+    "cartesia": "livekit.plugins.cartesia",
+    "deepgram": "livekit.plugins.deepgram",
+    "noise_cancellation": "livekit.plugins.noise_cancellation",
+    "openai": "livekit.plugins.openai",
+    "silero": "livekit.plugins.silero",
+}
+
+# AGENT_LLM_PROVIDER / AGENT_STT_PROVIDER / AGENT_TTS_PROVIDER values -> plugin
+LLM_PLUGINS = {"azure_openai": "openai", "openai": "openai"}
+STT_PLUGINS = {"azure": "azure", "deepgram": "deepgram"}
+TTS_PLUGINS = {"azure": "azure", "cartesia": "cartesia"}
+
+
+def _choice(env_var: str, default: str, options: Dict[str, str]) -> str:
+    value = os.getenv(env_var, default).strip().lower()
+    if value not in options:
+        raise ValueError(f"{env_var}={value!r} is not supported; use one of {', '.join(sorted(options))}")
+    return value
+
+
+def llm_provider() -> str:
+    return _choice("AGENT_LLM_PROVIDER", "azure_openai", LLM_PLUGINS)
+
+
+def stt_provider() -> str:
+    return _choice("AGENT_STT_PROVIDER", "azure", STT_PLUGINS)
+
+
+def tts_provider() -> str:
+    return _choice("AGENT_TTS_PROVIDER", "azure", TTS_PLUGINS)
+
+
+def tts_voice() -> str:
+    """Identifier of the configured TTS voice, e.g. ``azure-en-IN-AartiNeural``."""
+    provider = tts_provider()
+    if provider == "azure":
+        return f"azure-{os.getenv('AZURE_TTS_VOICE', 'en-IN-AartiNeural')}"
+    return f"cartesia-{os.getenv('CARTESIA_VOICE') or 'default'}"
+
+
+def configured_plugins() -> List[str]:
+    """Plugins the current configuration needs, VAD and noise cancellation included."""
+    names = [
+        LLM_PLUGINS[llm_provider()],
+        STT_PLUGINS[stt_provider()],
+        TTS_PLUGINS[tts_provider()],
+        "silero",
+        "noise_cancellation",
+    ]
+    return list(dict.fromkeys(names))
+
+
+def load_plugin(name: str) -> ModuleType:
+    return importlib.import_module(PLUGIN_MODULES[name])
+
+
+def preload() -> List[str]:
+    """Import every configured plugin. Returns their names."""
+    names = configured_plugins()
+    for name in names:
+        load_plugin(name)
+    logger.info(f"Loaded voice plugins: {', '.join(names)}")
+    return names
+
+
+# ---------------- BUILDERS ----------------
+def build_llm() -> Any:
+    provider = llm_provider()
+    openai = load_plugin("openai")
+    if provider == "azure_openai":
+        return openai.LLM.with_azure(
+            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        )
+    return openai.LLM(model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+
+
+def build_stt() -> Any:
+    provider = stt_provider()
+    language = os.getenv("AGENT_STT_LANGUAGE", "en-IN")
+    if provider == "azure":
+        return load_plugin("azure").STT(
+            speech_key=os.getenv("AZURE_SPEECH_KEY"),
+            speech_region=os.getenv("AZURE_SPEECH_REGION"),
+            language=language,
+        )
+    return load_plugin("deepgram").STT(model=os.getenv("DEEPGRAM_MODEL", "nova-3"), language=language)
+
+
+def build_tts() -> Any:
+    provider = tts_provider()
+    if provider == "azure":
+        return load_plugin("azure").TTS(
+            speech_key=os.getenv("AZURE_SPEECH_KEY"),
+            speech_region=os.getenv("AZURE_SPEECH_REGION"),
+            voice=os.getenv("AZURE_TTS_VOICE", "en-IN-AartiNeural"),
+        )
+    cartesia = load_plugin("cartesia")
+    voice = os.getenv("CARTESIA_VOICE")
+    return cartesia.TTS(voice=voice) if voice else cartesia.TTS()
+
+
+def load_vad() -> Any:
+    return load_plugin("silero").VAD.load()
+
+
+def build_noise_cancellation() -> Any:
+    return load_plugin("noise_cancellation").BVC()
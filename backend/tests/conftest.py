@@ -0,0 +1,18 @@
+import pytest
+
+from services.calendar_resilience import CalendarResilience, CircuitBreaker, RateLimiter
+from services.fake_calendar_service import FakeCalendarService
+
+
+@pytest.fixture
+def fake_calendar():
+    """Build a seeded ``FakeCalendarService`` with limits too high to get in the way."""
+
+    def build(max_attempts: int = 2, **kwargs) -> FakeCalendarService:
+        limiter = RateLimiter(user_rate=1000, user_burst=1000, project_rate=1000, project_burst=1000, max_wait=1)
+        breaker = CircuitBreaker(failure_threshold=100, reset_timeout=60)
+        resilience = CalendarResilience(limiter, breaker, max_attempts=max_attempts, base_delay=0,
+                                        sleep=lambda _: None)
+        return FakeCalendarService(resilience=resilience, seed=7, **kwargs)
+
+    return build
@@ -0,0 +1,59 @@
+import asyncio
+import datetime
+
+import pytz
+
+from db.AppDatabase import AppDatabase
+from services.booking import (
+    busy_intervals,
+    find_slot_options,
+    match_experts,
+    without_conflicts,
+)
+from services.time_resolver import resolve
+
+IST = pytz.timezone("Asia/Kolkata")
+NOW = IST.localize(datetime.datetime(2025, 10, 16, 10, 20))
+
+EXPERTS = [
+    {"id": 1, "name": "Dr. Asha Rao", "specialty": "Cardiology", "status": "ACTIVE"},
+    {"id": 2, "name": "Dr. Vikram Shah", "specialty": "Dermatology", "status": "ACTIVE"},
+    {"id": 3, "name": "Dr. Meera Iyer", "specialty": "Nutrition", "status": "ACTIVE"},
+    {"id": 4, "name": "Dr. Old Heart", "specialty": "Cardiology", "status": "INACTIVE"},
+]
+
+
+def test_match_experts_by_name_specialty_and_everyday_terms() -> None:
+    assert [e["id"] for _, e in match_experts("I need a cardiologist", EXPERTS)] == [1]
+    assert [e["id"] for _, e in match_experts("my skin has a rash", EXPERTS)] == [2]
+    # A named expert outranks a specialty match
+    assert [e["id"] for _, e in match_experts("Dr. Iyer or a heart doctor", EXPERTS)] == [3, 1]
+    assert match_experts("book me something", EXPERTS) == []
+
+
+def test_slots_are_searched_per_expert_ranked_and_filtered(tmp_path) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    ids = [db.create_expert(e["name"], e["specialty"], f"expert{e['id']}@example.com") for e in EXPERTS[:2]]
+    with db._connect() as conn:
+        for expert_id in ids:
+            conn.execute(
+                "INSERT INTO expert_availability (expert_id, start_time, end_time, recurring_type) "
+                "VALUES (?, '00:00:00', '23:59:00', 'daily')",
+                (expert_id,),
+            )
+    experts = [dict(e, id=i) for e, i in zip(EXPERTS, ids)]
+    window = resolve("tomorrow at 3 pm", now=NOW)
+    matches = [(3.0, experts[1]), (2.0, experts[0])]
+
+    options = asyncio.run(find_slot_options(db, matches, window, 30))
+    assert options[0].start == window.start and options[0].expert["id"] == ids[1]
+    assert [o.rank_key() for o in options] == sorted(o.rank_key() for o in options)
+    assert {o.expert["id"] for o in options} == set(ids)
+
+    busy = busy_intervals([
+        {"start": {"dateTime": "2025-10-17T15:00:00+05:30"}, "end": {"dateTime": "2025-10-17T15:30:00+05:30"}},
+        {"start": {"date": "2025-10-17"}, "end": {"date": "2025-10-18"}},
+    ])
+    free = without_conflicts(options, busy)
+    assert all(o.start != window.start for o in free)
+    assert len(free) < len(options)
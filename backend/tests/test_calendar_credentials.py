@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+
+from services import calendar_credentials
+from services.calendar_credentials import CalendarClientPool, CalendarCredentialsError
+from services.calendar_resilience import CalendarResilience, CircuitBreaker, RateLimiter
+from services.calendar_service import SHARED_FALLBACKS, CalendarService
+
+CLIENT = {"client_id": "id", "client_secret": "secret", "token_uri": "https://example.com/token"}
+
+
+class TokenDatabase:
+    """The two ``AppDatabase`` token calls the pool makes."""
+
+    def __init__(self, user_ids, expiry=None):
+        expiry = expiry or datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        self.tokens = {
+            user_id: {"id": 100 + user_id, "access_token": f"token-{user_id}", "refresh_token": "refresh",
+                      "token_expiry": expiry.isoformat()}
+            for user_id in user_ids
+        }
+        self.loads = []
+        self.updates = []
+
+    def get_tokens_for_user(self, user_id):
+        self.loads.append(user_id)
+        return [self.tokens[user_id]] if user_id in self.tokens else []
+
+    def update_token(self, token_id, access_token, token_expiry=None, refresh_token=None):
+        self.updates.append((token_id, access_token))
+        return True
+
+
+def _pool(db, max_size=256) -> CalendarClientPool:
+    return CalendarClientPool(db, lambda: CLIENT, scopes=["calendar"], max_size=max_size)
+
+
+def test_least_recently_used_client_is_evicted_and_invalidate_drops_it() -> None:
+    db = TokenDatabase([1, 2, 3])
+    pool = _pool(db, max_size=2)
+    first = pool.get(1)
+    pool.get(2)
+    assert pool.get(1) is first
+    pool.get(3)  # evicts user 2
+
+    assert len(pool) == 2 and db.loads == [1, 2, 3]
+    pool.get(2)
+    assert db.loads == [1, 2, 3, 2]
+
+    pool.invalidate(1)
+    assert pool.get(1) is not first
+    assert db.loads[-1] == 1
+
+    with pytest.raises(CalendarCredentialsError):
+        pool.get(9)
+
+
+def test_refreshed_tokens_are_written_back(monkeypatch) -> None:
+    def refresh(creds, request):
+        creds.token = "refreshed"
+        creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    monkeypatch.setattr(calendar_credentials.Credentials, "refresh", refresh)
+    db = TokenDatabase([1], expiry=datetime.datetime.utcnow() - datetime.timedelta(minutes=5))
+    pool = _pool(db)
+
+    client = pool.get(1)
+    assert client.creds.token == "refreshed"
+    assert db.updates == [(101, "refreshed")]
+
+    # google-auth refreshing mid-request is persisted once, after the call
+    client.creds.token = "refreshed-again"
+    pool.persist(client)
+    pool.persist(client)
+    assert db.updates == [(101, "refreshed"), (101, "refreshed-again")]
+
+
+class Request:
+    def __init__(self, service):
+        self.service = service
+
+    def execute(self, http=None):
+        return self.service
+
+
+def _calendar(monkeypatch, shared: str) -> CalendarService:
+    monkeypatch.setenv("CALENDAR_SHARED_ACCOUNT", shared)
+    monkeypatch.setattr(CalendarService, "_get_calendar_service", lambda self: "shared-service")
+    limiter = RateLimiter(user_rate=1000, user_burst=1000, project_rate=1000, project_burst=1000, max_wait=1)
+    resilience = CalendarResilience(limiter, CircuitBreaker(100, 60), max_attempts=1, sleep=lambda _: None)
+    db = TokenDatabase([1])
+    calendar = CalendarService(resilience=resilience, db=db)
+    # Tokens are read and written back through the caller's database
+    assert calendar.pool.db is db
+    calendar.pool._client_config_loader = lambda: CLIENT
+    return calendar
+
+
+def test_users_without_a_token_fall_back_to_the_shared_account(monkeypatch) -> None:
+    calendar = _calendar(monkeypatch, "true")
+    before = SHARED_FALLBACKS.value(reason="no_token")
+    assert calendar._execute(Request, "list", user_id=2) == "shared-service"
+    assert calendar._execute(Request, "list", user_id=1) is calendar.pool.get(1).service
+    assert SHARED_FALLBACKS.value(reason="no_token") == before + 1
+
+
+def test_without_a_shared_account_tokenless_users_are_refused(monkeypatch) -> None:
+    calendar = _calendar(monkeypatch, "false")
+    assert calendar.service is None
+    with pytest.raises(CalendarCredentialsError):
+        calendar._execute(Request, "list", user_id=2)
+    with pytest.raises(CalendarCredentialsError):
+        calendar._execute(Request, "list")
@@ -0,0 +1,84 @@
+import importlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+RANGE = {"start": "2025-01-06T10:02:00Z", "end": "2025-01-06T18:58:00Z", "timezone": "Asia/Kolkata"}
+
+
+class StubCalendar:
+    def __init__(self, count: int):
+        self.events = [{"id": f"e{i}", "title": f"Meeting {i}"} for i in range(count)]
+        self.ranges = []
+
+    def list_meetings(self, max_results, user_id, time_min, time_max):
+        self.ranges.append((time_min, time_max))
+        return list(self.events)
+
+    def process_events(self, events, tz_name, fields=None):
+        return events
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # main.py logs to ../logs relative to the working directory
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    main = importlib.import_module("main")
+    calendar = StubCalendar(5)
+    monkeypatch.setattr(main, "get_calendar_provider", lambda db=None: calendar)
+    main.app.dependency_overrides[main.get_current_user] = lambda: {"id": 7, "email": "a@example.com"}
+    main.EVENTS_CACHE.clear()
+    yield main, TestClient(main.app), calendar
+    main.app.dependency_overrides.clear()
+    main.EVENTS_CACHE.clear()
+
+
+def test_range_is_widened_to_the_grid(api) -> None:
+    main, _, _ = api
+    assert main._snap_range("2025-01-06T10:02:00Z", "2025-01-06T10:58:00Z", 300) == (
+        "2025-01-06T10:00:00Z", "2025-01-06T11:00:00Z")
+    # Both ends in one window, or already on the grid and equal: still a non-empty range
+    assert main._snap_range("2025-01-06T10:01:00Z", "2025-01-06T10:03:00Z", 300) == (
+        "2025-01-06T10:00:00Z", "2025-01-06T10:05:00Z")
+    assert main._snap_range("2025-01-06T10:00:00Z", "2025-01-06T10:00:00Z", 300) == (
+        "2025-01-06T10:00:00Z", "2025-01-06T10:05:00Z")
+
+
+def test_events_are_cached_and_revalidated_with_etag(api) -> None:
+    _, client, calendar = api
+    first = client.get("/calendar/events", params=RANGE)
+    assert first.status_code == 200 and first.json()["total"] == 5
+    assert calendar.ranges == [("2025-01-06T10:00:00Z", "2025-01-06T19:00:00Z")]
+
+    etag = first.headers["ETag"]
+    again = client.get("/calendar/events", params=RANGE, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+    assert len(calendar.ranges) == 1
+
+
+def test_cursor_pages_through_every_event(api) -> None:
+    _, client, _ = api
+    seen, cursor = [], None
+    while True:
+        params = {**RANGE, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/calendar/events", params=params).json()
+        seen += [event["id"] for event in body["availability"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"e{i}" for i in range(5)]
+
+    assert client.get("/calendar/events", params={**RANGE, "cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_stale_cursor_is_rejected_after_events_change(api) -> None:
+    main, client, calendar = api
+    cursor = client.get("/calendar/events", params={**RANGE, "limit": 2}).json()["next_cursor"]
+
+    calendar.events.insert(0, {"id": "new", "title": "Booked meanwhile"})
+    main.EVENTS_CACHE.clear()
+    assert client.get("/calendar/events", params={**RANGE, "limit": 2, "cursor": cursor}).status_code == 409
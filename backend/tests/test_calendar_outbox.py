@@ -0,0 +1,59 @@
+import asyncio
+import datetime
+
+from db.AppDatabase import AppDatabase
+from services.calendar_outbox import CalendarOutboxDispatcher
+
+
+def _book(db: AppDatabase, event_id: str) -> None:
+    start = datetime.datetime(2030, 1, 7, 10, tzinfo=datetime.timezone.utc)
+    end = start + datetime.timedelta(minutes=30)
+    db.create_appointment(
+        event_id=event_id, user_id=1, expert_id=1, title="Checkup",
+        start_time=start.isoformat(), end_time=end.isoformat(),
+        calendar_payload={
+            "summary": "Checkup", "start": start.isoformat(), "end": end.isoformat(),
+            "attendees": ["a@example.com"], "timezone": "UTC",
+        },
+    )
+
+
+def _state(db: AppDatabase, event_id: str) -> tuple:
+    with db._connect() as conn:
+        row = conn.execute(
+            "SELECT calendar_state, calendar_attempts FROM appointments WHERE event_id = ?", (event_id,)
+        ).fetchone()
+    return row["calendar_state"], row["calendar_attempts"]
+
+
+def test_pending_bookings_are_pushed_once(tmp_path, fake_calendar) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    calendar = fake_calendar(max_attempts=1)
+    outbox = CalendarOutboxDispatcher(db, calendar)
+    _book(db, "0123456789abcdef0123456789abcdef")
+
+    assert asyncio.run(outbox.dispatch_once()) == 1
+    assert _state(db, "0123456789abcdef0123456789abcdef") == ("synced", 1)
+    assert asyncio.run(outbox.dispatch_once()) == 0
+
+    # Replaying the insert with the same ID doesn't create a duplicate event.
+    calendar.create_meeting("Checkup", "2030-01-07T10:00:00+00:00", "2030-01-07T10:30:00+00:00",
+                            [], "UTC", user_id=1, event_id="0123456789abcdef0123456789abcdef")
+    assert len(calendar.list_meetings(user_id=1, time_min="2030-01-01T00:00:00Z")) == 1
+
+
+def test_failed_pushes_back_off_then_give_up(tmp_path, caplog, fake_calendar) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    outbox = CalendarOutboxDispatcher(db, fake_calendar(max_attempts=1, error_rate=1.0, error_statuses=(503,)),
+                                      max_attempts=2, base_delay=0, max_delay=0)
+    _book(db, "fedcba9876543210fedcba9876543210")
+
+    assert asyncio.run(outbox.dispatch_once()) == 0
+    assert _state(db, "fedcba9876543210fedcba9876543210") == ("pending", 1)
+    assert asyncio.run(outbox.dispatch_once()) == 0
+    assert _state(db, "fedcba9876543210fedcba9876543210") == ("failed", 2)
+
+    # Giving up is logged as an error with what staff need to follow up
+    gave_up = [r for r in caplog.records if r.levelname == "ERROR"]
+    assert len(gave_up) == 1 and "fedcba9876543210fedcba9876543210" in gave_up[0].getMessage()
+    assert "a@example.com" in gave_up[0].getMessage()
@@ -0,0 +1,100 @@
+import pytest
+
+from services.calendar_resilience import (
+    CalendarResilience,
+    CalendarUnavailableError,
+    CircuitBreaker,
+    RateLimiter,
+    TokenBucket,
+    is_rate_limit_error,
+    is_transient_error,
+)
+
+
+class FakeHttpError(Exception):
+    """Mimics googleapiclient.errors.HttpError closely enough for classification."""
+
+    def __init__(self, status: int, reason: str = ""):
+        super().__init__(f"<HttpError {status} {reason}>")
+        self.status_code = status
+        self.error_details = [{"reason": reason}] if reason else []
+
+
+def _resilience(max_attempts: int = 3, threshold: int = 2) -> CalendarResilience:
+    limiter = RateLimiter(user_rate=100, user_burst=100, project_rate=100, project_burst=100, max_wait=1)
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_timeout=60)
+    return CalendarResilience(limiter, breaker, max_attempts=max_attempts, base_delay=0, sleep=lambda _: None)
+
+
+def test_error_classification() -> None:
+    assert is_rate_limit_error(FakeHttpError(403, "rateLimitExceeded"))
+    assert is_rate_limit_error(FakeHttpError(429))
+    assert not is_rate_limit_error(FakeHttpError(403, "forbidden"))
+    assert is_transient_error(FakeHttpError(503))
+    assert not is_transient_error(FakeHttpError(404))
+
+
+def test_token_bucket_reports_wait_when_empty() -> None:
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() > 0
+
+
+def test_rate_limiter_rejects_long_waits() -> None:
+    limiter = RateLimiter(user_rate=0.01, user_burst=1, project_rate=100, project_burst=100, max_wait=0.1)
+    limiter.acquire("alice@example.com")
+    with pytest.raises(CalendarUnavailableError):
+        limiter.acquire("alice@example.com")
+    # Other users have their own bucket.
+    limiter.acquire("bob@example.com")
+
+
+def test_retries_transient_errors_then_succeeds() -> None:
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FakeHttpError(500)
+        return "ok"
+
+    assert _resilience().call(flaky, operation="list") == "ok"
+    assert len(calls) == 3
+
+
+def test_inserts_are_not_retried_on_server_errors() -> None:
+    calls = []
+
+    def insert():
+        calls.append(1)
+        raise FakeHttpError(503)
+
+    with pytest.raises(CalendarUnavailableError):
+        _resilience().call(insert, operation="insert", idempotent=False)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_and_fails_fast() -> None:
+    resilience = _resilience(max_attempts=1, threshold=2)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise FakeHttpError(502)
+
+    for _ in range(2):
+        with pytest.raises(CalendarUnavailableError):
+            resilience.call(down, operation="list")
+    assert resilience.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CalendarUnavailableError):
+        resilience.call(down, operation="list")
+    assert len(calls) == 2
+
+
+def test_permanent_errors_propagate_unchanged() -> None:
+    def missing():
+        raise FakeHttpError(404)
+
+    with pytest.raises(FakeHttpError):
+        _resilience().call(missing, operation="get")
@@ -0,0 +1,59 @@
+import asyncio
+
+import av
+import numpy as np
+from livekit import rtc
+
+from services.call_recorder import AGENT, CALLER, CallRecorder, _Frame, _Timeline
+
+
+def _frame(value: int, sample_rate: int = 48000, ms: int = 10) -> rtc.AudioFrame:
+    samples = sample_rate * ms // 1000
+    pcm = np.full(samples, value, dtype=np.int16)
+    return rtc.AudioFrame(data=pcm.tobytes(), sample_rate=sample_rate, num_channels=1, samples_per_channel=samples)
+
+
+def _item(channel: int, at: float, value: int, sample_rate: int = 48000, source: str = "") -> _Frame:
+    frame = _frame(value, sample_rate)
+    return _Frame(channel, source or str(channel), at, bytes(frame.data), sample_rate, 1)
+
+
+def test_timeline_places_runs_and_cuts_interrupted_agent_speech() -> None:
+    timeline = _Timeline(48000, t0=100.0)
+    # Caller frames with jitter stay contiguous; TTS pushed ahead of playback queues behind itself
+    timeline.place(_item(CALLER, 100.000, 1000))
+    timeline.place(_item(CALLER, 100.013, 1000))
+    for _ in range(5):
+        timeline.place(_item(AGENT, 100.0, 2000))
+    timeline.truncate(AGENT, 100.03)
+
+    block = timeline.take(100.1)
+    assert block.shape == (2, 4800)
+    assert (block[0, :960] == 1000).all() and (block[0, 960:] == 0).all()
+    assert (block[1, :1440] == 2000).all() and (block[1, 1440:] == 0).all()
+    assert timeline.buffered_bytes == 0
+
+    # A pause longer than the resync window starts a new run where the frame arrived
+    timeline.place(_item(CALLER, 100.5, 3000))
+    block = timeline.take(None)
+    assert (block[0, 19200:19680] == 3000).all() and (block[0, :19200] == 0).all()
+
+
+def test_recording_is_encoded_to_disk(tmp_path) -> None:
+    recorder = CallRecorder(str(tmp_path / "call.ogg"))
+
+    async def scenario():
+        recorder.start()
+        for _ in range(30):
+            recorder.push(CALLER, _frame(500))
+            recorder.push(AGENT, _frame(800, sample_rate=24000))
+            await asyncio.sleep(0.01)
+        return await recorder.aclose()
+
+    result = asyncio.run(scenario())
+    assert result is not None and result.dropped_frames == 0
+    assert 0.25 < result.duration_seconds < 1.0
+    assert result.size_bytes > 0 and result.cpu_seconds >= 0
+    with av.open(result.path) as container:
+        stream = container.streams.audio[0]
+        assert stream.codec_context.name == "opus" and stream.channels == 2
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from services.capacity import CapacityModel, JobLoadReporter, read_snapshots
+
+
+class FakeRequest:
+    def __init__(self):
+        self.room = type("Room", (), {"name": "room-1"})()
+        self.decision = None
+
+    async def accept(self):
+        self.decision = "accepted"
+
+    async def reject(self):
+        self.decision = "rejected"
+
+
+class FakeWorker:
+    def __init__(self, jobs: int):
+        self.active_jobs = [object()] * jobs
+
+
+def _model(tmp_path, **kwargs) -> CapacityModel:
+    return CapacityModel(drain_file=str(tmp_path / "drain"), load_dir=str(tmp_path / "load"),
+                         cpu_percent=lambda: 0.1, **kwargs)
+
+
+def test_score_is_the_most_saturated_signal(tmp_path) -> None:
+    model = _model(tmp_path, max_sessions=4, lag_budget=0.2, pending_budget=10)
+    snapshots = [{"lag": 0.05, "pending": 2}, {"lag": 0.15, "pending": 3}]
+
+    score, components = model.score(1, 0.1, snapshots)
+    assert components == pytest.approx({"sessions": 0.25, "lag": 0.75, "cpu": 0.1, "pending": 0.5})
+    assert score == pytest.approx(0.75)
+    assert model.score(9, 0.1, [])[0] == 1.0
+
+
+def test_drain_file_only_counts_when_touched_after_start(tmp_path) -> None:
+    drain = tmp_path / "drain"
+    drain.touch()
+    os.utime(drain, (time.time() - 60, time.time() - 60))
+    model = _model(tmp_path)
+    assert not model.draining()
+    assert model.load(FakeWorker(1)) < 1.0
+
+    drain.touch()
+    assert model.draining()
+    assert model.load(FakeWorker(1)) == 1.0
+    request = FakeRequest()
+    asyncio.run(model.admit(request))
+    assert request.decision == "rejected"
+
+
+def test_admission_stops_at_max_sessions(tmp_path) -> None:
+    model = _model(tmp_path, max_sessions=2)
+    model.load(FakeWorker(1))
+    decisions = []
+    for _ in range(3):
+        request = FakeRequest()
+        asyncio.run(model.admit(request))
+        decisions.append(request.decision)
+    assert decisions == ["accepted", "rejected", "rejected"]
+
+
+def test_job_snapshots_round_trip_and_stale_ones_are_dropped(tmp_path) -> None:
+    directory = str(tmp_path / "load")
+    reporter = JobLoadReporter(directory=directory)
+    reporter.write("room-1")
+    stale = os.path.join(directory, "999999.json")
+    with open(stale, "w") as f:
+        json.dump({"pid": 999999, "lag": 5.0, "pending": 99, "updated": time.time() - 60}, f)
+
+    snapshots = read_snapshots(directory)
+    assert [s["room"] for s in snapshots] == ["room-1"]
+    assert snapshots[0]["pending"] == 0
+    assert not os.path.exists(stale)
+
+    reporter.stop()
+    assert read_snapshots(directory) == []
@@ -0,0 +1,40 @@
+import pytest
+
+from services.event_normalizer import get_zone, iter_normalized_events, parse_event_time
+
+
+def _event(start: dict, end: dict) -> dict:
+    return {"id": "abc", "summary": "Checkup", "attendees": [{"email": "a@example.com"}], "start": start, "end": end}
+
+
+def test_parses_rfc3339_with_z_and_offsets() -> None:
+    assert parse_event_time("2025-10-14T03:30:00Z") == parse_event_time("2025-10-14T09:00:00+05:30")
+
+
+def test_falls_back_to_dateutil_for_non_iso_values() -> None:
+    assert parse_event_time("14 Oct 2025 09:00 +0530").isoformat() == "2025-10-14T09:00:00+05:30"
+
+
+def test_converts_to_requested_zone_with_default_fields() -> None:
+    events = [_event({"dateTime": "2025-10-14T03:30:00Z"}, {"dateTime": "2025-10-14T04:00:00Z"})]
+    (item,) = iter_normalized_events(events, "Asia/Kolkata")
+    assert item["title"] == "Checkup"
+    assert item["start"] == "2025-10-14T09:00:00+05:30"
+    assert item["end"] == "2025-10-14T09:30:00+05:30"
+    assert len(item) == 16
+
+
+def test_projection_and_skipping_incomplete_events() -> None:
+    events = [
+        _event({"dateTime": "2025-10-14T03:30:00Z"}, {"dateTime": "2025-10-14T04:00:00Z"}),
+        _event({"dateTime": "2025-10-14T05:00:00Z"}, {}),
+    ]
+    items = list(iter_normalized_events(events, "UTC", fields=("id", "start")))
+    assert items == [{"id": "abc", "start": "2025-10-14T03:30:00+00:00"}]
+
+    with pytest.raises(ValueError):
+        list(iter_normalized_events(events, "UTC", fields=("nope",)))
+
+
+def test_zone_objects_are_cached() -> None:
+    assert get_zone("Asia/Kolkata") is get_zone("Asia/Kolkata")
@@ -0,0 +1,33 @@
+from db.AppDatabase import AppDatabase
+from services.expert_cache import ExpertCache
+
+
+class CountingDatabase:
+    def __init__(self, db: AppDatabase):
+        self.db = db
+        self.calls = 0
+
+    def get_all_experts(self):
+        self.calls += 1
+        return self.db.get_all_experts()
+
+    def get_expert(self, expert_id: int):
+        return self.db.get_expert(expert_id)
+
+
+def test_experts_are_loaded_once_and_new_ones_fall_through(tmp_path) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    first = db.create_expert("Asha", "Cardiology", "asha@example.com")
+    counting = CountingDatabase(db)
+    experts = ExpertCache(counting, ttl=60)
+
+    assert experts.warm() == 1
+    assert experts.get(first)["name"] == "Asha"
+    assert counting.calls == 1
+
+    second = db.create_expert("Ravi", "Dermatology", "ravi@example.com")
+    assert experts.get(second)["name"] == "Ravi"
+
+    experts.invalidate()
+    assert len(experts.all()) == 2
+    assert counting.calls == 2
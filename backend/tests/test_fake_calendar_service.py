@@ -0,0 +1,42 @@
+import datetime
+
+import pytest
+
+from services.calendar_resilience import CalendarUnavailableError
+from services.fake_calendar_service import FakeCalendarError
+
+
+def _slot(days: int) -> tuple[str, str]:
+    start = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=days)
+    return start.isoformat(), (start + datetime.timedelta(minutes=30)).isoformat()
+
+
+def test_events_are_partitioned_and_ordered_by_user(fake_calendar) -> None:
+    calendar = fake_calendar()
+    later, sooner = _slot(3), _slot(1)
+    calendar.create_meeting("Later", *later, ["a@example.com"], "Asia/Kolkata", user_id=1)
+    calendar.create_meeting("Sooner", *sooner, ["a@example.com"], "Asia/Kolkata", user_id=1)
+    calendar.create_meeting("Other", *sooner, ["b@example.com"], "Asia/Kolkata", user_id=2)
+
+    events = calendar.list_meetings(user_id=1)
+    assert [e["summary"] for e in events] == ["Sooner", "Later"]
+    assert events[0]["attendees"] == [{"email": "a@example.com", "responseStatus": "needsAction"}]
+
+
+def test_cancel_and_reschedule_follow_google_semantics(fake_calendar) -> None:
+    calendar = fake_calendar()
+    event_id, _ = calendar.create_meeting("Checkup", *_slot(1), [], "UTC")
+    new_start, new_end = _slot(2)
+    calendar.reschedule_meeting(event_id, new_start, new_end)
+    assert calendar.list_meetings()[0]["sequence"] == 1
+
+    calendar.cancel_meeting(event_id)
+    assert calendar.list_meetings() == []
+    with pytest.raises(FakeCalendarError):
+        calendar.cancel_meeting(event_id)
+
+
+def test_injected_errors_surface_as_unavailable(fake_calendar) -> None:
+    calendar = fake_calendar(error_rate=1.0, error_statuses=[503])
+    with pytest.raises(CalendarUnavailableError):
+        calendar.list_meetings()
@@ -0,0 +1,60 @@
+from services.instructions import InstructionBuilder
+from services.token_count import count_tokens, truncate_tokens
+
+PERSONA = """You are a friendly scheduling assistant.
+            Speak plainly and ask one question at a time."""
+
+
+def test_sections_render_in_order_with_datetime_last() -> None:
+    builder = InstructionBuilder(PERSONA, budget_tokens=500)
+    builder.set_section("datetime", "The current date and time is Monday.")
+    builder.set_section("profile", "You are assisting Asha.")
+    prompt = builder.build()
+
+    assert prompt.startswith("You are a friendly scheduling assistant.\nSpeak plainly")
+    assert prompt.endswith("The current date and time is Monday.")
+    assert prompt.index("Asha") < prompt.index("Monday")
+
+
+def test_re_entry_replaces_sections_instead_of_appending() -> None:
+    builder = InstructionBuilder(PERSONA, budget_tokens=500)
+    assert builder.set_section("profile", "You are assisting Asha.")
+    first = builder.build()
+    assert not builder.set_section("profile", "You are assisting Asha.")
+    assert builder.build() == first
+    assert builder.build().count("Asha") == 1
+
+
+def test_memory_is_truncated_from_the_front_to_fit_the_budget() -> None:
+    transcript = "\n".join(f"user: message number {i}" for i in range(400))
+    builder = InstructionBuilder(PERSONA, budget_tokens=200, section_budgets={"memory": 1000})
+    builder.set_section("memory", transcript)
+    prompt = builder.build()
+
+    counts = builder.token_counts()
+    assert counts["total"] <= 200
+    assert "message number 399" in prompt
+    assert "message number 0\n" not in prompt
+    assert count_tokens(prompt) <= 205
+
+
+def test_truncated_memory_keeps_its_framing_and_whole_lines() -> None:
+    transcript = "\n".join(f"{'user' if i % 2 else 'assistant'}: I would like to book slot number {i}"
+                           for i in range(100))
+    builder = InstructionBuilder(PERSONA, budget_tokens=2000, section_budgets={"memory": 60})
+    builder.set_section("memory", transcript)
+    memory = builder.build().split("\n\n")[1]
+
+    header, *lines = memory.splitlines()
+    assert header == "Here is the last conversation for context:"
+    assert lines[0].startswith("Pick only the key terms")
+    assert lines[-1].endswith("slot number 99")
+    assert all(line in transcript.splitlines() for line in lines[1:])
+    assert count_tokens("\n".join(lines[1:])) <= 60
+
+
+def test_truncate_tokens_keeps_requested_end() -> None:
+    text = "one two three four five six seven eight nine ten " * 20
+    assert count_tokens(truncate_tokens(text, 10)) <= 10
+    assert truncate_tokens(text, 10, keep="tail").strip().endswith("ten")
+    assert truncate_tokens("short", 10) == "short"
@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import json
+import types
+import urllib.request
+
+from db.AppDatabase import AppDatabase
+from services.latency import (
+    DB_LATENCY,
+    PIPELINE_LATENCY,
+    SessionLatency,
+    TimedProxy,
+    bind_session,
+    record_pipeline_metrics,
+    timed_tool,
+)
+from services.metrics import MetricsRegistry, start_metrics_server, summarize
+
+
+def test_summarize_uses_nearest_rank_quantiles() -> None:
+    summary = summarize(i / 100 for i in range(100))
+    assert summary["count"] == 100
+    assert (summary["p50"], summary["p95"], summary["p99"], summary["max"]) == (0.49, 0.94, 0.98, 0.99)
+
+
+def test_timings_are_attributed_to_the_bound_session(tmp_path) -> None:
+    def run() -> SessionLatency:
+        session_latency = SessionLatency()
+        bind_session(session_latency)
+        db = TimedProxy(AppDatabase(str(tmp_path / "app.db")), DB_LATENCY, "db")
+
+        @timed_tool
+        async def lookup(expert_id: int) -> str:
+            # Threads started from the session's context inherit the binding.
+            await asyncio.to_thread(db.get_expert, expert_id)
+            return "ok"
+
+        asyncio.run(lookup(1))
+        record_pipeline_metrics(types.SimpleNamespace(type="llm_metrics", ttft=0.4, duration=1.2))
+        record_pipeline_metrics(types.SimpleNamespace(type="tts_metrics", ttfb=-1))
+        return session_latency
+
+    summary = contextvars.copy_context().run(run).summary()
+    assert set(summary) == {"tool.lookup", "db.get_expert", "pipeline.llm_ttft", "pipeline.llm_duration"}
+    assert summary["pipeline.llm_ttft"]["p99"] == 0.4
+    assert PIPELINE_LATENCY.summary(stage="llm_ttft")["count"] >= 1
+
+
+def test_session_metrics_round_trip(tmp_path) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    latency = SessionLatency()
+    for seconds in (0.1, 0.2, 0.3):
+        latency.add("tool.schedule_meeting", seconds)
+
+    assert db.save_session_metrics("guid-1", None, latency.summary()) == 1
+    [row] = db.get_session_metrics("guid-1")
+    assert (row["metric"], row["count"], row["p50"], row["max"]) == ("tool.schedule_meeting", 3, 0.2, 0.3)
+
+
+def test_metrics_server_exposes_histograms() -> None:
+    metrics = MetricsRegistry()
+    metrics.histogram("tool_seconds", "Tool latency.").observe(0.25, tool="lookup")
+    server = start_metrics_server(0, metrics=metrics)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        text = urllib.request.urlopen(f"{base}/metrics").read().decode()
+        assert 'tool_seconds{quantile="0.95",tool="lookup"} 0.25' in text
+        assert "tool_seconds_count{tool=\"lookup\"} 1" in text
+        snapshot = json.loads(urllib.request.urlopen(f"{base}/metrics.json").read())
+        assert snapshot["tool_seconds"]['{tool="lookup"}']["p50"] == 0.25
+    finally:
+        server.shutdown()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+
+from services.loop_monitor import LoopMonitor, set_tags, update_tags
+
+
+def blocking_lookup() -> None:
+    time.sleep(0.3)
+
+
+async def schedule_meeting() -> None:
+    await asyncio.sleep(0)
+    blocking_lookup()
+
+
+def test_stall_is_caught_with_stack_and_tags() -> None:
+    monitor = LoopMonitor(threshold=0.1, interval=0.02, roots=(os.path.dirname(__file__),))
+
+    async def scenario():
+        monitor.start()
+        set_tags(room="room-1")
+        update_tags(session="guid-1")
+        await asyncio.sleep(0.1)
+        await asyncio.create_task(schedule_meeting(), name="tool-call")
+        await asyncio.sleep(0.1)
+        monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert len(monitor.events) == 1
+    event = monitor.events[0]
+    assert event.call_site == "test_loop_monitor.py:schedule_meeting > test_loop_monitor.py:blocking_lookup"
+    assert event.task == "tool-call"
+    assert event.tags == {"room": "room-1", "session": "guid-1"}
+    assert event.duration >= 0.2
+    assert any("time.sleep(0.3)" in line for line in event.stack)
+    assert monitor.report()[0]["count"] == 1
+
+
+def test_quiet_loop_reports_nothing() -> None:
+    monitor = LoopMonitor(threshold=0.1, interval=0.02)
+
+    async def scenario():
+        monitor.start()
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor.report() == []
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services.participants import ParticipantRegistry, UserProfileCache
+
+
+class CountingDB:
+    def __init__(self):
+        self.lookups = 0
+
+    def get_user_by_email(self, email):
+        self.lookups += 1
+        return 7 if email.lower() == "asha@example.com" else None
+
+    def get_transcription(self, user_id):
+        return "user: book a checkup"
+
+
+def test_setup_runs_once_for_concurrent_and_later_tracks() -> None:
+    registry = ParticipantRegistry()
+    runs = []
+
+    async def init():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "ready"
+
+    async def scenario():
+        key = ("asha@example.com", "guid-1")
+        first = await asyncio.gather(*(registry.ensure(key, init) for _ in range(3)))
+        later = await registry.ensure(key, init)
+        other = await registry.ensure(("asha@example.com", "guid-2"), init)
+        return first, later, other
+
+    first, later, other = asyncio.run(scenario())
+    assert first == ["ready"] * 3 and later == "ready" and other == "ready"
+    assert len(runs) == 2
+
+
+def test_failed_setup_is_retried_by_the_next_track() -> None:
+    registry = ParticipantRegistry()
+    attempts = []
+
+    async def init():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("db down")
+        return "ready"
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await registry.ensure("p", init)
+        return await registry.ensure("p", init)
+
+    assert asyncio.run(scenario()) == "ready"
+    assert len(attempts) == 2
+
+
+def test_profiles_are_cached_but_unknown_users_are_not() -> None:
+    db = CountingDB()
+    profiles = UserProfileCache(db, ttl=60)
+
+    first = profiles.get("Asha@example.com")
+    again = profiles.get("asha@example.com")
+    assert first == again and first.user_id == 7 and first.last_conversation == "user: book a checkup"
+    assert db.lookups == 1
+
+    assert profiles.get("new@example.com") is None
+    assert profiles.get("new@example.com") is None
+    assert db.lookups == 3
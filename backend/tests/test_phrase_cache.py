@@ -0,0 +1,81 @@
+import asyncio
+
+from livekit import rtc
+
+from services.phrase_cache import PHRASES as DEFAULT_PHRASES
+from services.phrase_cache import PhraseCache, named_greeting, speaks_filler
+
+PHRASES = {"greeting": "Hi, welcome back.", "filler_moment": "One moment, please."}
+
+
+class FakeTTS:
+    def __init__(self):
+        self.requests = []
+
+    async def _stream(self, text):
+        for _ in range(3):
+            yield type("Ev", (), {"frame": rtc.AudioFrame(b"\x01\x00" * 480, 24000, 1, 480)})()
+
+    def synthesize(self, text):
+        self.requests.append(text)
+        return self._stream(text)
+
+
+class FakeSession:
+    def __init__(self):
+        self.said = []
+
+    def say(self, text, audio=None, add_to_chat_ctx=True):
+        self.said.append((text, audio is not None, add_to_chat_ctx))
+
+
+def test_rendered_clips_survive_a_restart(tmp_path) -> None:
+    tts = FakeTTS()
+    cache = PhraseCache("azure-en-IN-AartiNeural", directory=str(tmp_path), phrases=PHRASES)
+    assert cache.load() == 0
+    assert asyncio.run(cache.render(tts)) == 2
+    assert asyncio.run(cache.render(tts)) == 0
+    assert len(tts.requests) == 2
+
+    reloaded = PhraseCache("azure-en-IN-AartiNeural", directory=str(tmp_path), phrases=PHRASES)
+    assert reloaded.load() == 2
+    clip = reloaded.get("greeting")
+    assert clip.sample_rate == 24000 and abs(clip.duration - 0.06) < 1e-9
+
+    async def collect():
+        return [frame async for frame in clip.frames(frame_ms=20)]
+
+    assert [f.samples_per_channel for f in asyncio.run(collect())] == [480, 480, 480]
+
+    # A different voice or edited text is a cache miss.
+    other = PhraseCache("cartesia-default", directory=str(tmp_path), phrases=PHRASES)
+    assert other.load() == 0
+    edited = PhraseCache("azure-en-IN-AartiNeural", directory=str(tmp_path),
+                         phrases={**PHRASES, "greeting": "Hello again."})
+    assert edited.load() == 1 and edited.missing() == ["greeting"]
+
+
+def test_filler_plays_only_for_slow_tools(tmp_path) -> None:
+    cache = PhraseCache("v", directory=str(tmp_path), phrases=PHRASES)
+    asyncio.run(cache.render(FakeTTS()))
+
+    class Agent:
+        phrases = cache
+        agent_session = FakeSession()
+
+    @speaks_filler(threshold=0.05)
+    async def tool(agent, seconds):
+        await asyncio.sleep(seconds)
+        return "done"
+
+    agent = Agent()
+    assert asyncio.run(tool(agent, 0)) == "done"
+    assert agent.agent_session.said == []
+    assert asyncio.run(tool(agent, 0.2)) == "done"
+    assert agent.agent_session.said == [("One moment, please.", True, False)]
+
+
+def test_only_known_callers_are_welcomed_back_by_name() -> None:
+    assert named_greeting("Arun Kumar").startswith("Hi Arun, welcome back.")
+    assert named_greeting("") is None and named_greeting(None) is None
+    assert "welcome back" not in DEFAULT_PHRASES["greeting"].lower()
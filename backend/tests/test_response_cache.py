@@ -0,0 +1,38 @@
+from services.response_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_hit_until_they_expire() -> None:
+    clock = Clock()
+    cache = TTLCache("test", ttl=30, clock=clock)
+    cache.set((1, "a"), "events")
+
+    clock.now = 29.9
+    assert cache.get((1, "a")) == "events"
+    clock.now = 30.0
+    assert cache.get((1, "a")) is None
+    assert len(cache) == 0
+
+    cache.set((1, "b"), "short", ttl=5)
+    cache.set((2, "b"), "other user")
+    assert cache.invalidate_prefix(1) == 1
+    assert cache.get((2, "b")) == "other user"
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = TTLCache("test", ttl=60, max_entries=2, clock=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from db.AppDatabase import AppDatabase
+from services.session_checkpoint import (
+    SessionCheckpointer,
+    capture,
+    record_tool_call,
+    restore,
+    resume_section,
+)
+
+
+def _userdata(**values):
+    fields = {"user_id": None, "user_name": None, "user_email": None, "user_age": None, "user_gender": None,
+              "last_conversation_for_reference": None, "greeted": False, "booking_intent": None, "tool_calls": []}
+    fields.update(values)
+    return SimpleNamespace(**fields)
+
+
+def test_rejoin_restores_state_without_lookups(tmp_path) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    before = _userdata(user_id=7, user_name="Asha", user_email="asha@example.com", greeted=True,
+                       booking_intent={"expert": "Dr. Rao", "start_time": "2025-10-14T09:00:00+05:30"})
+    for _ in range(25):
+        record_tool_call(before.tool_calls, "fetch_experts", '{"user_requirement": "heart"}', "x" * 500)
+    sections = {"profile": "You are assisting Asha.", "memory": "user: book a checkup",
+                "datetime": "The current date is...", "resume": "old"}
+
+    async def scenario():
+        saved = await SessionCheckpointer(db, "guid-1").save(lambda: capture(before, sections))
+        state = await SessionCheckpointer(db, "guid-1").load()
+        stale = await SessionCheckpointer(db, "guid-1", ttl=-1).load()
+        missing = await SessionCheckpointer(db, "guid-2").load()
+        return saved, state, stale, missing
+
+    saved, state, stale, missing = asyncio.run(scenario())
+    assert saved and stale is None and missing is None
+
+    after = _userdata(user_name="Asha", user_email="asha@example.com")
+    restored_sections = restore(after, state)
+    assert restored_sections == {"profile": "You are assisting Asha.", "memory": "user: book a checkup"}
+    assert after.user_id == 7 and after.greeted is True
+    assert after.booking_intent["expert"] == "Dr. Rao"
+    assert len(after.tool_calls) == 20 and len(after.tool_calls[0]["output"]) == 200
+
+    text = resume_section(state)
+    assert "do not greet" in text
+    assert "fetch_experts(" in text
+    assert "not confirmed yet: expert Dr. Rao, start_time 2025-10-14T09:00:00+05:30" in text
+
+
+def test_checkpoints_replace_and_prune(tmp_path) -> None:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    db.save_session_checkpoint("guid-1", 7, {"version": 1, "userdata": {"greeted": False}})
+    db.save_session_checkpoint("guid-1", 7, {"version": 1, "userdata": {"greeted": True}})
+    assert db.get_session_checkpoint("guid-1", 60)["userdata"]["greeted"] is True
+    assert db.prune_session_checkpoints(60) == 0
+    assert db.prune_session_checkpoints(-1) == 1
+    assert db.get_session_checkpoint("guid-1", 60) is None
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+
+from db.AppDatabase import AppDatabase
+from services.expert_cache import ExpertCache
+from services.session_prefetch import SessionPrefetcher
+from services.task_supervisor import TaskSupervisor
+
+
+class CountingCalendar:
+    def __init__(self):
+        self.calls = 0
+
+    def list_meetings(self, max_results: int = 10, user_id=None, time_min=None, time_max=None):
+        self.calls += 1
+        return [{"id": f"evt{i}", "summary": f"Sync {i}"} for i in range(max_results)]
+
+
+def _prefetcher(tmp_path, tasks=None):
+    db = AppDatabase(str(tmp_path / "app.db"))
+    expert_id = db.create_expert("Dr. Rao", "Cardiology", "rao@example.com")
+    start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=7)
+    for i in range(2):
+        db.create_appointment(
+            event_id=f"appt{i}", user_id=1, expert_id=expert_id, title="Checkup",
+            start_time=(start + datetime.timedelta(days=i)).isoformat(),
+            end_time=(start + datetime.timedelta(days=i, minutes=30)).isoformat(),
+        )
+    calendar = CountingCalendar()
+    return SessionPrefetcher(db, calendar, ExpertCache(db, ttl=60), ttl=60, tasks=tasks), calendar, expert_id
+
+
+def test_tools_are_answered_from_the_prefetch(tmp_path) -> None:
+    prefetch, calendar, expert_id = _prefetcher(tmp_path)
+
+    async def scenario():
+        prefetch.start(1)
+        prefetch.start(1)
+        meetings = await prefetch.upcoming_meetings(5)
+        appointments = await prefetch.get("appointments")
+        usual = await prefetch.get("usual_slots", wait=5)
+        again = await prefetch.upcoming_meetings(10)
+        too_many = await prefetch.upcoming_meetings(50)
+        prefetch.close()
+        return meetings, appointments, usual, again, too_many
+
+    meetings, appointments, usual, again, too_many = asyncio.run(scenario())
+
+    assert [m["id"] for m in meetings] == ["evt0", "evt1", "evt2", "evt3", "evt4"]
+    assert len(again) == 10
+    assert too_many is None
+    assert calendar.calls == 1
+    assert [a["event_id"] for a in appointments] == ["appt1", "appt0"]
+    assert usual["expert_id"] == expert_id
+
+
+def test_invalidated_values_are_not_served(tmp_path) -> None:
+    prefetch, _, expert_id = _prefetcher(tmp_path)
+
+    async def scenario():
+        prefetch.start(1)
+        await prefetch.get("usual_slots", wait=5)
+        origin = datetime.datetime.now(datetime.timezone.utc)
+        later = origin + datetime.timedelta(days=3)
+        asap = await prefetch.usual_slots(expert_id, origin - datetime.timedelta(minutes=5), 30, 3)
+        future = await prefetch.usual_slots(expert_id, later, 30, 3)
+        prefetch.invalidate("meetings", "usual_slots")
+        return asap, future, await prefetch.upcoming_meetings(5), await prefetch.usual_slots(expert_id, origin, 30, 3)
+
+    asap, future, meetings, slots = asyncio.run(scenario())
+
+    assert asap is not None
+    assert future is None
+    assert meetings is None and slots is None
+
+
+def test_loads_run_under_the_session_supervisor(tmp_path) -> None:
+    async def scenario():
+        tasks = TaskSupervisor("room", max_tasks=2)
+        prefetch, _, _ = _prefetcher(tmp_path, tasks)
+        prefetch.start(1)
+        names = sorted(task.get_name() for task in tasks._tasks)
+        await tasks.aclose()
+        # Loads over the bound were dropped; get() falls back to a live lookup
+        return names, tasks.counts(), await prefetch.get("experts", wait=0.1)
+
+    names, counts, experts = asyncio.run(scenario())
+
+    assert names == ["room:prefetch-appointments", "room:prefetch-meetings"]
+    assert counts["rejected"] == 2 and counts["live"] == 0 and counts["leaked"] == 0
+    assert experts is None
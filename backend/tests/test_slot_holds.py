@@ -0,0 +1,69 @@
+import asyncio
+import datetime
+
+import pytz
+
+from db.AppDatabase import AppDatabase
+from services.slot_holds import SlotHolds
+
+IST = pytz.timezone("Asia/Kolkata")
+START = IST.localize(datetime.datetime.combine(datetime.date.today() + datetime.timedelta(days=1),
+                                               datetime.time(10))).astimezone(pytz.UTC)
+
+
+def _slots(count: int) -> list:
+    return [(START + datetime.timedelta(minutes=30 * i), START + datetime.timedelta(minutes=30 * (i + 1)))
+            for i in range(count)]
+
+
+def _db(tmp_path) -> tuple:
+    db = AppDatabase(str(tmp_path / "app.db"))
+    expert_id = db.create_expert("Dr. Asha Rao", "Cardiology", "asha@example.com")
+    with db._connect() as conn:
+        conn.execute(
+            "INSERT INTO expert_availability (expert_id, start_time, end_time, recurring_type) "
+            "VALUES (?, '00:00:00', '23:59:00', 'daily')",
+            (expert_id,),
+        )
+    return db, expert_id
+
+
+def test_offered_slots_are_held_from_other_calls(tmp_path) -> None:
+    db, expert_id = _db(tmp_path)
+    first, second = SlotHolds(db, "room-a", ttl=60), SlotHolds(db, "room-b", ttl=60)
+    slots = _slots(3)
+
+    async def scenario():
+        held_a = await first.hold([(expert_id, s, e) for s, e in slots[:2]])
+        held_b = await second.hold([(expert_id, s, e) for s, e in slots])
+        return held_a, held_b
+
+    held_a, held_b = asyncio.run(scenario())
+    assert len(held_a) == 2
+    assert [(s, e) for _, s, e in held_b] == slots[2:]
+
+    start, end = slots[0]
+    assert db.has_conflict(expert_id, start, end, "room-b")
+    assert not db.has_conflict(expert_id, start, end, "room-a")
+    # Another call's search skips the held slots; the holder still sees them
+    assert db.suggest_next_available_slots(expert_id, START, 30, limit=1, holder="room-b")[0][0] == slots[2][0]
+    assert db.suggest_next_available_slots(expert_id, START, 30, limit=1, holder="room-a")[0][0] == START
+
+    assert asyncio.run(first.release()) == 2
+    assert not db.has_conflict(expert_id, start, end, "room-b")
+
+
+def test_new_offer_replaces_old_holds_and_expired_holds_lapse(tmp_path) -> None:
+    db, expert_id = _db(tmp_path)
+    slots = _slots(4)
+    caller = SlotHolds(db, "room-a", ttl=60)
+
+    asyncio.run(caller.hold([(expert_id, s, e) for s, e in slots[:2]]))
+    asyncio.run(caller.hold([(expert_id, s, e) for s, e in slots[2:]]))
+    assert not db.has_conflict(expert_id, *slots[0], "room-b")
+    assert db.has_conflict(expert_id, *slots[2], "room-b")
+
+    expired = SlotHolds(db, "room-c", ttl=-1)
+    asyncio.run(expired.hold([(expert_id, *slots[0])]))
+    assert not db.has_conflict(expert_id, *slots[0], "room-b")
+    assert db.prune_slot_holds() == 1
@@ -0,0 +1,50 @@
+import datetime
+
+from services.speech_text import SpeechChunker, normalize_for_speech, speak_datetime
+
+
+def _stream(text: str, size: int) -> list:
+    chunker = SpeechChunker()
+    out = []
+    for i in range(0, len(text), size):
+        out.extend(chunker.push(text[i:i + size]))
+    tail = chunker.flush()
+    return out + ([tail] if tail else [])
+
+
+def test_markdown_emoji_and_urls_are_made_speakable() -> None:
+    text = normalize_for_speech(
+        "✅ Meeting **cancelled**. Invite sent to john_doe@example.com, see "
+        "https://www.google.com/calendar/event?eid=x. _Thanks_ [here](https://x.io)"
+    )
+    assert text == (
+        "Meeting cancelled. Invite sent to john_doe@example.com, see "
+        "a link on google.com. Thanks here"
+    )
+    assert "*" not in text and "✅" not in text and "john_doe" in text
+
+
+def test_iso_timestamps_are_spoken() -> None:
+    today = datetime.date(2025, 1, 1)
+    assert speak_datetime("2025-10-14T09:30:00+05:30", today) == "Tuesday, October 14 at 9:30 AM"
+    assert speak_datetime("2025-10-14T15:00:00Z", today) == "Tuesday, October 14 at 3 PM"
+    assert speak_datetime("2026-01-02", today) == "Friday, January 2, 2026"
+    assert speak_datetime("2025-13-40", today) is None
+
+
+def test_chunks_end_on_boundaries_even_with_tokens_split_across_deltas() -> None:
+    text = ("Sure! I found **two** meetings with Dr. Rao: the first one, *Sync*, starts at "
+            "2025-10-14T09:00:00+05:30, and the second is later. Cancel either?")
+    for size in (1, 3, 7):
+        chunks = _stream(text, size)
+        assert chunks[0] == "Sure! "
+        assert chunks[1].startswith("I found two meetings with Dr. Rao")
+        assert "".join(chunks) == normalize_for_speech(text)
+        assert all("*" not in c and "T09" not in c for c in chunks)
+
+
+def test_long_text_without_punctuation_is_cut_at_whitespace() -> None:
+    chunks = _stream("word " * 100, 5)
+    assert len(chunks) > 1
+    assert all(len(c) <= 241 for c in chunks)
+    assert "".join(chunks) == "word " * 100
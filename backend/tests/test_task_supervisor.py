@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+
+from services.task_supervisor import TaskSupervisor
+
+
+def test_tasks_are_tracked_bounded_and_counted() -> None:
+    tasks = TaskSupervisor("room-1", max_tasks=2)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        done = tasks.spawn(asyncio.sleep(0), "quick")
+        failed = tasks.spawn(fail(), "fail")
+        assert tasks.spawn(asyncio.sleep(0), "third") is None
+        assert failed.get_name() == "room-1:fail"
+        await asyncio.wait({done, failed})
+        await asyncio.sleep(0)
+        return tasks.counts()
+
+    counts = asyncio.run(scenario())
+    assert counts == {"live": 0, "completed": 1, "failed": 1, "cancelled": 0, "rejected": 1, "leaked": 0}
+
+
+def test_close_cancels_running_work_and_reports_leaks() -> None:
+    tasks = TaskSupervisor("room-1")
+
+    async def stubborn():
+        for _ in range(2):
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.sleep(10)
+
+    async def scenario():
+        tasks.spawn(asyncio.sleep(10), "greeting")
+        tasks.spawn(stubborn(), "stubborn")
+        await asyncio.sleep(0)
+        leaked = await tasks.aclose(timeout=0.05)
+        assert tasks.spawn(asyncio.sleep(0), "late") is None
+        return leaked
+
+    leaked = asyncio.run(scenario())
+    assert leaked == ["room-1:stubborn"]
+    counts = tasks.counts()
+    assert counts["live"] == 0 and counts["cancelled"] == 1 and counts["leaked"] == 1
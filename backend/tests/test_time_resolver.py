@@ -0,0 +1,70 @@
+import datetime
+
+import pytest
+import pytz
+from livekit.agents.llm import ToolError
+
+from services.time_resolver import parse, parse_when, resolve, resolve_when
+
+TZ = pytz.timezone("Asia/Kolkata")
+NOW = TZ.localize(datetime.datetime(2025, 10, 16, 10, 20))  # a Thursday morning
+
+
+def _span(expression: str):
+    window = resolve(expression, now=NOW)
+    return window.start.strftime("%a %d %H:%M"), window.end.strftime("%a %d %H:%M"), window.exact
+
+
+def test_relative_and_fuzzy_expressions_become_windows() -> None:
+    assert _span("next Tuesday afternoon") == ("Tue 21 12:00", "Tue 21 17:00", False)
+    assert _span("tomorrow at 3") == ("Fri 17 15:00", "Fri 17 15:30", True)
+    assert _span("can we do sometime next wednesday around 11") == ("Wed 22 11:00", "Wed 22 11:30", True)
+    assert _span("between 2 and 4 pm tomorrow") == ("Fri 17 14:00", "Fri 17 16:00", False)
+    assert _span("book it for 5.30 p.m. the day after tomorrow") == ("Sat 18 17:30", "Sat 18 18:00", True)
+    assert _span("next week") == ("Mon 20 09:00", "Fri 24 18:00", False)
+    assert _span("in 2 hours") == ("Thu 16 12:20", "Thu 16 12:50", True)
+    assert _span("October 21st at half past ten") == ("Tue 21 10:30", "Tue 21 11:00", True)
+    assert _span("14/11") == ("Fri 14 09:00", "Fri 14 18:00", False)
+
+
+def test_times_already_gone_today_move_or_are_flagged() -> None:
+    assert _span("at 9") == ("Fri 17 09:00", "Fri 17 09:30", True)
+    # the morning has started: the window starts at the next quarter hour
+    assert _span("this morning") == ("Thu 16 10:30", "Thu 16 12:00", False)
+    assert resolve("today at 8 am", now=NOW).past
+
+
+def test_non_times_and_iso_values() -> None:
+    assert resolve("I want an appointment", now=NOW) is None
+    assert resolve("at an hour that works", now=NOW) is None
+    window = resolve_when("2025-10-21T15:00:00", "Asia/Kolkata")
+    assert window.exact and window.start.isoformat() == "2025-10-21T15:00:00+05:30"
+    assert parse_when("next tuesday afternoon", now=NOW).isoformat() == "2025-10-21T12:00:00+05:30"
+    # The message has to reach the LLM, which only sees ToolError messages
+    with pytest.raises(ToolError, match="Ask the user"):
+        parse_when("whenever suits", now=NOW)
+
+
+def test_part_of_day_and_weekends_pick_the_right_hours_and_days() -> None:
+    assert _span("tomorrow morning at 7") == ("Fri 17 07:00", "Fri 17 07:30", True)
+    assert _span("tomorrow evening at 7") == ("Fri 17 19:00", "Fri 17 19:30", True)
+    assert _span("tomorrow at 7") == ("Fri 17 19:00", "Fri 17 19:30", True)
+    saturday = NOW + datetime.timedelta(days=2)
+    window = resolve("sometime this week", now=saturday)
+    assert not window.past and window.start < window.end
+    assert window.start.strftime("%a %d %H:%M") == "Mon 20 09:00"
+
+
+def test_iso_date_without_time_is_a_day_not_midnight() -> None:
+    window = resolve_when("2025-10-21", "Asia/Kolkata", now=NOW)
+    assert not window.exact and not window.past
+    assert (window.start.hour, window.end.hour) == (9, 18)
+    assert resolve_when("2025-10-01", "Asia/Kolkata", now=NOW).past
+
+
+def test_parses_are_cached_independently_of_now() -> None:
+    parse.cache_clear()
+    later = NOW + datetime.timedelta(days=7)
+    assert resolve("tomorrow at 3", now=NOW).start.day == 17
+    assert resolve("Tomorrow at 3!", now=later).start.day == 24
+    assert parse.cache_info().hits == 1
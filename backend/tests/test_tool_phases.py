@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from services.tool_phases import PHASE_TOOLS, ToolPhases
+
+NAMES = sorted({name for names in PHASE_TOOLS.values() for name in names} | {"lookup_weather", "get_current_date"})
+
+
+def _phases(**kwargs) -> ToolPhases:
+    return ToolPhases([SimpleNamespace(id=name) for name in NAMES], **kwargs)
+
+
+def test_phase_follows_the_caller_and_the_tools() -> None:
+    phases = _phases(enabled=True)
+    first = phases.take_update()
+    assert [tool.id for tool in first] == list(PHASE_TOOLS["identify"])
+    assert "lookup_weather" not in phases.names()
+    assert phases.take_update() is None
+
+    assert phases.on_user_turn("I need to see a cardiologist")
+    assert phases.phase == "browse"
+    # No clear signal keeps the current tools
+    assert not phases.on_user_turn("hmm, let me think")
+    assert phases.take_update() is not None and phases.take_update() is None
+
+    intent = {"expert_id": 1}
+    phases.after_tool("suggest_slots_for_expert", intent)
+    assert phases.phase == "slot"
+    assert phases.on_user_turn("the second one works", intent) is False
+    assert "schedule_meeting" in phases.names()
+
+    phases.after_tool("schedule_meeting", None)
+    assert phases.phase == "identify"
+    assert phases.on_user_turn("actually, cancel my appointment on friday")
+    assert phases.phase == "manage" and "cancel_meeting" in phases.names()
+
+
+def test_disabled_offers_every_tool() -> None:
+    phases = _phases(enabled=False)
+    phases.on_user_turn("cancel my meeting")
+    assert phases.names() == NAMES
+    assert len(phases.take_update()) == len(NAMES)
@@ -0,0 +1,73 @@
+import asyncio
+
+from services.token_count import count_tokens
+from services.tool_results import (
+    EXPERTS,
+    MEETINGS,
+    ToolOutputBudget,
+    shape_result,
+    shaped_result,
+)
+
+
+def _meetings(count: int) -> list:
+    return [
+        {"id": f"evt{i}", "summary": f"Sync {i}", "start": "2025-10-14T09:00:00+05:30",
+         "end": "2025-10-14T09:30:00+05:30", "htmlLink": "https://calendar.google.com/event?eid=xyz"}
+        for i in range(count)
+    ]
+
+
+def test_rows_render_as_a_terse_table_with_more_hint() -> None:
+    text = shape_result(_meetings(12), MEETINGS, max_tokens=1000)
+    lines = text.splitlines()
+
+    assert lines[0] == "meetings: id|title|start|end"
+    assert lines[1] == "evt0|Sync 0|2025-10-14 09:00+05:30|2025-10-14 09:30+05:30"
+    assert lines[-1].startswith("+2 more meetings")
+    assert "htmlLink" not in text and "calendar.google.com" not in text
+
+
+def test_message_and_rows_share_the_token_cap() -> None:
+    result = {"message": "I found 40 meetings. Which one?", "meetings": _meetings(40)}
+    text = shape_result(result, MEETINGS, max_tokens=80)
+
+    assert text.startswith("I found 40 meetings.")
+    assert "more meetings" in text
+    assert count_tokens(text) <= 100
+
+
+def test_per_turn_budget_shrinks_later_results() -> None:
+    class Agent:
+        tool_budget = ToolOutputBudget(max_tokens=120)
+
+    @shaped_result(EXPERTS)
+    async def fetch_experts(agent):
+        return [{"id": i, "name": f"Expert {i}", "specialty": "Cardiology", "email": f"e{i}@x.com"} for i in range(15)]
+
+    agent = Agent()
+    first = asyncio.run(fetch_experts(agent))
+    second = asyncio.run(fetch_experts(agent))
+
+    assert "email" not in first
+    assert len(second) < len(first)
+    assert "more experts" in second
+    agent.tool_budget.reset()
+    assert asyncio.run(fetch_experts(agent)) == first
+
+
+def test_string_answers_are_never_cut_by_the_budget() -> None:
+    class Agent:
+        tool_budget = ToolOutputBudget(max_tokens=50)
+
+    options = "\n".join(f"- Option {i}: Dr. Rao, Tuesday 21 October from 10:{i}0 AM" for i in range(6))
+    answer = f"Here are the options:\n{options}\nAsk the user which one they want, then book it."
+
+    @shaped_result()
+    async def find_and_book(agent):
+        return answer
+
+    agent = Agent()
+    assert asyncio.run(find_and_book(agent)) == answer
+    assert asyncio.run(find_and_book(agent)) == answer
+    assert agent.tool_budget.remaining() == 0
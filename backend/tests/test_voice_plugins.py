@@ -0,0 +1,65 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from services import voice_plugins
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "startup_profile.py")
+spec = importlib.util.spec_from_file_location("startup_profile", SCRIPT)
+startup_profile = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(startup_profile)
+
+
+@pytest.fixture
+def imports(monkeypatch):
+    """Record plugin imports instead of loading the real LiveKit plugins."""
+    loaded = []
+
+    class TTS:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+    def import_module(name):
+        loaded.append(name)
+        return SimpleNamespace(TTS=TTS)
+
+    for var in ("AGENT_LLM_PROVIDER", "AGENT_STT_PROVIDER", "AGENT_TTS_PROVIDER", "CARTESIA_VOICE"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(voice_plugins.importlib, "import_module", import_module)
+    return loaded
+
+
+def test_providers_follow_the_environment(imports, monkeypatch) -> None:
+    assert voice_plugins.configured_plugins() == ["openai", "azure", "silero", "noise_cancellation"]
+
+    monkeypatch.setenv("AGENT_STT_PROVIDER", " Deepgram ")
+    monkeypatch.setenv("AGENT_TTS_PROVIDER", "cartesia")
+    assert voice_plugins.configured_plugins() == ["openai", "deepgram", "cartesia", "silero", "noise_cancellation"]
+    assert voice_plugins.tts_voice() == "cartesia-default"
+
+    monkeypatch.setenv("AGENT_LLM_PROVIDER", "gemini")
+    with pytest.raises(ValueError, match="AGENT_LLM_PROVIDER"):
+        voice_plugins.configured_plugins()
+    assert imports == []
+
+
+def test_only_the_configured_plugin_is_imported(imports, monkeypatch) -> None:
+    monkeypatch.setenv("AGENT_TTS_PROVIDER", "cartesia")
+    monkeypatch.setenv("CARTESIA_VOICE", "v1")
+    assert voice_plugins.build_tts().kwargs == {"voice": "v1"}
+    assert imports == ["livekit.plugins.cartesia"]
+
+    monkeypatch.setenv("AGENT_TTS_PROVIDER", "azure")
+    monkeypatch.setenv("AGENT_STT_PROVIDER", "deepgram")
+    monkeypatch.setenv("AGENT_LLM_PROVIDER", "openai")
+    imports.clear()
+    assert voice_plugins.preload() == ["openai", "deepgram", "azure", "silero", "noise_cancellation"]
+    assert imports == [voice_plugins.PLUGIN_MODULES[name] for name in voice_plugins.configured_plugins()]
+
+
+@pytest.mark.parametrize("entry", sorted(startup_profile.ENTRY_POINTS))
+def test_lazy_modules_stay_out_of_startup(entry) -> None:
+    _, _, modules = startup_profile.profile_import(entry)
+    assert set(startup_profile.LAZY_MODULES[entry]).isdisjoint(modules)